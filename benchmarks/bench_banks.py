@@ -0,0 +1,57 @@
+"""Compare per-row get_suitable_banks with the vectorized match_banks.
+
+Run from the project root (uses the bank rules in the configured database):
+
+    python -m benchmarks.bench_banks [--rows 100000]
+
+Checks that both give identical matches for random applicants, then reports
+the time of each: the vectorized pass alone, and including conversion to the
+per-applicant dicts that the batch API returns.
+"""
+
+import argparse
+import os
+import time
+
+import django
+import numpy as np
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cibil_prediction.settings')
+django.setup()
+
+from predictor.banks import get_bank_index, match_banks  # noqa: E402
+from predictor.views import get_suitable_banks  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000, help='applicants to match')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    scores = rng.integers(300, 901, args.rows)
+    loan_amounts = rng.uniform(10000, 30000000, args.rows)
+    monthly_incomes = rng.uniform(1000, 400000, args.rows)
+    index = get_bank_index()
+    print(f"{len(index)} banks, {args.rows} applicants")
+
+    started = time.perf_counter()
+    expected = [get_suitable_banks(*row) for row in zip(scores.tolist(), loan_amounts.tolist(), monthly_incomes.tolist())]
+    loop_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matches = match_banks(index, scores, loan_amounts, monthly_incomes)
+    vector_seconds = time.perf_counter() - started
+    banks = [matches.banks(i) for i in range(args.rows)]
+    dict_seconds = time.perf_counter() - started
+
+    if banks != expected:
+        raise SystemExit("match_banks output differs from get_suitable_banks")
+    print("Outputs identical\n")
+    print(f"{'per-row loop':<24} {loop_seconds * 1000:>9.1f} ms")
+    print(f"{'vectorized':<24} {vector_seconds * 1000:>9.1f} ms  ({loop_seconds / vector_seconds:.1f}x)")
+    print(f"{'vectorized + dicts':<24} {dict_seconds * 1000:>9.1f} ms  ({loop_seconds / dict_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Compare sklearn RandomForestRegressor.predict with CompiledForest.predict.
+
+Run from the project root:
+
+    python -m benchmarks.bench_compiled_forest [--repeat 200]
+
+Checks that both give identical output, then reports per-call latency for
+single rows and for batches of several sizes.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from predictor.compiled_forest import CompiledForest
+from predictor.ml_model import CibilScorePredictor
+
+
+def random_applicants(n, seed=0):
+    rng = np.random.default_rng(seed)
+    age = rng.integers(18, 100, n)
+    return np.column_stack([
+        age,
+        np.maximum(1, 60 - age),
+        rng.uniform(1000, 300000, n),
+        rng.uniform(10000, 10000000, n),
+        rng.integers(0, 10, n),
+    ])
+
+
+def time_call(fn, X, repeat):
+    """Return the median wall time of fn(X) in milliseconds"""
+    fn(X)  # warm up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(X)
+        samples.append(time.perf_counter() - started)
+    return float(np.median(samples)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200, help='timed calls per case')
+    args = parser.parse_args()
+
+    model = CibilScorePredictor().model
+    forest = CompiledForest.from_sklearn(model)
+    print(f"Forest: {forest.n_trees} trees, {forest.n_nodes} nodes, max depth {forest.max_depth}")
+
+    X_check = random_applicants(20000, seed=1)
+    if not np.array_equal(model.predict(X_check), forest.predict(X_check)):
+        raise SystemExit("CompiledForest output differs from sklearn")
+    print("Outputs identical on 20000 random rows\n")
+
+    print(f"{'rows':>8} {'sklearn ms':>12} {'compiled ms':>12} {'speed-up':>9}")
+    for n_rows in (1, 10, 100, 1000, 10000):
+        X = random_applicants(n_rows)
+        repeat = max(5, args.repeat // max(1, n_rows // 100))
+        sklearn_ms = time_call(model.predict, X, repeat)
+        compiled_ms = time_call(forest.predict, X, repeat)
+        print(f"{n_rows:>8} {sklearn_ms:>12.3f} {compiled_ms:>12.3f} {sklearn_ms / compiled_ms:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Compare per-request prediction with the micro-batching coalescer under load.
+
+Run from the project root:
+
+    python -m benchmarks.bench_micro_batch [--threads 64] [--requests 5000]
+
+``--threads`` client threads share ``--requests`` single-applicant
+predictions. They run once calling ``predict_score`` directly and once per
+``--max-wait-ms`` value through a ``MicroBatcher``. The report shows
+throughput, the batcher's mean batch size, queue wait and caller latency,
+and checks that every score matches the direct call.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cibil_prediction.settings')
+django.setup()
+
+from benchmarks.bench_compiled_forest import random_applicants  # noqa: E402
+from predictor.batcher import MicroBatcher  # noqa: E402
+from predictor.ml_model import CibilScorePredictor  # noqa: E402
+
+
+def run(predict_one, rows, n_threads):
+    """Return (scores, seconds) for predict_one over rows from n_threads threads"""
+    with ThreadPoolExecutor(n_threads) as pool:
+        started = time.perf_counter()
+        scores = list(pool.map(predict_one, rows))
+        return scores, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=64, help='concurrent client threads')
+    parser.add_argument('--requests', type=int, default=5000, help='predictions per run')
+    parser.add_argument('--max-batch', type=int, default=64, help='MicroBatcher max_batch')
+    parser.add_argument('--max-wait-ms', type=float, nargs='+', default=[0.5, 2.0, 5.0],
+                        help='MicroBatcher max_wait_ms values to try')
+    args = parser.parse_args()
+
+    predictor = CibilScorePredictor()
+    rows = [list(row) for row in random_applicants(args.requests)]
+
+    expected, seconds = run(lambda row: predictor.predict_score(*row), rows, args.threads)
+    print(f"{'mode':<16} {'req/s':>9} {'batch':>7} {'wait p50':>9} {'lat p50':>9} {'lat p99':>9}")
+    print(f"{'direct':<16} {len(rows) / seconds:>9.0f} {'1':>7} {'-':>9} {'-':>9} {'-':>9}")
+
+    for max_wait_ms in args.max_wait_ms:
+        batcher = MicroBatcher(predictor.predict_batch, max_batch=args.max_batch,
+                               max_wait_ms=max_wait_ms, log_interval=0)
+        scores, seconds = run(batcher.predict, rows, args.threads)
+        batcher.stop()
+        if scores != expected:
+            raise SystemExit(f"micro-batched scores differ from direct ones (max_wait_ms={max_wait_ms})")
+        stats = batcher.stats()
+        print(f"{f'batched {max_wait_ms}ms':<16} {len(rows) / seconds:>9.0f} "
+              f"{stats['batch_size']['mean']:>7.1f} {stats['queue_wait_ms']['p50']:>9.2f} "
+              f"{stats['latency_ms']['p50']:>9.2f} {stats['latency_ms']['p99']:>9.2f}")
+    print("\nAll micro-batched scores match the direct predictions. Times in ms.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Compare model load time and per-worker memory across model file formats.
+
+Run from the project root:
+
+    python -m benchmarks.bench_model_load [--workers 4]
+
+The current model is written in three formats to a temporary directory:
+
+* ``pickle``: the bare ``pickle.dump(model)`` file the project used to write
+* ``artifact-v1``: a pickled dict holding the pickled model bytes
+* ``artifact-v2``: the current joblib artifact, memory-mapped on load
+
+For each format, ``--workers`` fresh Python processes load the file at the
+same time and make one prediction. Each then reports its load time and its
+memory growth: RSS, and on Linux also PSS and private bytes. PSS splits
+shared pages between the processes that map them, so it shows what page
+sharing saves across workers.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+
+from predictor.artifact import write_artifact
+from predictor.ml_model import FEATURES, CibilScorePredictor
+
+WORKER = r'''
+import json, os, sys, time
+
+def memory():
+    stats = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                if key in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+                    stats[key] = int(value.split()[0])
+        stats['Private'] = stats.pop('Private_Clean', 0) + stats.pop('Private_Dirty', 0)
+    except OSError:
+        import resource
+        stats['Rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return stats
+
+import numpy, sklearn.ensemble, joblib  # imported before the baseline
+from predictor.ml_model import CibilScorePredictor
+path = sys.argv[1]
+before = memory()
+started = time.perf_counter()
+if path.endswith('.bare'):
+    import pickle
+    with open(path, 'rb') as f:
+        model = pickle.load(f)
+    model.predict([[30, 30, 60000, 500000, 1]])
+else:
+    predictor = CibilScorePredictor(path)
+    predictor.predict_score(30, 30, 60000, 500000, 1)
+load_seconds = time.perf_counter() - started
+print('ready', flush=True)
+sys.stdin.readline()  # wait until every worker has loaded
+after = memory()
+print(json.dumps({'load_seconds': load_seconds,
+                  **{k: after[k] - before.get(k, 0) for k in after}}), flush=True)
+'''
+
+
+def write_formats(model, directory):
+    paths = {}
+
+    paths['pickle'] = os.path.join(directory, 'model.bare')
+    with open(paths['pickle'], 'wb') as f:
+        pickle.dump(model, f)
+
+    paths['artifact-v1'] = os.path.join(directory, 'model_v1.pkl')
+    model_bytes = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(paths['artifact-v1'], 'wb') as f:
+        pickle.dump({
+            'format_version': 1,
+            'features': FEATURES,
+            'metadata': {},
+            'checksum': hashlib.sha256(model_bytes).hexdigest(),
+            'model_bytes': model_bytes,
+        }, f)
+
+    paths['artifact-v2'] = os.path.join(directory, 'model_v2.pkl')
+    write_artifact(paths['artifact-v2'], model, FEATURES, {})
+    return paths
+
+
+def run_workers(path, n_workers):
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    procs = [
+        subprocess.Popen([sys.executable, '-c', WORKER, path], stdin=subprocess.PIPE,
+                         stdout=subprocess.PIPE, text=True, env=env)
+        for _ in range(n_workers)
+    ]
+    for proc in procs:
+        if proc.stdout.readline().strip() != 'ready':
+            raise SystemExit(f"worker failed while loading {path}")
+    results = []
+    for proc in procs:
+        proc.stdin.write('\n')
+        proc.stdin.flush()
+        results.append(json.loads(proc.stdout.readline()))
+        proc.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4, help='concurrent worker processes per format')
+    args = parser.parse_args()
+
+    model = CibilScorePredictor().model
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_formats(model, directory)
+        print(f"{'format':<12} {'size MB':>8} {'load ms':>8} {'RSS MB':>8} {'PSS MB':>8} {'private MB':>11}")
+        for name, path in paths.items():
+            results = run_workers(path, args.workers)
+            mean = {key: sum(r.get(key, 0) for r in results) / len(results) for key in results[0]}
+            print(f"{name:<12} {os.path.getsize(path) / 1e6:>8.1f} {mean['load_seconds'] * 1000:>8.0f} "
+                  f"{mean.get('Rss', 0) / 1024:>8.1f} {mean.get('Pss', 0) / 1024:>8.1f} "
+                  f"{mean.get('Private', 0) / 1024:>11.1f}")
+        print(f"\nMemory is the growth per worker while {args.workers} workers hold the model.")
+
+
+if __name__ == '__main__':
+    main()
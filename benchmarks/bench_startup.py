@@ -0,0 +1,95 @@
+"""Cold-start time of a Django management command, with its import profile.
+
+Run from the project root:
+
+    python -m benchmarks.bench_startup [--repeat 5] [--top 15] [-- migrate --check]
+
+Each run is a fresh ``python -X importtime manage.py check`` (or the command
+given after ``--``). The report shows the median wall time, the top-level
+imports with the largest cumulative import time in the median run, and any
+ML-stack module that was imported (NumPy, SciPy, scikit-learn, joblib). The
+ML stack is meant to load only on the first prediction or training run,
+through ``predictor.registry``, so the exit status is 1 if one shows up.
+``benchmarks.suite`` times the same command as its ``startup_check`` case,
+which puts cold start under the baseline regression check.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ML_MODULES = ('numpy', 'scipy', 'sklearn', 'joblib')
+
+
+def parse_importtime(stderr):
+    """Return [(module, depth, self_us, cumulative_us)] from -X importtime output"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return imports
+
+
+def ml_imports(imports):
+    """Map each top-level import that pulled in ML_MODULES to the ML packages it loaded"""
+    culprits, pending = {}, set()
+    # -X importtime lists a module after everything it imported
+    for name, depth, _, _ in imports:
+        if name.split('.')[0] in ML_MODULES:
+            pending.add(name.split('.')[0])
+        if depth == 0 and pending:
+            culprits[name] = pending
+            pending = set()
+    return culprits
+
+
+def run_startup(command=('check',)):
+    """Run manage.py command in a fresh interpreter; return (wall seconds, parsed imports)"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', 'manage.py', *command],
+        cwd=PROJECT_DIR, capture_output=True, text=True,
+    )
+    seconds = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"manage.py {' '.join(command)} failed:\n{result.stderr[-2000:]}")
+    return seconds, parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='fresh processes to time')
+    parser.add_argument('--top', type=int, default=15, help='top-level imports to list')
+    parser.add_argument('command', nargs='*', default=['check'], help='manage.py command and arguments')
+    args = parser.parse_args()
+
+    runs = [run_startup(args.command) for _ in range(args.repeat)]
+    runs.sort(key=lambda run: run[0])
+    seconds, imports = runs[len(runs) // 2]
+    total_us = sum(self_us for _, _, self_us, _ in imports)
+
+    print(f"manage.py {' '.join(args.command)}: median {seconds * 1000:.0f} ms wall "
+          f"(min {runs[0][0] * 1000:.0f}, max {runs[-1][0] * 1000:.0f}) over {args.repeat} runs; "
+          f"{total_us / 1000:.0f} ms importing {len(imports)} modules\n")
+    print(f"{'top-level import':<40} {'cumulative ms':>14}")
+    top_level = sorted((i for i in imports if i[1] == 0), key=lambda i: i[3], reverse=True)
+    for name, _, _, cumulative_us in top_level[:args.top]:
+        print(f"{name:<40} {cumulative_us / 1000:>14.1f}")
+
+    culprits = ml_imports(imports)
+    if culprits:
+        print()
+        for top, packages in culprits.items():
+            print(f"{top} imports {', '.join(sorted(packages))}")
+        raise SystemExit("ML modules imported at startup; import them on first prediction or training instead")
+    print("\nNo ML modules imported at startup")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""Benchmark suite for the prediction pipeline with baseline comparison.
+
+Run from the project root:
+
+    python -m benchmarks.suite                       # run, save JSON, compare with the baseline
+    python -m benchmarks.suite --save-baseline       # run and store the result as the new baseline
+    python -m benchmarks.suite --quick --only predict_batch_100 request_predict_cibil
+
+Cases:
+
+* ``model_load``: build a ``CibilScorePredictor`` from the model file on disk
+* ``predict_single``: one warm ``predict_score`` call
+* ``predict_batch_<n>``: one ``predict_batch`` call on n rows
+* ``suitable_banks``: one ``get_suitable_banks`` call
+* ``match_banks_1000``: vectorized bank matching for 1000 applicants
+* ``request_predict_cibil``: a full ``POST /predict/`` through Django's test client
+* ``train_<n>``: ``train_model(n_samples=n)`` into a temporary file
+* ``startup_check``: a cold ``python -X importtime manage.py check`` (see ``bench_startup``)
+
+Everything runs offline, against a throwaway test database and the local
+model file (trained first if it is missing). Results are written as JSON
+with machine and library versions to ``--output``. Each case's median is
+then compared with ``--baseline``. The exit status is 1 when any case is
+slower than the baseline by more than ``--threshold`` (0.25 means 25%).
+Baselines are only meaningful on the machine that recorded them.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cibil_prediction.settings')
+django.setup()
+
+import numpy as np  # noqa: E402
+import sklearn  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.runner import DiscoverRunner  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+
+from benchmarks.bench_compiled_forest import random_applicants  # noqa: E402
+from benchmarks.bench_startup import run_startup  # noqa: E402
+from predictor.banks import get_bank_index, match_banks  # noqa: E402
+from predictor.batcher import prediction_batcher  # noqa: E402
+from predictor.ml_model import MODEL_PATH, CibilScorePredictor  # noqa: E402
+from predictor.persistence import writer  # noqa: E402
+from predictor.views import get_suitable_banks  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results', 'latest.json')
+BATCH_SIZES = (1, 10, 100, 1000, 10000)
+TRAIN_SIZES = (1000, 5000)
+
+
+def measure(fn, min_repeat, min_seconds, warmup=True):
+    """Call fn() (after one untimed warm-up call) until min_repeat calls and min_seconds have passed"""
+    if warmup:
+        fn()
+    samples = []
+    deadline = time.perf_counter() + min_seconds
+    while len(samples) < min_repeat or time.perf_counter() < deadline:
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    samples = np.array(samples)
+    return {
+        'median_s': float(np.median(samples)),
+        'p90_s': float(np.percentile(samples, 90)),
+        'min_s': float(samples.min()),
+        'repeat': len(samples),
+    }
+
+
+def machine_info():
+    info = {
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'sklearn': sklearn.__version__,
+        'django': django.get_version(),
+    }
+    try:
+        info['git_commit'] = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, cwd=BENCH_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return info
+
+
+def build_cases(quick, workdir):
+    """Return {name: (fn, min_repeat)}; fixtures are prepared here, outside the timings"""
+    predictor = CibilScorePredictor()
+    rows = random_applicants(10000, seed=3)
+    cases = {
+        'model_load': (lambda: CibilScorePredictor(MODEL_PATH), 3 if quick else 10),
+        'predict_single': (lambda: predictor.predict_score(*rows[0]), 200),
+    }
+    for n in BATCH_SIZES:
+        cases[f'predict_batch_{n}'] = (lambda X=rows[:n]: predictor.predict_batch(X), 5 if n >= 1000 else 50)
+
+    rng = np.random.default_rng(4)
+    scores = rng.integers(300, 901, 1000)
+    loans = rng.uniform(10000, 30000000, 1000)
+    incomes = rng.uniform(1000, 400000, 1000)
+    index = get_bank_index()
+    cases['suitable_banks'] = (lambda: get_suitable_banks(int(scores[0]), float(loans[0]), float(incomes[0])), 200)
+    cases['match_banks_1000'] = (lambda: match_banks(index, scores, loans, incomes), 50)
+
+    client = Client()
+    forms = iter([])
+
+    def post_form():
+        nonlocal forms
+        # Distinct applicants so that the result cache never answers
+        try:
+            form = next(forms)
+        except StopIteration:
+            forms = iter([
+                {'name': 'Bench', 'age': str(age), 'monthly_income': str(income),
+                 'desired_loan_amount': '500000', 'existing_loans': '1'}
+                for age in range(18, 101) for income in range(20000, 200000, 1000)
+            ])
+            form = next(forms)
+        response = client.post('/predict/', form)
+        if response.status_code != 200:
+            raise RuntimeError(f"/predict/ returned {response.status_code}")
+
+    cases['request_predict_cibil'] = (post_form, 20 if quick else 100)
+
+    # Loaded from a copy so that retraining never replaces the served model file
+    trainer_path = os.path.join(workdir, 'model.pkl')
+    shutil.copyfile(MODEL_PATH, trainer_path)
+    trainer = CibilScorePredictor(trainer_path)
+    for n in TRAIN_SIZES[:1] if quick else TRAIN_SIZES:
+        cases[f'train_{n}'] = (lambda n=n: trainer.train_model(n_samples=n), 1 if quick else 3)
+
+    # A fresh interpreter each time: what migrate, shell and every new worker pay before doing anything
+    cases['startup_check'] = (run_startup, 3 if quick else 5)
+    return cases
+
+
+def run_suite(only, quick):
+    min_seconds = 0.2 if quick else 1.0
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        cases = build_cases(quick, workdir)
+        for name, (fn, min_repeat) in cases.items():
+            if only and name not in only:
+                continue
+            # Training is slow and has nothing to warm up
+            training = name.startswith('train_')
+            results[name] = measure(fn, min_repeat, 0 if training else min_seconds, warmup=not training)
+            print(f"{name:<24} {results[name]['median_s'] * 1000:>10.3f} ms  (n={results[name]['repeat']})", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print a comparison table and return the names of regressed cases"""
+    regressions = []
+    print(f"\n{'case':<24} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    for name, result in results.items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f"{name:<24} {'-':>12} {result['median_s'] * 1000:>12.3f} {'new':>8}")
+            continue
+        change = result['median_s'] / before['median_s'] - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<24} {before['median_s'] * 1000:>12.3f} {result['median_s'] * 1000:>12.3f} {change:>+7.0%}{flag}")
+    return regressions
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to write this run as JSON')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown as a fraction of the baseline')
+    parser.add_argument('--save-baseline', action='store_true', help='also store this run as the baseline')
+    parser.add_argument('--quick', action='store_true', help='fewer repeats and training sizes')
+    parser.add_argument('--only', nargs='+', metavar='CASE', help='run only these cases')
+    args = parser.parse_args()
+
+    # A throwaway database (migrated, so the banks are seeded) keeps the real one untouched
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+    try:
+        with override_settings(CIBIL_RESULT_CACHE=False):
+            results = run_suite(set(args.only or ()), args.quick)
+    finally:
+        # Flush background threads while the test database still exists
+        writer.stop()
+        prediction_batcher.stop()
+        runner.teardown_databases(old_config)
+
+    run = {
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'machine': machine_info(),
+        'quick': args.quick,
+        'results': results,
+    }
+    write_json(args.output, run)
+    print(f"\nResults written to {args.output}")
+    if args.save_baseline:
+        write_json(args.baseline, run)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    differing = sorted(k for k in run['machine'] if k != 'git_commit' and run['machine'][k] != baseline['machine'].get(k))
+    if differing:
+        print(f"Warning: baseline was recorded with different {', '.join(differing)}")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}: "
+              f"{', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\nNo case regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
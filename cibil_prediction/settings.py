@@ -3,7 +3,8 @@ Django settings for cibil_prediction project
 ===========================================
 
 ✓ Works out-of-the-box for local development.
-✓ Uses SQLite, DEBUG=True, static files under <project-root>/static.
+✓ Uses SQLite (WAL mode), DEBUG=True, static files under <project-root>/static.
+✓ DATABASE_URL / DATABASE_READ_URL switch to Postgres and a read replica.
 ✓ Looks for templates in <project-root>/templates plus each app’s templates/.
 
 Switch DEBUG to False, set a real SECRET_KEY, add ALLOWED_HOSTS,
@@ -12,6 +13,8 @@ and move to Postgres/MySQL before deploying to production.
 
 from pathlib import Path
 
+from .database import databases_from_env
+
 # ────────────────────────────────────────────────────────────────
 # Base directory
 # ────────────────────────────────────────────────────────────────
@@ -44,6 +47,7 @@ INSTALLED_APPS = [
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 MIDDLEWARE = [
+    "predictor.middleware.MetricsMiddleware",          # first, so it times the whole stack
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -53,6 +57,16 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Optional: with `pip install whitenoise` the app serves STATIC_ROOT itself, picking the
+# precompressed .br/.gz files and sending hashed files with a one-year immutable Cache-Control
+try:
+    import whitenoise  # noqa: F401
+except ImportError:
+    pass
+else:
+    MIDDLEWARE.insert(MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+                      "whitenoise.middleware.WhiteNoiseMiddleware")
+
 ROOT_URLCONF = "cibil_prediction.urls"
 
 # ────────────────────────────────────────────────────────────────
@@ -78,14 +92,9 @@ TEMPLATES = [
 WSGI_APPLICATION = "cibil_prediction.wsgi.application"
 
 # ────────────────────────────────────────────────────────────────
-# Database (SQLite for dev)
+# Database (SQLite for dev; DATABASE_URL / DATABASE_READ_URL, see database.py)
 # ────────────────────────────────────────────────────────────────
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
-}
+DATABASES = databases_from_env(BASE_DIR)
 
 # ────────────────────────────────────────────────────────────────
 # Password validation
@@ -112,6 +121,16 @@ STATIC_URL = "/static/"
 STATICFILES_DIRS = [BASE_DIR / "static"]   # dev assets live here
 STATIC_ROOT = BASE_DIR / "staticfiles"     # `collectstatic` target (prod)
 
+# Production: hashed, minified, precompressed files (predictor/storage.py); needs `collectstatic`.
+# Development and tests serve the plain files from STATICFILES_DIRS.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage" if DEBUG
+        else "predictor.storage.CibilStaticFilesStorage",
+    },
+}
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
@@ -129,3 +148,59 @@ LOGGING = {
 # Place any third-party or custom settings below
 # e.g. REST_FRAMEWORK = { ... }
 # ────────────────────────────────────────────────────────────────
+
+# CIBIL model registry (predictor/registry.py)
+CIBIL_MODEL_WARMUP = False          # load the model in AppConfig.ready()
+CIBIL_MODEL_CHECK_INTERVAL = 5.0    # seconds between model-file change checks
+CIBIL_TRAIN_ON_REQUEST = False      # train in-process when no model exists (else serve rule-based scores)
+CIBIL_BATCH_MAX_SIZE = 10000        # applicants per POST /predict/batch/
+CIBIL_WHAT_IF_MAX_POINTS = 5000     # loan amounts x existing-loan counts per POST /predict/what-if/
+CIBIL_BANK_CHECK_INTERVAL = 5.0     # seconds between re-reads of the Bank table (predictor/banks.py)
+
+# Write-behind persistence of predictions (predictor/persistence.py)
+CIBIL_WRITE_BEHIND = True
+CIBIL_WRITE_BEHIND_BATCH_SIZE = 200       # rows per bulk_create
+CIBIL_WRITE_BEHIND_FLUSH_INTERVAL = 1.0   # seconds before a partial batch is written
+CIBIL_WRITE_BEHIND_MAX_BUFFER = 10000     # rows held in memory before back-pressure
+CIBIL_WRITE_BEHIND_PUT_TIMEOUT = 0.5      # seconds to wait for buffer space, then write inline
+CIBIL_WRITE_BEHIND_RETRIES = 3            # retries of a batch after an OperationalError, then row by row
+CIBIL_WRITE_BEHIND_RETRY_BACKOFF = 0.1    # seconds before the first retry, doubling after each
+CIBIL_ROLLUPS = True                       # keep DailyPredictionRollup/DailyScoreBucket current on every write
+
+# SQLite connection tuning, applied on every new connection (predictor/signals.py)
+CIBIL_SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",          # readers no longer block the writer (and vice versa)
+    "busy_timeout": 5000,           # ms to wait for the write lock instead of failing
+    "synchronous": "NORMAL",        # fsync at checkpoints only; safe with WAL
+}
+
+# Prediction result cache (predictor/result_cache.py)
+CIBIL_RESULT_CACHE = True
+CIBIL_RESULT_CACHE_SIZE = 10000     # entries in the in-process LRU
+CIBIL_RESULT_CACHE_TTL = 300        # seconds
+CIBIL_RESULT_CACHE_ALIAS = None     # e.g. "default" to share through Django's cache framework
+
+# Async prediction view (run under ASGI, e.g. `uvicorn cibil_prediction.asgi:application`)
+CIBIL_ASYNC_PREDICT = False         # route /predict/ to views.predict_cibil_async
+CIBIL_INFERENCE_WORKERS = 4         # threads running model inference
+CIBIL_INFERENCE_MAX_PENDING = 64    # running + queued inferences before returning 503
+CIBIL_RETRY_AFTER = 1               # seconds, sent with 503 responses
+
+# Micro-batching of concurrent single predictions (predictor/batcher.py)
+CIBIL_MICRO_BATCH = False               # route predict_cibil through the coalescer
+CIBIL_MICRO_BATCH_MAX_SIZE = 64         # rows per batched predict
+CIBIL_MICRO_BATCH_MAX_WAIT_MS = 2.0     # longest a row waits for others to join its batch
+CIBIL_MICRO_BATCH_MAX_QUEUE = 10000     # queued rows before callers predict inline
+CIBIL_MICRO_BATCH_LOG_INTERVAL = 60.0   # seconds between stats log lines (0 disables)
+
+# Shadow evaluation of a candidate model (predictor/shadow.py)
+CIBIL_SHADOW_MODEL_PATH = None          # e.g. BASE_DIR / "predictor" / "cibil_model.candidate.pkl"; None disables
+CIBIL_SHADOW_SAMPLE_RATE = 0.1          # fraction of form predictions also scored by the candidate
+CIBIL_SHADOW_MAX_QUEUE = 1000           # queued samples before new ones are dropped
+CIBIL_SHADOW_BATCH_SIZE = 64            # rows per candidate predict_batch
+CIBIL_SHADOW_LOG_INTERVAL = 60.0        # seconds between stats log lines (0 disables)
+
+# Metrics and profiling (predictor/metrics.py, predictor/middleware.py)
+CIBIL_METRICS_ENABLED = True        # serve /metrics (restrict it at the proxy in production)
+CIBIL_PROFILING = DEBUG             # honour the X-Cibil-Profile request header; never in production
+CIBIL_PROFILE_DIR = None            # where .prof files go; None = <tmp>/cibil-profiles
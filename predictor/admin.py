@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import CibilPrediction, Bank
+from .db import ReadAliasChangeList
+from .models import CibilPrediction, Bank, DailyPredictionRollup
 
 @admin.register(CibilPrediction)
 class CibilPredictionAdmin(admin.ModelAdmin):
@@ -7,8 +8,22 @@ class CibilPredictionAdmin(admin.ModelAdmin):
     list_filter = ['predicted_score', 'created_at', 'existing_loans']
     search_fields = ['predicted_score']
     ordering = ['-created_at']
+    show_full_result_count = False  # skips a COUNT(*) over the whole table on every page
+    
+    def get_changelist(self, request, **kwargs):
+        # Listing history is report traffic: keep it off the write database
+        return ReadAliasChangeList
 
 @admin.register(Bank)
 class BankAdmin(admin.ModelAdmin):
-    list_display = ['name', 'short_name', 'min_cibil_score', 'interest_rate', 'max_loan_amount']
-    list_filter = ['min_cibil_score', 'interest_rate']
\ No newline at end of file
+    list_display = ['name', 'short_name', 'min_cibil_score', 'interest_rate', 'max_loan_amount', 'priority', 'income_multiplier']
+    list_filter = ['min_cibil_score', 'interest_rate']
+
+@admin.register(DailyPredictionRollup)
+class DailyPredictionRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', 'count', 'excellent', 'very_good', 'good', 'fair', 'poor']
+    ordering = ['-date']
+    date_hierarchy = 'date'
+    
+    def get_changelist(self, request, **kwargs):
+        return ReadAliasChangeList
@@ -0,0 +1,22 @@
+import logging
+
+from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PredictorConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'predictor'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects the receivers)
+
+        if getattr(settings, 'CIBIL_MODEL_WARMUP', False):
+            from .registry import registry
+            try:
+                registry.warm_up()
+            except Exception as e:
+                # Requests will retry the load; do not block process startup
+                logger.error(f"Model warm-up failed: {e}")
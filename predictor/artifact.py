@@ -0,0 +1,185 @@
+"""Versioned on-disk format for the trained CIBIL model.
+
+Format 2 (current) is a dict written uncompressed with ``joblib.dump``::
+
+    {
+        'format_version': 2,
+        'features': ('age', 'service_years', ...),   # column order of X
+        'metadata': {...},                            # training parameters and metrics
+        'forest': {...},                              # CompiledForest.to_arrays()
+        'forest_fingerprint': '<sha256>',
+        'checksum': '<sha256 of model_bytes>',
+        'model_bytes': np.uint8 array,                # pickled RandomForestRegressor
+    }
+
+``read_artifact`` loads it with ``mmap_mode='r'``. The forest arrays used for
+serving are therefore read-only maps of the file, and every worker shares
+them through the OS page cache instead of keeping a private heap copy. The
+sklearn estimator is only unpickled when ``Artifact.load_model`` is called,
+because unpickling an sklearn tree copies its nodes onto the heap.
+
+Format 1 (a plain pickled dict with ``model_bytes``) and a bare pickled
+estimator from before artifacts existed both still load. The compiled forest
+for those is built in memory.
+
+Writers go through ``write_artifact``, which writes a temporary file in the
+same directory and renames it over the target. A concurrent reader therefore
+sees either the old file or the new one, never a partial write.
+``model_file_lock`` serializes training between processes so that only one
+worker retrains when the file is missing.
+"""
+
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+
+import joblib
+import numpy as np
+
+from .compiled_forest import CompiledForest
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+ARTIFACT_FORMAT = 2
+
+
+class ModelArtifactError(Exception):
+    """The model file exists but cannot be used"""
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class Artifact:
+    """A loaded model file: serving forest, schema, metadata and a lazy sklearn model"""
+
+    def __init__(self, features, metadata, forest, forest_fingerprint, model=None,
+                 model_bytes=None, checksum=None):
+        self.features = tuple(features)
+        self.metadata = metadata
+        self.forest = forest
+        self.forest_fingerprint = forest_fingerprint
+        self._model = model
+        self._model_bytes = model_bytes
+        self._checksum = checksum
+
+    def load_model(self):
+        """Return the sklearn estimator, unpickling it on first use"""
+        if self._model is None:
+            data = memoryview(self._model_bytes).cast('B')
+            if _sha256(data) != self._checksum:
+                raise ModelArtifactError("checksum mismatch")
+            self._model = pickle.loads(data)
+        return self._model
+
+
+def write_artifact(path, model, features, metadata):
+    """Atomically write model, its compiled forest and its schema/metadata to path"""
+    model_bytes = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+    forest = CompiledForest.from_sklearn(model)
+    artifact = {
+        'format_version': ARTIFACT_FORMAT,
+        'features': tuple(features),
+        'metadata': metadata,
+        'forest': forest.to_arrays(),
+        'forest_fingerprint': forest.fingerprint(),
+        'checksum': _sha256(model_bytes),
+        'model_bytes': np.frombuffer(model_bytes, dtype=np.uint8),
+    }
+    # Uncompressed so that the arrays can be memory-mapped on load
+    atomic_write(path, lambda f: joblib.dump(artifact, f, compress=0))
+
+
+def atomic_write(path, write):
+    """Call write(file) on a temp file next to path, fsync it and rename it into place"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            # mkstemp creates 0600; model files must be readable by every worker
+            os.chmod(tmp_path, 0o644)
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+def read_artifact(path, expected_features, mmap=True):
+    """Return an Artifact for path.
+
+    Raises FileNotFoundError if path does not exist and ModelArtifactError if
+    it is corrupt, from a newer format, or built for a different feature schema.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    try:
+        # joblib.load also reads plain pickles (format 1 and legacy files)
+        obj = joblib.load(path, mmap_mode='r' if mmap else None)
+    except Exception as e:
+        raise ModelArtifactError(f"cannot load {path}: {e}") from e
+
+    if not (isinstance(obj, dict) and 'format_version' in obj):
+        # Legacy bare estimator
+        artifact = _artifact_from_model(obj, tuple(expected_features), {'legacy': True})
+    elif obj['format_version'] > ARTIFACT_FORMAT:
+        raise ModelArtifactError(f"artifact format {obj['format_version']} is newer than supported")
+    elif tuple(obj['features']) != tuple(expected_features):
+        raise ModelArtifactError(f"artifact features {obj['features']} do not match {tuple(expected_features)}")
+    elif obj['format_version'] == 1:
+        if _sha256(obj['model_bytes']) != obj['checksum']:
+            raise ModelArtifactError("checksum mismatch")
+        artifact = _artifact_from_model(pickle.loads(obj['model_bytes']), obj['features'], obj['metadata'])
+    else:
+        forest = CompiledForest.from_arrays(obj['forest'])
+        if forest.fingerprint() != obj['forest_fingerprint']:
+            raise ModelArtifactError("forest fingerprint mismatch")
+        artifact = Artifact(
+            obj['features'], obj['metadata'], forest, obj['forest_fingerprint'],
+            model_bytes=obj['model_bytes'], checksum=obj['checksum'],
+        )
+
+    if artifact.forest.n_features != len(expected_features):
+        raise ModelArtifactError(
+            f"model expects {artifact.forest.n_features} features, schema has {len(expected_features)}"
+        )
+    return artifact
+
+
+def _artifact_from_model(model, features, metadata):
+    if not hasattr(model, 'estimators_'):
+        raise ModelArtifactError(f"unexpected object of type {type(model).__name__}")
+    forest = CompiledForest.from_sklearn(model)
+    return Artifact(features, metadata, forest, forest.fingerprint(), model=model)
+
+
+@contextlib.contextmanager
+def model_file_lock(path):
+    """Exclusive inter-process lock on <path>.lock"""
+    lock_path = path + '.lock'
+    os.makedirs(os.path.dirname(os.path.abspath(lock_path)), exist_ok=True)
+    with open(lock_path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,186 @@
+"""Bank eligibility rules cached in memory and indexed by minimum CIBIL score.
+
+The Bank table is read into an immutable ``BankIndex`` sorted by
+``min_cibil_score``. A bisect on that order gives the banks a score
+qualifies for. ``predictor.signals`` drops the cached index in the process
+that saved or deleted a Bank row. Every other process (server workers,
+``score_file`` workers) re-reads the few rows at most every
+``CIBIL_BANK_CHECK_INTERVAL`` seconds and swaps the index when their content
+hash, ``BankIndex.version``, changes. Result cache keys include that version,
+so cached bank lists expire with it.
+
+``match_banks`` is the columnar counterpart of ``views.get_suitable_banks``:
+it computes eligible amounts, approval chances and the ranking for every
+(applicant, bank) pair of a batch in one NumPy pass, with identical results.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from bisect import bisect_right
+from collections import namedtuple
+
+from django.conf import settings
+
+from .models import Bank
+
+logger = logging.getLogger(__name__)
+
+BankRule = namedtuple('BankRule', [
+    'name', 'short_name', 'min_score', 'max_amount', 'interest_rate', 'priority', 'income_multiplier',
+])
+
+
+class BankIndex:
+    """Immutable bank rules sorted by minimum CIBIL score"""
+
+    def __init__(self, rules):
+        self.rules = tuple(sorted(rules, key=lambda r: (r.min_score, r.priority)))
+        self.min_scores = tuple(r.min_score for r in self.rules)
+        # Content hash, identical in every process that loaded the same rows
+        self.version = hashlib.sha1(repr(self.rules).encode()).hexdigest()[:12]
+
+    def __len__(self):
+        return len(self.rules)
+
+    def eligible(self, cibil_score):
+        """Rules whose minimum score is at or below cibil_score"""
+        return self.rules[:bisect_right(self.min_scores, cibil_score)]
+
+    @classmethod
+    def from_db(cls):
+        rows = Bank.objects.order_by('id').values_list(  # type: ignore
+            'name', 'short_name', 'min_cibil_score', 'max_loan_amount',
+            'interest_rate', 'priority', 'income_multiplier',
+        )
+        return cls(
+            BankRule(name, short_name, min_score, float(max_amount), interest_rate, priority, income_multiplier)
+            for name, short_name, min_score, max_amount, interest_rate, priority, income_multiplier in rows
+        )
+
+
+class BankMatches:
+    """Ranked bank matches for a batch of applicants, as returned by match_banks"""
+
+    def __init__(self, rules, ranked, eligible_amount, approval_chance, counts):
+        self.rules = rules
+        self.ranked = ranked                    # (n, limit) rule indices, best first
+        self.eligible_amount = eligible_amount  # (n, limit) int64, aligned with ranked
+        self.approval_chance = approval_chance  # (n, limit) int64, aligned with ranked
+        self.counts = counts                    # (n,) number of valid entries per row
+        self._lists = None
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _as_lists(self):
+        if self._lists is None:
+            # One bulk conversion instead of a NumPy scalar per element
+            self._lists = (self.ranked.tolist(), self.eligible_amount.tolist(),
+                           self.approval_chance.tolist(), self.counts.tolist())
+        return self._lists
+
+    def matches(self, i):
+        """(rule, eligible_amount, approval_chance) tuples for applicant i, best first"""
+        ranked, eligible_amount, approval_chance, counts = self._as_lists()
+        rules = self.rules
+        return [
+            (rules[ranked[i][j]], eligible_amount[i][j], approval_chance[i][j])
+            for j in range(counts[i])
+        ]
+
+    def banks(self, i):
+        """Matches for applicant i in the format of views.get_suitable_banks"""
+        ranked, eligible_amount, approval_chance, counts = self._as_lists()
+        matches = []
+        for j in range(counts[i]):
+            rule = self.rules[ranked[i][j]]
+            matches.append({
+                'name': rule.name,
+                'short_name': rule.short_name,
+                'eligible_amount': eligible_amount[i][j],
+                'interest_rate': rule.interest_rate,
+                'priority': rule.priority,
+                'approval_chance': approval_chance[i][j],
+            })
+        return matches
+
+
+def match_banks(index, scores, loan_amounts, monthly_incomes, limit=5):
+    """Vectorized get_suitable_banks over arrays of scores, loan amounts and incomes"""
+    # Not at module level: signals imports this module in every process
+    import numpy as np
+
+    scores = np.asarray(scores, dtype=np.int64).reshape(-1, 1)
+    loan_amounts = np.asarray(loan_amounts, dtype=float).reshape(-1, 1)
+    monthly_incomes = np.asarray(monthly_incomes, dtype=float).reshape(-1, 1)
+    n_rows, n_banks = len(scores), len(index.rules)
+
+    min_score = np.array([r.min_score for r in index.rules], dtype=np.int64)
+    max_amount = np.array([r.max_amount for r in index.rules], dtype=float)
+    income_multiplier = np.array([r.income_multiplier for r in index.rules], dtype=float)
+    priority = np.array([r.priority for r in index.rules], dtype=np.int64)
+
+    score_multiplier = np.select(
+        [scores >= 800, scores >= 750, scores >= 700, scores >= 650],
+        [1.3, 1.2, 1.1, 1.0],
+        0.8,
+    )
+    # Same operation order as the per-row function, so the floats match bit for bit
+    base_eligible = np.minimum((monthly_incomes * income_multiplier) * score_multiplier, max_amount)
+    with_buffer = np.minimum(loan_amounts * 1.1, base_eligible)
+    eligible_amount = np.where(loan_amounts <= base_eligible, with_buffer, base_eligible).astype(np.int64)
+    approval_chance = np.minimum(95, 60 + (scores - min_score) // 10)
+    valid = (min_score <= scores) & (eligible_amount >= 50000)
+
+    # Valid first, then by priority and larger amount; lexsort is stable, so
+    # ties keep index order exactly like heapq.nsmallest in the per-row code
+    order = np.lexsort((
+        -eligible_amount,
+        np.broadcast_to(priority, (n_rows, n_banks)),
+        ~valid,
+    ), axis=-1)[:, :limit]
+
+    return BankMatches(
+        index.rules,
+        order,
+        np.take_along_axis(eligible_amount, order, axis=1),
+        np.take_along_axis(approval_chance, order, axis=1),
+        np.minimum(valid.sum(axis=1), limit),
+    )
+
+
+_lock = threading.Lock()
+_index = None
+_next_check = 0.0
+
+
+def get_bank_index():
+    """Return the cached BankIndex, re-reading the table every CIBIL_BANK_CHECK_INTERVAL seconds"""
+    global _index, _next_check
+    index = _index
+    if index is not None and time.monotonic() < _next_check:
+        return index
+    with _lock:
+        if _index is None or time.monotonic() >= _next_check:
+            try:
+                fresh = BankIndex.from_db()
+            except Exception as e:
+                if _index is None:
+                    raise
+                # Keep serving the rules we have; retry after the next interval
+                logger.error(f"Cannot re-read bank rules ({e}); keeping version {_index.version}")
+            else:
+                # Same rows: keep the old object so nothing downstream sees a change
+                if _index is None or fresh.version != _index.version:
+                    _index = fresh
+            _next_check = time.monotonic() + getattr(settings, 'CIBIL_BANK_CHECK_INTERVAL', 5.0)
+        return _index
+
+
+def invalidate_bank_index():
+    """Drop the cached index; the next lookup reloads it"""
+    global _index
+    with _lock:
+        _index = None
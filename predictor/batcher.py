@@ -0,0 +1,157 @@
+"""Micro-batching of single-applicant predictions.
+
+Concurrent requests each hand one feature row to ``MicroBatcher.submit``. A
+background thread takes the first waiting row and then keeps collecting rows
+for at most ``max_wait_ms`` milliseconds or until ``max_batch`` rows are
+waiting. It then runs one ``predict_batch`` call on the stacked rows and
+resolves every caller's future with its own score.
+
+``stats()`` reports batch sizes, the time rows spend queued and the end-to-end
+latency seen by callers, for tuning ``CIBIL_MICRO_BATCH_MAX_SIZE`` against
+``CIBIL_MICRO_BATCH_MAX_WAIT_MS``.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+
+from .registry import get_predictor
+from .workers import BackgroundWorker, StatsWindow
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher(BackgroundWorker):
+    """Coalesces concurrent single-row predictions into batched calls"""
+
+    thread_name = 'micro-batcher'
+
+    def __init__(self, predict_batch, max_batch=64, max_wait_ms=2.0, max_queue=10000, log_interval=60.0):
+        super().__init__(max_queue)
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.log_interval = log_interval
+        self._stats_lock = threading.Lock()
+        self._next_log = time.monotonic() + log_interval
+        self._reset_stats()
+
+    def submit(self, row):
+        """Queue one feature row; the returned Future resolves to its integer score"""
+        future = Future()
+        pending = self._ensure_started()
+        try:
+            pending.put_nowait((row, future, time.perf_counter()))
+        except queue.Full:
+            # Overloaded: score this row on the caller's thread instead
+            logger.warning("Micro-batch queue full, predicting inline")
+            with self._stats_lock:
+                self.inline += 1
+            future.set_result(int(self.predict_batch([row])[0]))
+        return future
+
+    def predict(self, row, timeout=None):
+        """Blocking submit(): return the score for one feature row"""
+        return self.submit(row).result(timeout)
+
+    def stats(self):
+        """Batch size, queue wait (ms) and latency (ms) summaries since the last reset"""
+        with self._stats_lock:
+            return {
+                'batches': self.batch_size.count,
+                'items': int(self.batch_size.total),
+                'inline': self.inline,
+                'errors': self.errors,
+                'batch_size': self.batch_size.summary(),
+                'queue_wait_ms': self.queue_wait.summary(),
+                'latency_ms': self.latency.summary(),
+                'pending': self.pending(),
+            }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._reset_stats()
+
+    def _reset_stats(self):
+        self.batch_size = StatsWindow()
+        self.queue_wait = StatsWindow()
+        self.latency = StatsWindow()
+        self.inline = 0
+        self.errors = 0
+
+    def _run(self):
+        # Answer everything queued before stopping
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._process(batch)
+            self._maybe_log()
+
+    def _next_batch(self):
+        """Wait for one row, then collect more until max_batch or max_wait after it arrived"""
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _process(self, batch):
+        started = time.perf_counter()
+        try:
+            # predict_batch converts the rows to a float array itself
+            scores = self.predict_batch([row for row, _, _ in batch])
+        except Exception as e:
+            logger.error(f"Micro-batch prediction error ({len(batch)} rows): {e}")
+            with self._stats_lock:
+                self.errors += 1
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        for (_, future, _), score in zip(batch, scores):
+            future.set_result(int(score))
+
+        finished = time.perf_counter()
+        with self._stats_lock:
+            self.batch_size.add(len(batch))
+            for _, _, enqueued in batch:
+                self.queue_wait.add((started - enqueued) * 1000)
+                self.latency.add((finished - enqueued) * 1000)
+
+    def _maybe_log(self):
+        if not self.log_interval or time.monotonic() < self._next_log:
+            return
+        self._next_log = time.monotonic() + self.log_interval
+        stats = self.stats()
+        if stats['batches']:
+            logger.info(
+                f"Micro-batching: {stats['items']} rows in {stats['batches']} batches "
+                f"(mean size {stats['batch_size']['mean']:.1f}), "
+                f"queue wait p50 {stats['queue_wait_ms']['p50']:.2f} ms, "
+                f"latency p99 {stats['latency_ms']['p99']:.2f} ms"
+            )
+
+
+def _predict_with_current_model(features):
+    # Looked up per batch so that a hot-swapped model is picked up
+    return get_predictor().predict_batch(features)
+
+
+prediction_batcher = MicroBatcher(
+    _predict_with_current_model,
+    max_batch=getattr(settings, 'CIBIL_MICRO_BATCH_MAX_SIZE', 64),
+    max_wait_ms=getattr(settings, 'CIBIL_MICRO_BATCH_MAX_WAIT_MS', 2.0),
+    max_queue=getattr(settings, 'CIBIL_MICRO_BATCH_MAX_QUEUE', 10000),
+    log_interval=getattr(settings, 'CIBIL_MICRO_BATCH_LOG_INTERVAL', 60.0),
+)
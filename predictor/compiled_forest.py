@@ -0,0 +1,158 @@
+"""Flat-array inference for a fitted RandomForestRegressor.
+
+``CompiledForest.from_sklearn`` copies every tree's nodes into one set of
+contiguous arrays (feature, threshold, left/right child, leaf value). All trees
+share a global node numbering and leaves point back at themselves, so
+prediction is a fixed number of vectorized steps: every (row, tree) pair
+moves down one level per step, and pairs that already reached a leaf stay put.
+
+Results are bit-for-bit identical to ``RandomForestRegressor.predict`` with
+``n_jobs=None``. Inputs are cast to float32 before comparison as sklearn does,
+and the per-tree values are summed in estimator order before dividing by the
+tree count.
+"""
+
+import hashlib
+
+import numpy as np
+
+# Rows per block in predict(); keeps the (rows x trees) node matrix small
+BLOCK_SIZE = 4096
+
+
+class CompiledForest:
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, n_features, children=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        # children[2 * node + went_left] gives the next node in one gather
+        if children is None:
+            children = np.stack([right, left], axis=1).ravel()
+        self.children = children
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Export the trees of a fitted RandomForestRegressor"""
+        if model.n_outputs_ != 1:
+            raise ValueError("Only single-output forests can be compiled")
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            node_ids = np.arange(offset, offset + n, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold).astype(np.float64))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset).astype(np.int32))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset).astype(np.int32))
+            values.append(tree.value[:, 0, 0].astype(np.float64))
+            roots.append(offset)
+
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.int32),
+            max_depth=max_depth,
+            n_features=model.n_features_in_,
+        )
+
+    def fingerprint(self):
+        """Hash of the tree structure and leaf values, for tying derived files to this forest"""
+        digest = hashlib.sha256()
+        for array in (self.feature, self.threshold, self.left, self.right, self.value, self.roots):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    def thresholds_by_feature(self):
+        """Sorted distinct split thresholds used for each feature"""
+        is_split = self.left != np.arange(self.n_nodes)
+        return [
+            np.unique(self.threshold[is_split & (self.feature == f)])
+            for f in range(self.n_features)
+        ]
+
+    def to_arrays(self):
+        """Return the forest as a dict of NumPy arrays (for np.savez / joblib)"""
+        return {
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'left': self.left,
+            'right': self.right,
+            'value': self.value,
+            'roots': self.roots,
+            'children': self.children,
+            'max_depth': np.array(self.max_depth),
+            'n_features': np.array(self.n_features),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild from to_arrays() output; memory-mapped arrays are used in place"""
+        return cls(
+            feature=arrays['feature'],
+            threshold=arrays['threshold'],
+            left=arrays['left'],
+            right=arrays['right'],
+            value=arrays['value'],
+            roots=arrays['roots'],
+            max_depth=int(arrays['max_depth']),
+            n_features=int(arrays['n_features']),
+            children=arrays.get('children'),
+        )
+
+    def apply(self, X):
+        """Return the leaf node index reached by every (row, tree) pair.
+
+        X must already hold float32-representable values as float64.
+        """
+        n_rows = X.shape[0]
+        X_flat = np.ascontiguousarray(X).ravel()
+        nodes = np.tile(self.roots, n_rows)
+        row_offsets = np.repeat(np.arange(n_rows) * self.n_features, self.n_trees)
+        for _ in range(self.max_depth):
+            x = np.take(X_flat, row_offsets + np.take(self.feature, nodes))
+            went_left = x <= np.take(self.threshold, nodes)
+            nodes = np.take(self.children, 2 * nodes + went_left)
+        return nodes.reshape(n_rows, self.n_trees)
+
+    def predict_exact(self, X):
+        """Predict for float64 rows without the float32 input cast"""
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], BLOCK_SIZE):
+            block = X[start:start + BLOCK_SIZE]
+            leaf_values = self.value[self.apply(block)]
+            # cumsum adds trees left to right, like sklearn's accumulation
+            out[start:start + BLOCK_SIZE] = np.cumsum(leaf_values, axis=1)[:, -1]
+        out /= self.n_trees
+        return out
+
+    def predict(self, X):
+        """Drop-in replacement for RandomForestRegressor.predict"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, but the forest expects {self.n_features}")
+        return self.predict_exact(X.astype(np.float64))
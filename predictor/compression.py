@@ -0,0 +1,226 @@
+"""Search for the smallest forest that keeps the full model's accuracy.
+
+The labels are a step function of a few binned features plus noise, so a
+100-tree, depth-15 forest mostly memorises noise. ``compress_forest`` looks
+for a smaller ensemble in two ways:
+
+* Grid: one forest is fitted for each ``max_depth`` x ``min_samples_leaf``
+  pair, and its first n trees are taken for each n in ``TREE_COUNTS``. The
+  trees are independent bootstraps, so a prefix is itself a valid forest.
+* Greedy dropping: starting from each fitted forest, the tree whose removal
+  hurts MAE on a separate tuning set the least is dropped, one at a time. The
+  surviving subset is recorded at each size in ``TREE_COUNTS``.
+
+Every candidate is scored on a selection set (never used for fitting or
+dropping). It is compiled to the serving ``CompiledForest`` and timed through
+``CibilScorePredictor.predict_score``, the single-request path. Candidates
+whose selection MAE is within ``mae_tolerance`` (a fraction) of the full
+model, and whose p99 latency fits ``latency_budget_ms``, are eligible. The
+smallest one, by artifact size, is chosen. When none is eligible,
+``CompressionError`` carries the full report and nothing should be published.
+
+The selection MAE picks the winner, so it is optimistic for that winner. The
+error to report comes from a further set that the search never sees
+(``ml_model.train_model`` uses its validation stream).
+"""
+
+import copy
+import pickle
+import time
+
+import numpy as np
+from sklearn.base import clone
+
+from .compiled_forest import CompiledForest
+
+DEPTHS = (6, 8, 10, 12, 15)
+LEAF_SIZES = (2, 5, 10, 20)
+TREE_COUNTS = (5, 10, 25, 50, 100)
+DEFAULT_MAE_TOLERANCE = 0.02
+LATENCY_REPEAT = 500       # timed predict_score calls per candidate
+LATENCY_WARMUP = 20
+
+
+class CompressionError(Exception):
+    """No candidate met the accuracy tolerance and the latency budget"""
+
+    def __init__(self, message, result):
+        super().__init__(message)
+        self.result = result
+
+
+class Candidate:
+    """One compressed forest and its serving cost"""
+
+    def __init__(self, model, selection, max_depth, min_samples_leaf):
+        self.model = model
+        self.selection = selection  # 'prefix' or 'greedy'
+        self.max_depth = max_depth
+        self.min_samples_leaf = min_samples_leaf
+        self.forest = CompiledForest.from_sklearn(model)
+        self.size_bytes = (len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+                           + sum(a.nbytes for a in self.forest.to_arrays().values()))
+        self.selection_mae = None
+        self.selection_r2 = None
+        self.p50_ms = None
+        self.p99_ms = None
+
+    @property
+    def n_trees(self):
+        return self.forest.n_trees
+
+    @property
+    def n_nodes(self):
+        return self.forest.n_nodes
+
+    def as_dict(self):
+        return {
+            'selection': self.selection,
+            'n_trees': self.n_trees,
+            'max_depth': self.max_depth,
+            'min_samples_leaf': self.min_samples_leaf,
+            'n_nodes': self.n_nodes,
+            'size_bytes': self.size_bytes,
+            'selection_mae': self.selection_mae,
+            'selection_r2': self.selection_r2,
+            'p50_ms': self.p50_ms,
+            'p99_ms': self.p99_ms,
+        }
+
+
+class CompressionResult:
+    def __init__(self, reference, candidates, mae_tolerance, latency_budget_ms):
+        self.reference = reference      # the full model, as a Candidate
+        self.candidates = candidates    # includes the reference
+        self.mae_tolerance = mae_tolerance
+        self.latency_budget_ms = latency_budget_ms
+        self.chosen = None
+
+    @property
+    def max_mae(self):
+        return self.reference.selection_mae * (1 + self.mae_tolerance)
+
+    def within_tolerance(self, candidate):
+        return candidate.selection_mae <= self.max_mae
+
+    def within_budget(self, candidate):
+        return self.latency_budget_ms is None or candidate.p99_ms <= self.latency_budget_ms
+
+    def summary(self):
+        """Chosen candidate and search settings, for the model metadata"""
+        return {
+            'mae_tolerance': self.mae_tolerance,
+            'latency_budget_ms': self.latency_budget_ms,
+            'n_candidates': len(self.candidates),
+            'reference': self.reference.as_dict(),
+            'chosen': self.chosen.as_dict() if self.chosen is not None else None,
+        }
+
+    def as_dict(self):
+        return {**self.summary(), 'candidates': [c.as_dict() for c in self.candidates]}
+
+
+def subset_forest(model, indices):
+    """A copy of a fitted RandomForestRegressor keeping only the given trees"""
+    subset = copy.copy(model)
+    subset.estimators_ = [model.estimators_[i] for i in indices]
+    subset.n_estimators = len(indices)
+    return subset
+
+
+def greedy_subsets(tree_predictions, y, sizes):
+    """Drop trees one by one, always the one whose removal gives the lowest MAE.
+
+    tree_predictions has one row of predictions (on the tuning set) per tree.
+    Returns {size: sorted tree indices} for each requested size below the
+    forest size.
+    """
+    kept = list(range(len(tree_predictions)))
+    total = tree_predictions.sum(axis=0)
+    subsets = {}
+    while len(kept) > min(sizes) and len(kept) > 1:
+        remaining = tree_predictions[kept]
+        maes = np.abs((total - remaining) / (len(kept) - 1) - y).mean(axis=1)
+        drop = int(np.argmin(maes))
+        total -= remaining[drop]
+        del kept[drop]
+        if len(kept) in sizes:
+            subsets[len(kept)] = list(kept)
+    return subsets
+
+
+def predict_score_latency(forest, rows, repeat=LATENCY_REPEAT):
+    """(p50, p99) milliseconds of predict_score served from forest"""
+    from .ml_model import CibilScorePredictor
+
+    # The serving path only: no model file, no score table
+    predictor = CibilScorePredictor.__new__(CibilScorePredictor)
+    predictor.forest = forest
+    predictor.table = None
+    for row in rows[:LATENCY_WARMUP]:
+        predictor.predict_score(*row)
+    samples = np.empty(repeat)
+    for i in range(repeat):
+        row = rows[i % len(rows)]
+        started = time.perf_counter()
+        predictor.predict_score(*row)
+        samples[i] = time.perf_counter() - started
+    p50, p99 = np.percentile(samples, [50, 99]) * 1000
+    return float(p50), float(p99)
+
+
+def _score(candidate, X_select, y_select, latency_rows):
+    predictions = candidate.forest.predict(X_select)
+    errors = predictions - y_select
+    candidate.selection_mae = float(np.abs(errors).mean())
+    candidate.selection_r2 = float(1 - (errors ** 2).sum() / ((y_select - y_select.mean()) ** 2).sum())
+    candidate.p50_ms, candidate.p99_ms = predict_score_latency(candidate.forest, latency_rows)
+
+
+def compress_forest(model, X, y, X_tune, y_tune, X_select, y_select,
+                    mae_tolerance=DEFAULT_MAE_TOLERANCE, latency_budget_ms=None, n_jobs=None,
+                    depths=DEPTHS, leaf_sizes=LEAF_SIZES, tree_counts=TREE_COUNTS, progress=None):
+    """Search smaller forests than model (fitted on X, y) and choose one.
+
+    Returns a CompressionResult whose ``chosen.model`` is ready to publish;
+    raises CompressionError if no candidate is eligible.
+    """
+    full_depth, full_leaf = model.max_depth, model.min_samples_leaf
+    n_max = max(tree_counts)
+    latency_rows = [list(row) for row in X_select[:LATENCY_REPEAT]]
+
+    reference = Candidate(model, 'full', full_depth, full_leaf)
+    _score(reference, X_select, y_select, latency_rows)
+    candidates = [reference]
+
+    for depth in depths:
+        for leaf in leaf_sizes:
+            if (depth, leaf) == (full_depth, full_leaf) and model.n_estimators == n_max:
+                forest = model
+            else:
+                forest = clone(model).set_params(
+                    n_estimators=n_max, max_depth=depth, min_samples_leaf=leaf, n_jobs=n_jobs)
+                forest.fit(X, y)
+                # Threaded predict sums the trees in a varying order; serve single-threaded
+                forest.set_params(n_jobs=None)
+
+            subsets = [('prefix', list(range(n))) for n in tree_counts if n <= len(forest.estimators_)]
+            tree_predictions = np.stack([tree.predict(X_tune) for tree in forest.estimators_])
+            subsets += [('greedy', kept) for _, kept in sorted(greedy_subsets(tree_predictions, y_tune, tree_counts).items())]
+
+            for selection, indices in subsets:
+                if forest is model and len(indices) == len(model.estimators_):
+                    continue  # the reference itself
+                candidate = Candidate(subset_forest(forest, indices), selection, depth, leaf)
+                _score(candidate, X_select, y_select, latency_rows)
+                candidates.append(candidate)
+            if progress:
+                progress(depth, leaf, len(candidates))
+
+    result = CompressionResult(reference, candidates, mae_tolerance, latency_budget_ms)
+    eligible = [c for c in candidates if result.within_tolerance(c) and result.within_budget(c)]
+    if not eligible:
+        raise CompressionError(
+            f"No candidate has selection MAE <= {result.max_mae:.2f} and p99 <= {latency_budget_ms} ms", result)
+    result.chosen = min(eligible, key=lambda c: (c.size_bytes, c.selection_mae))
+    return result
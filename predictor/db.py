@@ -0,0 +1,18 @@
+"""Database alias selection for read-heavy, non-critical queries."""
+
+from django.conf import settings
+from django.contrib.admin.views.main import ChangeList
+
+from cibil_prediction.database import READ_ALIAS
+
+
+def read_alias():
+    """'read' (the replica from DATABASE_READ_URL) if configured, else 'default'"""
+    return READ_ALIAS if READ_ALIAS in settings.DATABASES else 'default'
+
+
+class ReadAliasChangeList(ChangeList):
+    """Admin changelist whose listing queries go to read_alias(); edits still use default"""
+
+    def get_queryset(self, request, *args, **kwargs):
+        return super().get_queryset(request, *args, **kwargs).using(read_alias())
@@ -0,0 +1,53 @@
+"""Bounded thread pool for CPU-bound inference called from async views.
+
+``InferenceExecutor`` caps the number of tasks that are running or queued.
+When the cap is reached, ``try_submit`` raises ``ExecutorOverloaded`` right
+away, and the caller can shed the request (503 + Retry-After) instead of
+letting work pile up behind a busy model.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+class ExecutorOverloaded(Exception):
+    """All inference slots are taken"""
+
+
+class InferenceExecutor:
+    def __init__(self, max_workers=4, max_pending=64):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def try_submit(self, fn, *args, **kwargs):
+        """Submit fn or raise ExecutorOverloaded if max_pending tasks are in flight"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ExecutorOverloaded()
+        try:
+            future = self._get_executor().submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='inference')
+        return self._executor
+
+
+inference_executor = InferenceExecutor(
+    max_workers=getattr(settings, 'CIBIL_INFERENCE_WORKERS', 4),
+    max_pending=getattr(settings, 'CIBIL_INFERENCE_MAX_PENDING', 64),
+)
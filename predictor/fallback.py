@@ -0,0 +1,33 @@
+"""Rule-based scoring used while no trained model file is available.
+
+Requests never train a model (see ``manage.py train_model``). Until a model
+has been published, ``ModelRegistry`` serves ``RuleBasedPredictor``. It
+applies the labelling rules from ``training_data`` that the forest is trained
+on, without their noise. That costs a few NumPy operations per batch and
+gives scores of the same shape. ``is_fallback`` is set so that callers,
+logs and ``/metrics`` can tell the two apart.
+"""
+
+import numpy as np
+
+from .ml_model import FEATURES
+from .training_data import extended_scores
+
+
+class RuleBasedPredictor:
+    """Same predict_score / predict_batch interface as CibilScorePredictor"""
+
+    is_fallback = True
+    forest = None
+    table = None
+    metadata = {'fallback': 'training_data.extended_scores'}
+
+    def predict_score(self, age, service_years, monthly_income, loan_amount, existing_loans):
+        return int(self.predict_batch([[age, service_years, monthly_income, loan_amount, existing_loans]])[0])
+
+    def predict_batch(self, features):
+        features = np.asarray(features, dtype=float).reshape(-1, len(FEATURES))
+        if len(features) == 0:
+            return np.empty(0, dtype=int)
+        age, service_years, monthly_income, loan_amount, existing_loans = features.T
+        return extended_scores(age, service_years, monthly_income, loan_amount, existing_loans, noise=0)
@@ -0,0 +1,97 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SOURCE_IMAGE = 'your_scenic_image.jpg'
+OUTPUT_NAME = 'img/scenic-{width}.{ext}'
+STYLESHEET = 'css/scenic.css'
+WIDTHS = (960, 1600, 2560)  # small screens, default, large or high-DPI screens
+
+# (extension, MIME type, Pillow format, save options), best compression first
+FORMATS = (
+    ('avif', 'image/avif', 'AVIF', {'quality': 50, 'speed': 4}),
+    ('webp', 'image/webp', 'WEBP', {'quality': 75, 'method': 6}),
+    ('jpg', 'image/jpeg', 'JPEG', {'quality': 80, 'optimize': True, 'progressive': True}),
+)
+
+
+def background_rule(width, formats, indent=''):
+    """CSS declarations for the scenic background at one width"""
+    urls = [(f"url('../{OUTPUT_NAME.format(width=width, ext=ext)}')", mime) for ext, mime in formats]
+    candidates = ', '.join(f"{url} type('{mime}')" for url, mime in urls)
+    return (
+        # Browsers without image-set() keep the JPEG from the first declaration
+        f"{indent}    background-image: {urls[-1][0]};\n"
+        f"{indent}    background-image: image-set({candidates});\n"
+    )
+
+
+def scenic_stylesheet(formats):
+    small, default, large = WIDTHS
+    return (
+        f"/* Generated by `manage.py build_assets` from {SOURCE_IMAGE}; do not edit. */\n"
+        "body, html {\n"
+        "    background: center/cover no-repeat;\n"
+        f"{background_rule(default, formats)}"
+        "}\n"
+        f"@media (max-width: {small}px) {{\n"
+        "    body, html {\n"
+        f"{background_rule(small, formats, '    ')}"
+        "    }\n"
+        "}\n"
+        f"@media (min-width: {default + 1}px), (min-width: {small + 1}px) and (min-resolution: 2dppx) {{\n"
+        "    body, html {\n"
+        f"{background_rule(large, formats, '    ')}"
+        "    }\n"
+        "}\n"
+    )
+
+
+class Command(BaseCommand):
+    help = "Build resized WebP/AVIF/JPEG variants of the background image and the stylesheet that serves them"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--static-dir', default=str(settings.STATICFILES_DIRS[0]),
+                            help='source static directory; variants are written next to the original')
+
+    def handle(self, *args, **options):
+        try:
+            from PIL import Image, features
+        except ImportError:
+            raise CommandError("Building image variants requires Pillow (pip install Pillow)")
+
+        static_dir = options['static_dir']
+        source_path = os.path.join(static_dir, SOURCE_IMAGE)
+        if not os.path.exists(source_path):
+            raise CommandError(f"{source_path} does not exist")
+
+        formats = []
+        for ext, mime, pillow_format, save_options in FORMATS:
+            if ext != 'jpg' and not features.check(ext):
+                self.stderr.write(self.style.WARNING(f"Pillow was built without {pillow_format} support; skipping .{ext}"))
+                continue
+            formats.append((ext, mime, pillow_format, save_options))
+
+        with Image.open(source_path) as source:
+            source = source.convert('RGB')
+            for width in WIDTHS:
+                height = round(source.height * width / source.width)
+                resized = source.resize((width, height), Image.Resampling.LANCZOS)
+                for ext, _, pillow_format, save_options in formats:
+                    name = OUTPUT_NAME.format(width=width, ext=ext)
+                    path = os.path.join(static_dir, name)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    resized.save(path, pillow_format, **save_options)
+                    self.stdout.write(f"{name}: {os.path.getsize(path) / 1024:,.0f} KiB")
+
+        stylesheet_path = os.path.join(static_dir, STYLESHEET)
+        os.makedirs(os.path.dirname(stylesheet_path), exist_ok=True)
+        with open(stylesheet_path, 'w') as f:
+            f.write(scenic_stylesheet([(ext, mime) for ext, mime, _, _ in formats]))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(WIDTHS) * len(formats)} image variants and {STYLESHEET} "
+            f"(original {os.path.getsize(source_path) / 1024:,.0f} KiB)"
+        ))
+        self.stdout.write("Run `manage.py collectstatic` to hash and precompress them.")
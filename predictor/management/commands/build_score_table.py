@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from predictor.ml_model import MODEL_PATH, CibilScorePredictor
+from predictor.score_table import DEFAULT_MAX_CELLS, ScoreTable, table_paths
+
+
+class Command(BaseCommand):
+    help = "Precompute the dense score lookup table for the current model"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=MODEL_PATH, help='model file to build the table for')
+        parser.add_argument('--max-cells', type=int, default=DEFAULT_MAX_CELLS,
+                            help='refuse to build grids larger than this many cells')
+
+    def handle(self, *args, **options):
+        predictor = CibilScorePredictor(options['model'])
+        forest = predictor.forest
+        counts = ', '.join(str(len(t)) for t in forest.thresholds_by_feature())
+        self.stdout.write(f"Distinct thresholds per feature: {counts}")
+
+        started = time.monotonic()
+        try:
+            table = ScoreTable.build(forest, max_cells=options['max_cells'])
+        except ValueError as e:
+            raise CommandError(f"{e}. Use a smaller model or raise --max-cells.")
+        table.save(predictor.model_path)
+
+        grid_path, _ = table_paths(predictor.model_path)
+        self.stdout.write(self.style.SUCCESS(
+            f"Built {table.grid.size:,}-cell table {table.grid.shape} in {time.monotonic() - started:.1f}s "
+            f"({table.grid.nbytes / 1e6:.1f} MB) at {grid_path}"
+        ))
+        self.stdout.write("Running workers switch to it within CIBIL_MODEL_CHECK_INTERVAL seconds.")
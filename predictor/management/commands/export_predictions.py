@@ -0,0 +1,52 @@
+import datetime
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from predictor.export import DEFAULT_PAGE_SIZE, FORMATS, export_chunks, filtered_predictions
+
+
+def _date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}; use YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = "Stream CibilPrediction history to a CSV or NDJSON file in (created_at, id) order"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="file to write, or '-' for stdout")
+        parser.add_argument('--format', choices=FORMATS,
+                            help='output format (default: from the file extension, else csv)')
+        parser.add_argument('--since', help='first local date to include (YYYY-MM-DD)')
+        parser.add_argument('--until', help='last local date to include (YYYY-MM-DD)')
+        parser.add_argument('--min-score', type=int, help='lowest predicted score to include')
+        parser.add_argument('--max-score', type=int, help='highest predicted score to include')
+        parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help='rows per keyset page')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        export_format = options['format'] or ('ndjson' if output.endswith(('.ndjson', '.jsonl')) else 'csv')
+        if options['page_size'] < 1:
+            raise CommandError("--page-size must be at least 1")
+        queryset = filtered_predictions(
+            since=_date(options['since']) if options['since'] else None,
+            until=_date(options['until']) if options['until'] else None,
+            min_score=options['min_score'],
+            max_score=options['max_score'],
+        )
+
+        started = time.monotonic()
+        out = sys.stdout if output == '-' else open(output, 'w', newline='', encoding='utf-8')
+        try:
+            for chunk in export_chunks(export_format, queryset, options['page_size']):
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        if output != '-':
+            self.stdout.write(self.style.SUCCESS(
+                f"Exported to {output} ({export_format}) in {time.monotonic() - started:.1f}s"))
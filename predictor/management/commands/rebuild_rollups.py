@@ -0,0 +1,31 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from predictor.rollups import rebuild_rollups
+
+
+def _date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}; use YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = "Backfill or repair the daily prediction rollups from the CibilPrediction table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='first local date to rebuild (YYYY-MM-DD); default: all history')
+        parser.add_argument('--until', help='last local date to rebuild (YYYY-MM-DD); default: all days')
+
+    def handle(self, *args, **options):
+        since = _date(options['since']) if options['since'] else None
+        until = _date(options['until']) if options['until'] else None
+        if since and until and since > until:
+            raise CommandError("--since must not be after --until")
+
+        started = time.monotonic()
+        days = rebuild_rollups(since, until)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rollups for {days} day(s) in {time.monotonic() - started:.1f}s"))
@@ -0,0 +1,214 @@
+import csv
+import itertools
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+RESULT_COLUMNS = ['predicted_score', 'score_category', 'banks', 'error']
+
+
+def read_csv_chunks(path, chunk_size, skip_rows):
+    """Yield (fieldnames, list-of-dicts) chunks from a CSV file"""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        rows = itertools.islice(reader, skip_rows, None)
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield reader.fieldnames, chunk
+
+
+def read_parquet_chunks(path, chunk_size, skip_rows):
+    """Yield (fieldnames, list-of-dicts) chunks from a Parquet file"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise CommandError("Reading Parquet files requires pyarrow (pip install pyarrow)")
+
+    parquet_file = pq.ParquetFile(path)
+    fieldnames = parquet_file.schema_arrow.names
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        rows = batch.to_pylist()
+        if skip_rows >= len(rows):
+            skip_rows -= len(rows)
+            continue
+        rows, skip_rows = rows[skip_rows:], 0
+        yield fieldnames, rows
+
+
+def _init_worker():
+    """Load Django, the model and the bank rules once per worker process"""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cibil_prediction.settings')
+        django.setup()
+
+    from predictor.banks import get_bank_index
+    from predictor.registry import get_predictor
+    get_predictor()
+    get_bank_index()
+
+
+def _score_chunk(fieldnames, rows):
+    """Score one chunk; returns output rows in input order"""
+    from predictor.banks import get_bank_index, match_banks
+    from predictor.registry import get_predictor
+    from predictor.views import applicant_features, get_score_category, validate_applicant
+
+    applicants = []
+    errors = []
+    for row in rows:
+        try:
+            applicants.append(validate_applicant(row))
+            errors.append('')
+        except (TypeError, ValueError) as ve:
+            applicants.append(None)
+            errors.append(str(ve))
+
+    valid = [a for a in applicants if a is not None]
+    features = [applicant_features(a) for a in valid]
+    scores = get_predictor().predict_batch(features)
+    # Bank eligibility for the whole chunk in one vectorized pass
+    matches = match_banks(
+        get_bank_index(),
+        scores,
+        [a['desired_loan_amount'] for a in valid],
+        [a['monthly_income'] for a in valid],
+    )
+    scores = scores.tolist()
+
+    output = []
+    position = 0
+    for row, applicant, error in zip(rows, applicants, errors):
+        values = [row.get(name, '') for name in fieldnames]
+        if applicant is None:
+            output.append(values + ['', '', '', error])
+            continue
+        score = scores[position]
+        bank_matches = ';'.join(f"{rule.short_name}:{amount}" for rule, amount, _ in matches.matches(position))
+        output.append(values + [score, get_score_category(score), bank_matches, ''])
+        position += 1
+    return output
+
+
+class Command(BaseCommand):
+    help = "Score a CSV or Parquet file of applicants and write the results to a CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='CSV or Parquet file with age, monthly_income, '
+                                          'desired_loan_amount and existing_loans columns')
+        parser.add_argument('output', help='CSV file to write results to')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='rows per work unit')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='worker processes (1 scores in-process)')
+        parser.add_argument('--resume', action='store_true',
+                            help='continue from the checkpoint left by an interrupted run')
+
+    def handle(self, *args, **options):
+        input_path = options['input']
+        output_path = options['output']
+        chunk_size = options['chunk_size']
+        workers = max(1, options['workers'])
+        checkpoint_path = output_path + '.checkpoint'
+
+        if not os.path.exists(input_path):
+            raise CommandError(f"Input file not found: {input_path}")
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1")
+        from predictor.registry import get_predictor
+        if get_predictor().is_fallback:
+            raise CommandError("No trained model available; run `manage.py train_model` first")
+
+        checkpoint = self.load_checkpoint(checkpoint_path, input_path) if options['resume'] else None
+        rows_done = checkpoint['rows_done'] if checkpoint else 0
+
+        if input_path.lower().endswith(('.parquet', '.pq')):
+            chunks = read_parquet_chunks(input_path, chunk_size, rows_done)
+        else:
+            chunks = read_csv_chunks(input_path, chunk_size, rows_done)
+
+        if checkpoint:
+            # Drop anything written after the last completed chunk
+            with open(output_path, 'r+b') as f:
+                f.truncate(checkpoint['output_bytes'])
+            self.stdout.write(f"Resuming after {rows_done} rows")
+
+        out = open(output_path, 'a' if checkpoint else 'w', newline='', encoding='utf-8')
+        writer = csv.writer(out)
+        header_written = checkpoint is not None
+        started = time.monotonic()
+        rows_this_run = 0
+
+        # Workers must not share the parent's database connections
+        connections.close_all()
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker) if workers > 1 else None
+        if executor is None:
+            _init_worker()
+
+        try:
+            for fieldnames, results in self.run_chunks(executor, workers, chunks):
+                if not header_written:
+                    writer.writerow(list(fieldnames) + RESULT_COLUMNS)
+                    header_written = True
+                writer.writerows(results)
+                out.flush()
+
+                rows_done += len(results)
+                rows_this_run += len(results)
+                self.save_checkpoint(checkpoint_path, {
+                    'input': os.path.abspath(input_path),
+                    'rows_done': rows_done,
+                    'output_bytes': out.tell(),
+                })
+                elapsed = time.monotonic() - started
+                self.stdout.write(f"{rows_done} rows scored ({rows_this_run / elapsed:,.0f} rows/sec)")
+        finally:
+            out.close()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {rows_this_run} rows in {elapsed:.1f}s, results in {output_path}"
+        ))
+
+    def run_chunks(self, executor, workers, chunks):
+        """Yield (fieldnames, results) in input order with a bounded number of chunks in flight"""
+        if executor is None:
+            for fieldnames, rows in chunks:
+                yield fieldnames, _score_chunk(fieldnames, rows)
+            return
+
+        pending = deque()
+        for fieldnames, rows in chunks:
+            pending.append((fieldnames, executor.submit(_score_chunk, fieldnames, rows)))
+            if len(pending) >= workers * 2:
+                fieldnames, future = pending.popleft()
+                yield fieldnames, future.result()
+        while pending:
+            fieldnames, future = pending.popleft()
+            yield fieldnames, future.result()
+
+    def load_checkpoint(self, checkpoint_path, input_path):
+        if not os.path.exists(checkpoint_path):
+            raise CommandError(f"No checkpoint found at {checkpoint_path}")
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+        if checkpoint['input'] != os.path.abspath(input_path):
+            raise CommandError(f"Checkpoint belongs to {checkpoint['input']}, not {input_path}")
+        return checkpoint
+
+    def save_checkpoint(self, checkpoint_path, state):
+        tmp_path = checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, checkpoint_path)
@@ -0,0 +1,118 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from predictor.artifact import model_file_lock
+from predictor.compression import DEFAULT_MAE_TOLERANCE, CompressionError
+from predictor.ml_model import MODEL_PATH, CibilScorePredictor
+from predictor.training_data import DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Train the CIBIL model and publish it atomically; running workers hot-swap to it"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=MODEL_PATH, help='model file to publish')
+        parser.add_argument('--n-samples', type=int, default=5000, help='synthetic training rows')
+        parser.add_argument('--seed', type=int, default=42, help='training data seed')
+        parser.add_argument('--n-jobs', type=int, default=-1,
+                            help='parallel tree fitting (-1 = all cores); the fitted model is identical')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help='rows generated per block of training data')
+        parser.add_argument('--metrics-file', help='also write the training metadata to this JSON file')
+        parser.add_argument('--compress', action='store_true',
+                            help='search smaller forests and publish the smallest one within the limits below')
+        parser.add_argument('--mae-tolerance', type=float, default=DEFAULT_MAE_TOLERANCE,
+                            help='allowed selection-set MAE increase over the full model, as a fraction')
+        parser.add_argument('--latency-budget-ms', type=float,
+                            help='p99 predict_score latency the published forest must meet')
+        parser.add_argument('--compression-report', help='write every compression candidate to this JSON file')
+
+    def handle(self, *args, **options):
+        if options['n_samples'] < 1:
+            raise CommandError("--n-samples must be at least 1")
+        if options['mae_tolerance'] < 0:
+            raise CommandError("--mae-tolerance must not be negative")
+        if options['latency_budget_ms'] is not None and options['latency_budget_ms'] <= 0:
+            raise CommandError("--latency-budget-ms must be positive")
+        output = os.path.abspath(options['output'])
+
+        # Skip __init__: there may be no model to load yet, and we are about to replace it
+        trainer = CibilScorePredictor.__new__(CibilScorePredictor)
+        trainer.model_path = output
+
+        compression = None
+        if options['compress']:
+            compression = {
+                'mae_tolerance': options['mae_tolerance'],
+                'latency_budget_ms': options['latency_budget_ms'],
+                'progress': lambda depth, leaf, n: self.stdout.write(
+                    f"  max_depth={depth} min_samples_leaf={leaf}: {n} candidates so far"),
+            }
+
+        started = time.monotonic()
+        # One trainer at a time per file; readers are never blocked (the file is renamed into place)
+        try:
+            with model_file_lock(output):
+                trainer.train_model(
+                    n_samples=options['n_samples'],
+                    seed=options['seed'],
+                    chunk_size=options['chunk_size'],
+                    n_jobs=options['n_jobs'],
+                    compression=compression,
+                )
+        except CompressionError as e:
+            self.report_compression(e.result, options['compression_report'])
+            raise CommandError(f"{e}; nothing published")
+        if trainer.compression is not None:
+            self.report_compression(trainer.compression, options['compression_report'])
+
+        metadata = trainer.metadata
+        metrics = metadata['metrics']
+        self.stdout.write(
+            f"Trained on {metadata['n_samples']:,} rows in {time.monotonic() - started:.1f}s - "
+            f"train MAE {metrics['train_mae']:.2f}, R² {metrics['train_r2']:.3f}; "
+            f"validation MAE {metrics['validation_mae']:.2f}, R² {metrics['validation_r2']:.3f}"
+        )
+        if options['metrics_file']:
+            with open(options['metrics_file'], 'w') as f:
+                json.dump(metadata, f, indent=2, default=str)
+                f.write('\n')
+
+        self.stdout.write(self.style.SUCCESS(f"Published {output}"))
+        self.stdout.write("Running workers switch to it within CIBIL_MODEL_CHECK_INTERVAL seconds.")
+
+    def report_compression(self, result, report_file):
+        self.stdout.write(
+            f"\n{'':2}{'selection':<9} {'trees':>5} {'depth':>5} {'leaf':>4} {'nodes':>8} {'size KB':>8} "
+            f"{'p50 ms':>7} {'p99 ms':>7} {'sel MAE':>7} {'vs full':>8}"
+        )
+        reference_mae = result.reference.selection_mae
+        for c in sorted(result.candidates, key=lambda c: c.size_bytes):
+            marker = '*' if c is result.chosen else ' '
+            notes = []
+            if not result.within_tolerance(c):
+                notes.append('inaccurate')
+            if not result.within_budget(c):
+                notes.append('too slow')
+            self.stdout.write(
+                f"{marker:<2}{c.selection:<9} {c.n_trees:>5} {c.max_depth:>5} {c.min_samples_leaf:>4} "
+                f"{c.n_nodes:>8,} {c.size_bytes / 1024:>8,.0f} {c.p50_ms:>7.3f} {c.p99_ms:>7.3f} "
+                f"{c.selection_mae:>7.2f} {c.selection_mae / reference_mae - 1:>+8.1%}  {', '.join(notes)}"
+            )
+        budget = f"{result.latency_budget_ms} ms" if result.latency_budget_ms is not None else 'none'
+        self.stdout.write(f"Selection MAE limit {result.max_mae:.2f} (full model {reference_mae:.2f} "
+                          f"+{result.mae_tolerance:.0%}), p99 budget {budget}")
+        if result.chosen is not None:
+            chosen, full = result.chosen, result.reference
+            self.stdout.write(
+                f"Chosen: {chosen.n_trees} trees, max_depth {chosen.max_depth}, min_samples_leaf "
+                f"{chosen.min_samples_leaf} ({chosen.selection}) - {full.size_bytes / chosen.size_bytes:.1f}x "
+                f"smaller, p99 {full.p99_ms:.3f} -> {chosen.p99_ms:.3f} ms\n"
+            )
+        if report_file:
+            with open(report_file, 'w') as f:
+                json.dump(result.as_dict(), f, indent=2)
+                f.write('\n')
@@ -0,0 +1,151 @@
+"""In-process timing histograms rendered in the Prometheus text format.
+
+``span('inference')`` times a block of code into the ``cibil_span_seconds``
+histogram. ``MetricsMiddleware`` times whole requests into
+``cibil_request_seconds``. ``metrics.render()`` produces the text served at
+``/metrics``.
+
+An observation is one bisect over fixed buckets plus three additions under
+a lock, cheap enough for every request. Values are per process: with several
+server workers, Prometheus scrapes each one and aggregates.
+
+This module only needs the standard library, so ``ml_model`` can use spans
+outside Django (benchmarks, management commands).
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+# Seconds; covers a single compiled-forest prediction up to a model retrain
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Histogram:
+    """Bucket counts, sum and count for one label combination"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        """(cumulative bucket counts, sum, count)"""
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative, running = [], 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+        return cumulative, total, count
+
+
+class HistogramFamily:
+    """A named histogram with one Histogram per label combination"""
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            with self._lock:
+                child = self._children.setdefault(values, Histogram(self.buckets))
+        return child
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        bounds = [repr(float(b)) for b in self.buckets] + ['+Inf']
+        for values, child in sorted(self._children.items()):
+            pairs = list(zip(self.label_names, values))
+            cumulative, total, count = child.snapshot()
+            for bound, c in zip(bounds, cumulative):
+                lines.append(f'{self.name}_bucket{_format_labels(pairs + [("le", bound)])} {c}')
+            lines.append(f'{self.name}_sum{_format_labels(pairs)} {total!r}')
+            lines.append(f'{self.name}_count{_format_labels(pairs)} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """Histograms plus callback gauges/counters, rendered together for /metrics"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._callbacks = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        """Return the histogram family called name, creating it on first use"""
+        with self._lock:
+            family = self._histograms.get(name)
+            if family is None:
+                family = self._histograms[name] = HistogramFamily(name, help_text, label_names, buckets)
+            return family
+
+    def callback(self, name, help_text, fn, kind='gauge'):
+        """Report fn() as a gauge (or counter) each time metrics are rendered"""
+        with self._lock:
+            self._callbacks[name] = (help_text, fn, kind)
+
+    def render(self):
+        lines = []
+        for family in list(self._histograms.values()):
+            lines.extend(family.render())
+        for name, (help_text, fn, kind) in list(self._callbacks.items()):
+            try:
+                value = fn()
+            except Exception:
+                continue
+            lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {value}'])
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+span_seconds = metrics.histogram(
+    'cibil_span_seconds', 'Time spent in instrumented sections of the request path', ('span',),
+)
+
+
+class span:
+    """Context manager timing its block into cibil_span_seconds{span=name}"""
+
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, name):
+        self.histogram = span_seconds.labels(name)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
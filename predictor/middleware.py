@@ -0,0 +1,82 @@
+"""Request timing and opt-in per-request profiling.
+
+``MetricsMiddleware`` records every request's duration in the
+``cibil_request_seconds`` histogram, labelled by view name, method and status.
+
+When ``CIBIL_PROFILING`` is on (it defaults to ``DEBUG``), a sync request
+sent with the ``X-Cibil-Profile: 1`` header runs under ``cProfile``. The
+stats are written to ``CIBIL_PROFILE_DIR``, the top functions by cumulative
+time are logged, and the file path is returned in the ``X-Cibil-Profile-File``
+response header. Keep profiling off in production.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import tempfile
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'HTTP_X_CIBIL_PROFILE'
+
+request_seconds = metrics.histogram(
+    'cibil_request_seconds', 'Request duration from middleware entry to response', ('view', 'method', 'status'),
+)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.profiling = getattr(settings, 'CIBIL_PROFILING', settings.DEBUG)
+        self.profile_dir = getattr(settings, 'CIBIL_PROFILE_DIR', None) or os.path.join(
+            tempfile.gettempdir(), 'cibil-profiles')
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        if self.profiling and request.META.get(PROFILE_HEADER):
+            response = self._profile(request)
+        else:
+            response = self.get_response(request)
+        self._record(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        # cProfile cannot follow a coroutine across awaits; async requests are only timed
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._record(request, response, started)
+        return response
+
+    def _record(self, request, response, started):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match is not None else 'unmatched'
+        request_seconds.labels(view, request.method, str(response.status_code)).observe(
+            time.perf_counter() - started)
+
+    def _profile(self, request):
+        profiler = cProfile.Profile()
+        response = profiler.runcall(self.get_response, request)
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{id(request):x}.prof")
+        profiler.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(15)
+        logger.info(f"Profile of {request.method} {request.path} saved to {path}\n{summary.getvalue()}")
+        response['X-Cibil-Profile-File'] = path
+        return response
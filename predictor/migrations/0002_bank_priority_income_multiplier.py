@@ -0,0 +1,51 @@
+from django.db import migrations, models
+
+
+# Lenders previously hard-coded in predictor.views.get_suitable_banks
+DEFAULT_BANKS = [
+    ('State Bank of India', 'SBI', 650, 15000000, 8.50, 1, 60),
+    ('HDFC Bank', 'HDFC', 720, 20000000, 8.65, 2, 80),
+    ('ICICI Bank', 'ICICI', 700, 18000000, 8.75, 3, 75),
+    ('Axis Bank', 'AXIS', 680, 12000000, 9.00, 4, 65),
+    ('Cooperative Bank', 'COOP', 600, 5000000, 9.50, 5, 40),
+]
+
+
+def seed_banks(apps, schema_editor):
+    Bank = apps.get_model('predictor', 'Bank')
+    db_alias = schema_editor.connection.alias
+    if Bank.objects.using(db_alias).exists():
+        return
+    Bank.objects.using(db_alias).bulk_create([
+        Bank(
+            name=name,
+            short_name=short_name,
+            min_cibil_score=min_score,
+            max_loan_amount=max_amount,
+            interest_rate=interest_rate,
+            priority=priority,
+            income_multiplier=income_multiplier,
+        )
+        for name, short_name, min_score, max_amount, interest_rate, priority, income_multiplier in DEFAULT_BANKS
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictor', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bank',
+            name='priority',
+            field=models.IntegerField(default=10),
+        ),
+        migrations.AddField(
+            model_name='bank',
+            name='income_multiplier',
+            field=models.FloatField(default=60),
+        ),
+        migrations.RunPython(seed_banks, migrations.RunPython.noop),
+    ]
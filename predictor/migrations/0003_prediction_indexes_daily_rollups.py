@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictor', '0002_bank_priority_income_multiplier'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyPredictionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('count', models.IntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('monthly_income_sum', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('desired_loan_amount_sum', models.DecimalField(decimal_places=2, default=0, max_digits=22)),
+                ('excellent', models.IntegerField(default=0)),
+                ('very_good', models.IntegerField(default=0)),
+                ('good', models.IntegerField(default=0)),
+                ('fair', models.IntegerField(default=0)),
+                ('poor', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyScoreBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bucket', models.IntegerField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='cibilprediction',
+            index=models.Index(fields=['created_at', 'id'], name='cibilpred_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cibilprediction',
+            index=models.Index(fields=['predicted_score', 'created_at'], name='cibilpred_score_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cibilprediction',
+            index=models.Index(fields=['existing_loans', 'created_at'], name='cibilpred_loans_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyscorebucket',
+            constraint=models.UniqueConstraint(fields=('date', 'bucket'), name='dailyscorebucket_date_bucket_uniq'),
+        ),
+    ]
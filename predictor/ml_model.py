@@ -1,89 +1,191 @@
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-import pickle
+import datetime
+import logging
 import os
+import time
+
+from .artifact import Artifact, ModelArtifactError, model_file_lock, read_artifact, write_artifact
+from .compiled_forest import CompiledForest
+from .metrics import span
+from .score_table import ScoreTable
+from .training_data import DEFAULT_CHUNK_SIZE, extended_chunk, generate_training_data
+
+logger = logging.getLogger(__name__)
+
+# Resolved relative to this file so loading does not depend on the working directory
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cibil_model.pkl')
+
+# Column order of the feature matrix; stored in the artifact and checked on load
+FEATURES = ('age', 'service_years', 'monthly_income', 'loan_amount', 'existing_loans')
+
+# Up to this many rows the compiled forest beats sklearn's per-call overhead;
+# larger batches go to sklearn's Cython tree walk (both give identical output)
+COMPILED_MAX_ROWS = 256
 
 class CibilScorePredictor:
-    def __init__(self):
-        self.model = None
-        self.load_or_train_model()
+    is_fallback = False
+    
+    def __init__(self, model_path=MODEL_PATH, train_if_missing=True):
+        self.artifact = None
+        self.metadata = {}
+        self.forest = None  # flat-array copy of self.model used for inference
+        self.table = None  # optional precomputed ScoreTable (manage.py build_score_table)
+        self.model_path = model_path
+        self.load_or_train_model(train_if_missing)
     
-    def load_or_train_model(self):
-        model_path = 'predictor/cibil_model.pkl'
-        if os.path.exists(model_path):
-            with open(model_path, 'rb') as f:
-                self.model = pickle.load(f)
-        else:
+    def load_or_train_model(self, train_if_missing=True):
+        """Load the model file; without train_if_missing, errors propagate instead of training"""
+        with span('model_load'):
+            if train_if_missing:
+                self._load_or_train_model()
+            else:
+                self.load_model()
+    
+    def _load_or_train_model(self):
+        try:
+            self.load_model()
+            return
+        except FileNotFoundError:
+            logger.info("No existing model found, training new one...")
+        except ModelArtifactError as e:
+            logger.warning(f"Model file unusable ({e}), training new one...")
+        
+        # Only one process trains; the others wait here and then load its result
+        with model_file_lock(self.model_path):
+            try:
+                self.load_model()
+                return
+            except (FileNotFoundError, ModelArtifactError):
+                pass
             self.train_model()
     
-    def train_model(self):
-        # Synthetic training data for demonstration
+    @property
+    def model(self):
+        """The sklearn estimator, unpickled from the artifact on first use"""
+        return self.artifact.load_model() if self.artifact is not None else None
+    
+    def load_model(self):
+        """Load the artifact at model_path (raises FileNotFoundError / ModelArtifactError)"""
+        self.artifact = read_artifact(self.model_path, FEATURES)
+        self.metadata = self.artifact.metadata
+        self.forest = self.artifact.forest
+        self.table = ScoreTable.load(self.model_path, self.artifact.forest_fingerprint)
+    
+    def train_model(self, n_samples=5000, seed=42, chunk_size=DEFAULT_CHUNK_SIZE, n_jobs=None, compression=None):
+        """Train a realistic CIBIL score prediction model and publish it atomically.
+
+        compression: keyword arguments for compression.compress_forest to
+        publish the smallest forest within its accuracy and latency limits
+        (the search result is kept in self.compression); None publishes the
+        full forest.
+        """
+        # Serving only needs the compiled forest; scikit-learn takes over a second to import
+        import sklearn
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.metrics import mean_absolute_error, r2_score
+        
+        logger.info("Training CIBIL prediction model...")
+        started = time.perf_counter()
+        
+        # Generate synthetic but realistic training data
         # In real project, use actual CIBIL dataset
-        np.random.seed(42)
-        n_samples = 1000
+        X, y = generate_training_data(extended_chunk, n_samples, seed=seed, chunk_size=chunk_size)
+        # Held-out rows from an independent stream, for metrics only
+        X_val, y_val = generate_training_data(extended_chunk, max(1000, n_samples // 5), seed=seed + 1,
+                                              chunk_size=chunk_size)
         
-        # Generate synthetic features
-        age = np.random.randint(18, 70, n_samples)
-        income = np.random.randint(20000, 200000, n_samples)
-        loan_amount = np.random.randint(100000, 5000000, n_samples)
-        existing_loans = np.random.randint(0, 5, n_samples)
+        # Train the model; each tree has its own seed, so n_jobs does not change the result
+        model = RandomForestRegressor(
+            n_estimators=100,
+            max_depth=15,
+            min_samples_split=5,
+            min_samples_leaf=2,
+            random_state=42,
+            n_jobs=n_jobs,
+        )
+        model.fit(X, y)
+        # Threaded predict sums the trees in a varying order; serve single-threaded
+        model.set_params(n_jobs=None)
         
-        # Create synthetic CIBIL scores based on realistic rules
-        scores = []
-        for i in range(n_samples):
-            base_score = 500
-            
-            # Income factor (higher income = better score)
-            if income[i] > 100000:
-                base_score += 150
-            elif income[i] > 50000:
-                base_score += 100
-            elif income[i] > 30000:
-                base_score += 50
-            
-            # Age factor (stable age = better score)
-            if 25 <= age[i] <= 50:
-                base_score += 100
-            elif age[i] > 50:
-                base_score += 80
-            
-            # Loan burden factor
-            loan_to_income_ratio = loan_amount[i] / (income[i] * 12)
-            if loan_to_income_ratio < 3:
-                base_score += 80
-            elif loan_to_income_ratio < 5:
-                base_score += 40
-            else:
-                base_score -= 50
-            
-            # Existing loans factor
-            base_score -= existing_loans[i] * 30
-            
-            # Add some randomness
-            base_score += np.random.randint(-50, 50)
-            
-            # Ensure score is within CIBIL range
-            base_score = max(300, min(900, base_score))
-            scores.append(base_score)
+        self.compression = None
+        if compression is not None:
+            from .compression import compress_forest
+            # Trees are dropped on a third stream and candidates chosen on a fourth, so the
+            # validation metrics below come from rows the search never saw
+            X_tune, y_tune = generate_training_data(extended_chunk, len(y_val), seed=seed + 2, chunk_size=chunk_size)
+            X_select, y_select = generate_training_data(extended_chunk, len(y_val), seed=seed + 3,
+                                                        chunk_size=chunk_size)
+            # Raises CompressionError (and publishes nothing) if no candidate qualifies
+            self.compression = compress_forest(model, X, y, X_tune, y_tune, X_select, y_select,
+                                               n_jobs=n_jobs, **compression)
+            model = self.compression.chosen.model
+        
+        # Model performance, kept with the artifact
+        predictions = model.predict(X)
+        val_predictions = model.predict(X_val)
+        metadata = {
+            'trained_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'n_samples': n_samples,
+            'seed': seed,
+            'n_jobs': n_jobs,
+            'sklearn_version': sklearn.__version__,
+            'params': model.get_params(),
+            'metrics': {
+                'train_mae': float(mean_absolute_error(y, predictions)),
+                'train_r2': float(r2_score(y, predictions)),
+                'validation_mae': float(mean_absolute_error(y_val, val_predictions)),
+                'validation_r2': float(r2_score(y_val, val_predictions)),
+                'n_validation': len(y_val),
+            },
+            'training_seconds': time.perf_counter() - started,
+        }
+        if self.compression is not None:
+            metadata['compression'] = self.compression.summary()
         
-        # Prepare training data
-        X = np.column_stack([age, income, loan_amount, existing_loans])
-        y = np.array(scores)
+        # Save the trained model (temp file + rename)
+        write_artifact(self.model_path, model, FEATURES, metadata)
         
-        # Train model
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
-        self.model.fit(X, y)
+        forest = CompiledForest.from_sklearn(model)
+        self.artifact = Artifact(FEATURES, metadata, forest, forest.fingerprint(), model=model)
+        self.metadata = metadata
+        self.forest = forest
+        self.table = None  # any table on disk belongs to the previous model
         
-        # Save model
-        with open('predictor/cibil_model.pkl', 'wb') as f:
-            pickle.dump(self.model, f)
+        metrics = metadata['metrics']
+        logger.info(f"Model trained and saved to {self.model_path} - "
+                    f"MAE: {metrics['train_mae']:.2f}, R²: {metrics['train_r2']:.3f} "
+                    f"(validation MAE: {metrics['validation_mae']:.2f}, R²: {metrics['validation_r2']:.3f})")
     
-    def predict_score(self, age, income, loan_amount, existing_loans):
-        if self.model is None:
+    def predict_score(self, age, service_years, monthly_income, loan_amount, existing_loans):
+        """Predict CIBIL score for given features"""
+        if self.forest is None:
             return 650  # Default score
         
-        features = np.array([[age, income, loan_amount, existing_loans]])
-        predicted_score = self.model.predict(features)[0]
+        features = np.array([[age, service_years, monthly_income, loan_amount, existing_loans]])
+        with span('inference'):
+            if self.table is not None:
+                predicted_score = self.table.predict(features)[0]
+            else:
+                predicted_score = self.forest.predict(features)[0]
+        
+        # Ensure score is within valid CIBIL range
+        return max(300, min(900, int(predicted_score)))
+    
+    def predict_batch(self, features):
+        """Predict scores for a 2-D array of FEATURES-ordered rows in one call"""
+        features = np.asarray(features, dtype=float).reshape(-1, len(FEATURES))
+        if self.forest is None:
+            return np.full(len(features), 650, dtype=int)  # Default score
+        if len(features) == 0:
+            return np.empty(0, dtype=int)
+        
+        with span('inference_batch'):
+            if self.table is not None:
+                predicted_scores = self.table.predict(features)
+            elif len(features) <= COMPILED_MAX_ROWS:
+                predicted_scores = self.forest.predict(features)
+            else:
+                predicted_scores = self.model.predict(features)
         
-        # Ensure score is within valid range
-        return max(300, min(900, int(predicted_score)))
\ No newline at end of file
+        # Same truncation and range as predict_score
+        return np.clip(predicted_scores.astype(int), 300, 900)
@@ -0,0 +1,181 @@
+"""Write-behind persistence for CibilPrediction rows.
+
+Views hand predictions to ``save_prediction``. With ``CIBIL_WRITE_BEHIND``
+enabled, rows go into a bounded in-memory buffer. A background thread writes
+them with ``bulk_create`` once ``CIBIL_WRITE_BEHIND_BATCH_SIZE`` rows are
+waiting or ``CIBIL_WRITE_BEHIND_FLUSH_INTERVAL`` seconds have passed.
+
+When the buffer is full, the caller waits up to
+``CIBIL_WRITE_BEHIND_PUT_TIMEOUT`` seconds (back-pressure) and then writes
+its own row synchronously, so rows are never dropped for lack of space.
+Whatever is still buffered is flushed at interpreter exit.
+
+A batch that hits an ``OperationalError`` (a lock held past SQLite's busy
+timeout, a dropped connection) is retried up to
+``CIBIL_WRITE_BEHIND_RETRIES`` times with doubling backoff. If it still fails,
+or fails for any other reason, its rows are written one at a time. Then only
+the rows that fail on their own are lost, and they are counted in
+``PredictionWriter.dropped`` (``cibil_write_behind_dropped_total``).
+
+Every write path also updates the daily rollups (``predictor.rollups``) in
+the same transaction, unless ``CIBIL_ROLLUPS`` is off.
+"""
+
+import atexit
+import logging
+import queue
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+
+from .models import CibilPrediction
+from .rollups import record_predictions
+from .workers import BackgroundWorker
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionWriter(BackgroundWorker):
+    """Buffers predictions and bulk-inserts them from a daemon thread"""
+
+    thread_name = 'prediction-writer'
+    stop_timeout = 10.0
+
+    def __init__(self, max_buffer=10000, batch_size=200, flush_interval=1.0, put_timeout=0.5,
+                 retries=3, retry_backoff=0.1):
+        super().__init__(max_buffer)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.dropped = 0  # rows that could not be written at all
+
+    def submit(self, **fields):
+        """Queue one prediction, writing it inline if the buffer stays full"""
+        instance = CibilPrediction(**fields)
+        buffer = self._ensure_started()
+        try:
+            buffer.put(instance, timeout=self.put_timeout)
+        except queue.Full:
+            logger.warning("Prediction buffer full, writing synchronously")
+            self._write([instance])
+
+    def _after_stop(self):
+        # Anything queued after the thread exited
+        self._write(self._drain_all())
+
+    def _run(self):
+        try:
+            while not self._stopping.is_set():
+                self._write(self._next_batch())
+            self._write(self._drain_all())
+        finally:
+            connection.close()
+
+    def _next_batch(self):
+        """Collect up to batch_size rows, waiting at most flush_interval"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain_all(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _write(self, batch):
+        if not batch:
+            return
+        delay = self.retry_backoff
+        for attempt in range(self.retries + 1):
+            try:
+                self._insert(batch)
+                logger.info(f"Saved {len(batch)} predictions")
+                return
+            except OperationalError as db_error:
+                if attempt == self.retries:
+                    logger.error(f"Database save error ({len(batch)} predictions), giving up on the batch: {db_error}")
+                    break
+                logger.warning(f"Database save error ({len(batch)} predictions), retrying in {delay:.2f}s: {db_error}")
+                connection.close_if_unusable_or_obsolete()
+                time.sleep(delay)
+                delay *= 2
+            except Exception as db_error:
+                # Not transient: most likely one bad row, so do not retry the batch
+                logger.error(f"Database save error ({len(batch)} predictions): {db_error}")
+                break
+
+        # Row by row, so only the rows that fail on their own are lost
+        saved = 0
+        for instance in batch:
+            try:
+                self._insert([instance])
+                saved += 1
+            except Exception as db_error:
+                logger.error(f"Dropping prediction (score {instance.predicted_score}): {db_error}")
+                with self._lock:
+                    self.dropped += 1
+        logger.info(f"Saved {saved} of {len(batch)} predictions one by one")
+
+    def _insert(self, batch):
+        for instance in batch:
+            # A rolled-back attempt may have assigned primary keys
+            instance.pk = None
+            instance._state.adding = True
+        with transaction.atomic():
+            CibilPrediction.objects.bulk_create(batch, batch_size=self.batch_size)  # type: ignore
+            _record(batch)
+
+
+writer = PredictionWriter(
+    max_buffer=getattr(settings, 'CIBIL_WRITE_BEHIND_MAX_BUFFER', 10000),
+    batch_size=getattr(settings, 'CIBIL_WRITE_BEHIND_BATCH_SIZE', 200),
+    flush_interval=getattr(settings, 'CIBIL_WRITE_BEHIND_FLUSH_INTERVAL', 1.0),
+    put_timeout=getattr(settings, 'CIBIL_WRITE_BEHIND_PUT_TIMEOUT', 0.5),
+    retries=getattr(settings, 'CIBIL_WRITE_BEHIND_RETRIES', 3),
+    retry_backoff=getattr(settings, 'CIBIL_WRITE_BEHIND_RETRY_BACKOFF', 0.1),
+)
+atexit.register(writer.stop)
+
+
+def save_prediction(**fields):
+    """Persist a prediction, through the write-behind buffer when enabled"""
+    if getattr(settings, 'CIBIL_WRITE_BEHIND', False):
+        writer.submit(**fields)
+    else:
+        _create(fields)
+
+
+async def asave_prediction(**fields):
+    """Async save_prediction for ASGI views"""
+    if getattr(settings, 'CIBIL_WRITE_BEHIND', False):
+        # submit() can block on back-pressure, so keep it off the event loop
+        await sync_to_async(writer.submit, thread_sensitive=False)(**fields)
+    else:
+        # Insert and rollup update share a transaction, which needs one thread
+        await sync_to_async(_create)(fields)
+
+
+def _create(fields):
+    with transaction.atomic():
+        prediction = CibilPrediction.objects.create(**fields)  # type: ignore
+        _record([prediction])
+
+
+def _record(predictions):
+    if getattr(settings, 'CIBIL_ROLLUPS', True):
+        record_predictions(predictions)
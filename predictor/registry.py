@@ -0,0 +1,161 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_VERSION = 'fallback'
+
+
+def _file_stat(path):
+    """Return a cheap change signature (mtime, size) for path, or None if missing"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _file_digest(path):
+    """Return the SHA-256 hex digest of the file at path"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """Holds one shared CibilScorePredictor per process.
+
+    The model file is stat'ed at most once every ``CIBIL_MODEL_CHECK_INTERVAL``
+    seconds. A changed mtime/size triggers a hash comparison, and only a changed
+    hash triggers a reload. The score table files next to it are stat'ed too,
+    and any change to them reloads the model with its new table. The new
+    predictor is built completely before it replaces the old one, so callers
+    never see a half-loaded model. Publishing a new file with
+    ``manage.py train_model`` or ``manage.py build_score_table`` is therefore
+    enough to hot-swap every running worker.
+
+    Requests never train: while no usable model file exists the registry
+    serves ``RuleBasedPredictor`` (unless ``CIBIL_TRAIN_ON_REQUEST`` restores
+    the old train-on-first-use behaviour), and a broken new file leaves the
+    current model in service.
+    """
+
+    def __init__(self, model_path=None):
+        self.model_path = model_path  # None: ml_model.MODEL_PATH, resolved on first load
+        self._lock = threading.Lock()
+        self._predictor = None
+        self._stat = None
+        self._table_stat = None
+        self._digest = None
+        self._next_check = 0.0
+
+    @property
+    def version(self):
+        """SHA-256 of the model file currently being served, or 'fallback'"""
+        return self._digest if self._digest is not None else FALLBACK_VERSION
+
+    @property
+    def is_fallback(self):
+        return self._predictor is None or self._predictor.is_fallback
+
+    def get_predictor(self):
+        predictor = self._predictor
+        if predictor is not None and time.monotonic() < self._next_check:
+            return predictor
+
+        with self._lock:
+            if self._predictor is None or self._file_changed():
+                self._load()
+            interval = getattr(settings, 'CIBIL_MODEL_CHECK_INTERVAL', 5.0)
+            self._next_check = time.monotonic() + interval
+            return self._predictor
+
+    def reload(self):
+        """Force a reload from disk"""
+        with self._lock:
+            self._load()
+            return self._predictor
+
+    def warm_up(self):
+        """Load the model ahead of the first request"""
+        started = time.perf_counter()
+        self.get_predictor()
+        logger.info(f"Model warm-up finished in {time.perf_counter() - started:.2f}s")
+
+    def _table_file_stat(self):
+        """Stats of the score table files for model_path (None for each missing one)"""
+        # Only called once a model has been loaded, so NumPy is already imported
+        from .score_table import table_paths
+
+        return tuple(_file_stat(path) for path in table_paths(self.model_path))
+
+    def _file_changed(self):
+        stat = _file_stat(self.model_path)
+        if stat is None:
+            # A missing file keeps the current model in service
+            return False
+        if self._table_file_stat() != self._table_stat:
+            # build_score_table wrote (or a user removed) the table for this model
+            return True
+        if stat == self._stat:
+            return False
+        digest = _file_digest(self.model_path)
+        if digest == self._digest:
+            # Touched but not modified
+            self._stat = stat
+            return False
+        return True
+
+    def _load(self):
+        # Imported on first use, so that Django processes that never predict
+        # (migrate, shell, admin-only workers) do not load NumPy and the model code
+        from .artifact import ModelArtifactError
+        from .fallback import RuleBasedPredictor
+        from .ml_model import MODEL_PATH, CibilScorePredictor
+
+        if self.model_path is None:
+            self.model_path = MODEL_PATH
+        stat = _file_stat(self.model_path)
+        # Taken before loading: a table written meanwhile triggers another reload
+        self._table_stat = self._table_file_stat()
+        digest = _file_digest(self.model_path) if stat else None
+
+        train = getattr(settings, 'CIBIL_TRAIN_ON_REQUEST', False)
+        try:
+            predictor = CibilScorePredictor(self.model_path, train_if_missing=train)
+        except (FileNotFoundError, ModelArtifactError) as e:
+            # Remember the stat so this file is not retried until it changes again
+            self._stat = stat
+            if self._predictor is not None and not self._predictor.is_fallback:
+                logger.error(f"Cannot load new model file {self.model_path} ({e}); keeping the current model")
+                return
+            logger.warning(f"No usable model at {self.model_path} ({e}); serving rule-based fallback scores. "
+                           f"Run `manage.py train_model` to publish one.")
+            self._predictor = RuleBasedPredictor()
+            self._digest = None
+            return
+
+        if stat is None:
+            # Trained just now (CIBIL_TRAIN_ON_REQUEST)
+            stat = _file_stat(self.model_path)
+            digest = _file_digest(self.model_path) if stat else None
+
+        self._predictor = predictor
+        self._stat = stat
+        self._digest = digest
+        logger.info(f"Loaded CIBIL model {self.model_path} (sha256 {(digest or 'n/a')[:12]})")
+
+
+registry = ModelRegistry()
+
+
+def get_predictor():
+    """Return the process-wide CibilScorePredictor"""
+    return registry.get_predictor()
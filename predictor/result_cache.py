@@ -0,0 +1,153 @@
+"""Cache of (predicted score, suitable banks) keyed on normalized applicant features.
+
+Keys combine ``(age, service_years, monthly_income, loan_amount,
+existing_loans)`` with the model file hash and the bank-rules hash. A new
+model or an edited Bank row therefore changes every key, and the local cache
+is also cleared when either version moves.
+
+By default entries live in an in-process LRU with a TTL. Set
+``CIBIL_RESULT_CACHE_ALIAS`` to a Django cache alias to share entries between
+workers instead.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def normalize_features(applicant):
+    """Return the hashable feature tuple used in cache keys"""
+    return (
+        int(applicant['age']),
+        int(applicant['service_years']),
+        round(float(applicant['monthly_income']), 2),
+        round(float(applicant['desired_loan_amount']), 2),
+        int(applicant['existing_loans']),
+    )
+
+
+class LocalResultCache:
+    """Thread-safe LRU cache with a per-entry TTL"""
+
+    def __init__(self, max_entries=10000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'local',
+                'entries': len(self._data),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class DjangoResultCache:
+    """Adapter over a Django cache alias; eviction is left to the backend"""
+
+    def __init__(self, alias, ttl=300):
+        self.alias = alias
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key):
+        return 'cibil:result:' + ':'.join(str(part) for part in key)
+
+    def get(self, key):
+        value = caches[self.alias].get(self._key(key))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        caches[self.alias].set(self._key(key), value, self.ttl)
+
+    def clear(self):
+        # Old entries are unreachable once the versions in the key change
+        pass
+
+    def stats(self):
+        with self._lock:
+            return {'backend': self.alias, 'hits': self.hits, 'misses': self.misses}
+
+
+class ResultCache:
+    """Versioned front end that clears the store when the model or banks change"""
+
+    def __init__(self, store):
+        self.store = store
+        self._versions = None
+
+    def get_or_compute(self, applicant, model_version, bank_version, compute):
+        """Return (score, banks) for applicant, calling compute() on a miss"""
+        versions = (model_version, bank_version)
+        if versions != self._versions:
+            self.store.clear()
+            self._versions = versions
+
+        key = versions + normalize_features(applicant)
+        result = self.store.get(key)
+        if result is None:
+            result = compute()
+            self.store.set(key, result)
+        return result
+
+    def stats(self):
+        return self.store.stats()
+
+
+def _build_cache():
+    ttl = getattr(settings, 'CIBIL_RESULT_CACHE_TTL', 300)
+    alias = getattr(settings, 'CIBIL_RESULT_CACHE_ALIAS', None)
+    if alias:
+        return ResultCache(DjangoResultCache(alias, ttl=ttl))
+    return ResultCache(LocalResultCache(getattr(settings, 'CIBIL_RESULT_CACHE_SIZE', 10000), ttl=ttl))
+
+
+result_cache = _build_cache()
@@ -0,0 +1,160 @@
+"""Daily rollups of CibilPrediction, maintained as predictions are written.
+
+``record_predictions`` is called by ``predictor.persistence`` in the same
+transaction as the insert. It adds the new rows to ``DailyPredictionRollup``
+(count, sums and category counts) and ``DailyScoreBucket`` (score
+distribution) with ``F()`` increments, so concurrent writers never lose
+updates. Dashboards read these small tables instead of aggregating the whole
+prediction history.
+
+Rows deleted or edited directly (admin, SQL) are not reflected until the
+affected days are rebuilt with ``manage.py rebuild_rollups``, which also
+backfills history.
+"""
+
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .db import read_alias
+from .models import CibilPrediction, DailyPredictionRollup, DailyScoreBucket
+
+BUCKET_WIDTH = 50
+MIN_BUCKET = 300
+MAX_BUCKET = 850  # 850-900; a score of 900 is counted here too
+
+# (field, lowest score) in the order of views.get_score_category
+CATEGORY_FIELDS = (('excellent', 750), ('very_good', 700), ('good', 650), ('fair', 600), ('poor', None))
+CATEGORY_LABELS = {
+    'excellent': 'Excellent', 'very_good': 'Very good', 'good': 'Good', 'fair': 'Fair', 'poor': 'Poor',
+}
+
+
+def _money(value):
+    # Rounded the way DecimalField(decimal_places=2) stores it
+    return Decimal(str(value)).quantize(Decimal('0.01'))
+
+
+def score_bucket(score):
+    return max(MIN_BUCKET, min(MAX_BUCKET, score // BUCKET_WIDTH * BUCKET_WIDTH))
+
+
+def category_field(score):
+    for field, lowest in CATEGORY_FIELDS:
+        if lowest is None or score >= lowest:
+            return field
+
+
+class _DayTotals:
+    def __init__(self):
+        self.count = 0
+        self.score_sum = 0
+        self.monthly_income_sum = Decimal(0)
+        self.desired_loan_amount_sum = Decimal(0)
+        self.categories = Counter()
+        self.buckets = Counter()
+
+    def add(self, score, monthly_income, desired_loan_amount, n=1):
+        self.count += n
+        self.score_sum += score * n
+        self.monthly_income_sum += _money(monthly_income)
+        self.desired_loan_amount_sum += _money(desired_loan_amount)
+        self.categories[category_field(score)] += n
+        self.buckets[score_bucket(score)] += n
+
+
+def record_predictions(predictions):
+    """Add saved CibilPrediction instances to the daily rollups"""
+    days = defaultdict(_DayTotals)
+    for p in predictions:
+        days[timezone.localdate(p.created_at)].add(p.predicted_score, p.monthly_income, p.desired_loan_amount)
+    with transaction.atomic():
+        for date, totals in sorted(days.items()):
+            _apply(date, totals)
+
+
+def _apply(date, totals):
+    _increment(DailyPredictionRollup, {'date': date}, {
+        'count': totals.count,
+        'score_sum': totals.score_sum,
+        'monthly_income_sum': totals.monthly_income_sum,
+        'desired_loan_amount_sum': totals.desired_loan_amount_sum,
+        **{field: totals.categories[field] for field, _ in CATEGORY_FIELDS if totals.categories[field]},
+    })
+    for bucket, n in sorted(totals.buckets.items()):
+        _increment(DailyScoreBucket, {'date': date, 'bucket': bucket}, {'count': n})
+
+
+def _increment(model, key, amounts):
+    """UPDATE ... SET f = f + n, inserting the row first if it does not exist"""
+    increments = {field: F(field) + value for field, value in amounts.items()}
+    if model.objects.filter(**key).update(**increments):
+        return
+    try:
+        # Savepoint: a concurrent writer may insert the same key first
+        with transaction.atomic():
+            model.objects.create(**key, **amounts)
+    except IntegrityError:
+        model.objects.filter(**key).update(**increments)
+
+
+def rebuild_rollups(since=None, until=None):
+    """Recompute the rollups for [since, until] (local dates, inclusive) from CibilPrediction.
+
+    Returns the number of days written. With no bounds, every day is rebuilt.
+    """
+    rows = CibilPrediction.objects.annotate(day=TruncDate('created_at'))
+    if since is not None:
+        rows = rows.filter(day__gte=since)
+    if until is not None:
+        rows = rows.filter(day__lte=until)
+
+    # One GROUP BY per (day, score): at most 601 rows per day, however many predictions
+    days = defaultdict(_DayTotals)
+    grouped = rows.values('day', 'predicted_score').annotate(
+        n=Count('id'), income=Sum('monthly_income'), loan=Sum('desired_loan_amount'),
+    ).order_by()
+    for row in grouped.iterator():
+        totals = days[row['day']]
+        totals.add(row['predicted_score'], 0, 0, n=row['n'])
+        totals.monthly_income_sum += _money(row['income'] or 0)
+        totals.desired_loan_amount_sum += _money(row['loan'] or 0)
+
+    with transaction.atomic():
+        for model in (DailyPredictionRollup, DailyScoreBucket):
+            stale = model.objects.all()
+            if since is not None:
+                stale = stale.filter(date__gte=since)
+            if until is not None:
+                stale = stale.filter(date__lte=until)
+            stale.delete()
+        for date, totals in sorted(days.items()):
+            _apply(date, totals)
+    return len(days)
+
+
+def daily_summary(since, until):
+    """Per-day dashboard rows for [since, until], read from the rollup tables only"""
+    alias = read_alias()
+    buckets = defaultdict(dict)
+    for date, bucket, count in DailyScoreBucket.objects.using(alias).filter(
+            date__gte=since, date__lte=until).values_list('date', 'bucket', 'count'):
+        buckets[date][f'{bucket}-{bucket + BUCKET_WIDTH - 1 if bucket < MAX_BUCKET else 900}'] = count
+
+    days = []
+    for rollup in DailyPredictionRollup.objects.using(alias).filter(date__gte=since, date__lte=until).order_by('date'):
+        count = rollup.count
+        days.append({
+            'date': rollup.date.isoformat(),
+            'count': count,
+            'average_score': rollup.score_sum / count if count else None,
+            'average_monthly_income': float(rollup.monthly_income_sum) / count if count else None,
+            'average_loan_amount': float(rollup.desired_loan_amount_sum) / count if count else None,
+            'categories': {CATEGORY_LABELS[field]: getattr(rollup, field) for field, _ in CATEGORY_FIELDS},
+            'score_distribution': dict(sorted(buckets[rollup.date].items())),
+        })
+    return days
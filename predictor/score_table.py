@@ -0,0 +1,104 @@
+"""Dense lookup table of forest outputs over the intervals between split thresholds.
+
+A tree only ever compares a feature with its split thresholds. Two inputs that
+fall between the same pair of consecutive thresholds, for every feature, end
+up in the same leaf of every tree. The forest output is therefore constant on
+each cell of the grid formed by the distinct per-feature thresholds.
+
+``ScoreTable.build`` evaluates the forest once per cell. ``predict`` then maps
+a row to its cell with one ``searchsorted`` per feature, which gives exactly
+``RandomForestRegressor.predict``.
+
+The grid is stored as ``<model>.table.npy`` and memory-mapped when loaded.
+The thresholds and the forest fingerprint go in ``<model>.table.npz``.
+"""
+
+import os
+
+import numpy as np
+
+DEFAULT_MAX_CELLS = 20_000_000   # 160 MB of float64
+BUILD_BLOCK_SIZE = 65536
+
+
+def table_paths(model_path):
+    """Return (grid_path, meta_path) stored next to model_path"""
+    stem = os.path.splitext(model_path)[0]
+    return stem + '.table.npy', stem + '.table.npz'
+
+
+class ScoreTable:
+    def __init__(self, thresholds, grid, fingerprint):
+        self.thresholds = thresholds
+        self.grid = grid
+        self.fingerprint = fingerprint
+
+    @property
+    def n_features(self):
+        return len(self.thresholds)
+
+    @staticmethod
+    def grid_shape(forest):
+        return tuple(len(t) + 1 for t in forest.thresholds_by_feature())
+
+    @classmethod
+    def build(cls, forest, max_cells=DEFAULT_MAX_CELLS):
+        """Evaluate forest on every threshold cell; raises ValueError above max_cells"""
+        thresholds = forest.thresholds_by_feature()
+        shape = tuple(len(t) + 1 for t in thresholds)
+        n_cells = int(np.prod(shape, dtype=np.float64))
+        if n_cells > max_cells:
+            raise ValueError(
+                f"Score table would need {n_cells:,} cells (grid {shape}), more than {max_cells:,}"
+            )
+
+        # Cell i of a feature holds values in (t[i-1], t[i]]; t[i] itself is a
+        # representative, and +inf stands for everything above the last threshold
+        representatives = [np.append(t, np.inf) for t in thresholds]
+
+        grid = np.empty(n_cells, dtype=np.float64)
+        for start in range(0, n_cells, BUILD_BLOCK_SIZE):
+            cells = np.arange(start, min(start + BUILD_BLOCK_SIZE, n_cells))
+            index = np.unravel_index(cells, shape)
+            X = np.column_stack([rep[i] for rep, i in zip(representatives, index)])
+            grid[cells] = forest.predict_exact(X)
+
+        return cls(thresholds, grid.reshape(shape), forest.fingerprint())
+
+    def predict(self, X):
+        """Forest output for each row, via one searchsorted per feature"""
+        X = np.asarray(X, dtype=np.float32).astype(np.float64).reshape(-1, self.n_features)
+        cell = tuple(
+            np.searchsorted(t, X[:, f], side='left')
+            for f, t in enumerate(self.thresholds)
+        )
+        return np.asarray(self.grid[cell], dtype=np.float64)
+
+    def save(self, model_path):
+        grid_path, meta_path = table_paths(model_path)
+        meta = {f'thresholds_{f}': t for f, t in enumerate(self.thresholds)}
+        meta['fingerprint'] = np.array(self.fingerprint)
+
+        # Write both files under temporary names, then swap them in
+        with open(grid_path + '.tmp', 'wb') as f:
+            np.save(f, self.grid)
+        with open(meta_path + '.tmp', 'wb') as f:
+            np.savez(f, **meta)
+        os.replace(meta_path + '.tmp', meta_path)
+        os.replace(grid_path + '.tmp', grid_path)
+
+    @classmethod
+    def load(cls, model_path, fingerprint):
+        """Memory-map the table for model_path, or return None if absent or stale"""
+        grid_path, meta_path = table_paths(model_path)
+        if not (os.path.exists(grid_path) and os.path.exists(meta_path)):
+            return None
+        with np.load(meta_path) as meta:
+            if str(meta['fingerprint']) != fingerprint:
+                return None
+            n_features = sum(1 for name in meta.files if name.startswith('thresholds_'))
+            thresholds = [meta[f'thresholds_{f}'] for f in range(n_features)]
+        grid = np.load(grid_path, mmap_mode='r')
+        if grid.shape != tuple(len(t) + 1 for t in thresholds):
+            return None
+        return cls(thresholds, grid, fingerprint)
@@ -0,0 +1,205 @@
+"""Shadow evaluation of a candidate model against live traffic.
+
+Set ``CIBIL_SHADOW_MODEL_PATH`` to a model published with
+``manage.py train_model --output <path>``. ``predict_cibil`` then hands a
+``CIBIL_SHADOW_SAMPLE_RATE`` fraction of its feature rows, with the score it
+served, to ``ShadowEvaluator.offer``. That is one random draw and a
+``put_nowait`` on a bounded queue. When the queue is full the sample is
+counted and dropped, so the response never waits for the shadow.
+
+A background thread takes up to ``CIBIL_SHADOW_BATCH_SIZE`` rows at a time
+and scores them with ``predict_batch`` on both the serving model and the
+candidate, back to back on the same rows. It records:
+
+* the score delta (candidate minus served score),
+* category flips (``views.get_score_category`` of the two scores), and
+* per-row latency of each model on the same batch.
+
+``stats()`` returns the summaries (also at ``GET /shadow/stats/`` for staff),
+a line is logged every ``CIBIL_SHADOW_LOG_INTERVAL`` seconds, and
+``/metrics`` exports the counters. The candidate file is reloaded when it
+changes. Nothing here is persisted, and the served score never comes from
+the candidate.
+"""
+
+import atexit
+import collections
+import logging
+import queue
+import random
+import threading
+import time
+
+from django.conf import settings
+
+from .registry import _file_stat, get_predictor
+from .workers import BackgroundWorker, StatsWindow
+
+logger = logging.getLogger(__name__)
+
+
+class ShadowEvaluator(BackgroundWorker):
+    """Scores sampled rows with a candidate model from a daemon thread"""
+
+    thread_name = 'shadow-evaluator'
+
+    def __init__(self, model_path=None, sample_rate=0.1, max_queue=1000, batch_size=64, log_interval=60.0):
+        super().__init__(max_queue)
+        self.model_path = model_path
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.log_interval = log_interval
+        self._stats_lock = threading.Lock()
+        self._candidate = None
+        self._candidate_stat = None
+        self._next_log = time.monotonic() + log_interval
+        self._reset_stats()
+
+    @property
+    def enabled(self):
+        return bool(self.model_path) and self.sample_rate > 0
+
+    def offer(self, row, served_score):
+        """Maybe queue one feature row and the score served for it; never blocks"""
+        if not self.enabled or random.random() >= self.sample_rate:
+            return
+        pending = self._ensure_started()
+        try:
+            pending.put_nowait((row, served_score))
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return
+        with self._stats_lock:
+            self.sampled += 1
+
+    def stats(self):
+        """Counters, score delta, latency (ms per row) and category flip summaries since the last reset"""
+        with self._stats_lock:
+            return {
+                'model_path': str(self.model_path) if self.model_path else None,
+                'sample_rate': self.sample_rate,
+                'sampled': self.sampled,
+                'dropped': self.dropped,
+                'evaluated': self.evaluated,
+                'errors': self.errors,
+                'pending': self.pending(),
+                'score_delta': self.score_delta.summary(),
+                'abs_score_delta': self.abs_score_delta.summary(),
+                'category_flips': sum(self.flips.values()),
+                'flips': {f'{served} -> {candidate}': count
+                          for (served, candidate), count in self.flips.most_common()},
+                'served_ms_per_row': self.served_ms.summary(),
+                'candidate_ms_per_row': self.candidate_ms.summary(),
+            }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._reset_stats()
+
+    def _reset_stats(self):
+        self.sampled = 0
+        self.dropped = 0
+        self.evaluated = 0
+        self.errors = 0
+        self.score_delta = StatsWindow()
+        self.abs_score_delta = StatsWindow()
+        self.served_ms = StatsWindow()
+        self.candidate_ms = StatsWindow()
+        self.flips = collections.Counter()
+
+    def _run(self):
+        # Rows still queued at stop() are discarded
+        while not self._stopping.is_set():
+            batch = self._next_batch()
+            if batch:
+                try:
+                    self._evaluate(batch)
+                except Exception as e:
+                    logger.error(f"Shadow evaluation error ({len(batch)} rows): {e}")
+                    with self._stats_lock:
+                        self.errors += 1
+            self._maybe_log()
+
+    def _next_batch(self):
+        """Wait for one row, then take whatever else is already queued, up to batch_size"""
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _load_candidate(self):
+        """The candidate predictor, reloaded when its file changes; None while it cannot be loaded"""
+        stat = _file_stat(self.model_path)
+        if stat is not None and stat != self._candidate_stat:
+            from .artifact import ModelArtifactError
+            from .ml_model import CibilScorePredictor
+
+            # Remember the stat so a broken file is not retried until it changes again
+            self._candidate_stat = stat
+            try:
+                # Never train here: a missing candidate means there is nothing to compare
+                self._candidate = CibilScorePredictor(self.model_path, train_if_missing=False)
+                logger.info(f"Loaded shadow model {self.model_path}")
+            except (FileNotFoundError, ModelArtifactError) as e:
+                logger.error(f"Cannot load shadow model {self.model_path} ({e})")
+                self._candidate = None
+        return self._candidate
+
+    def _evaluate(self, batch):
+        # views imports this module
+        from .views import get_score_category
+
+        candidate = self._load_candidate()
+        if candidate is None:
+            with self._stats_lock:
+                self.errors += 1
+            return
+        rows = [row for row, _ in batch]
+        started = time.perf_counter()
+        get_predictor().predict_batch(rows)
+        served_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        candidate_scores = candidate.predict_batch(rows)
+        candidate_seconds = time.perf_counter() - started
+
+        with self._stats_lock:
+            self.evaluated += len(batch)
+            self.served_ms.add(served_seconds * 1000 / len(batch))
+            self.candidate_ms.add(candidate_seconds * 1000 / len(batch))
+            for (_, served_score), candidate_score in zip(batch, candidate_scores):
+                delta = int(candidate_score) - served_score
+                self.score_delta.add(delta)
+                self.abs_score_delta.add(abs(delta))
+                served_category, candidate_category = get_score_category(served_score), get_score_category(candidate_score)
+                if served_category != candidate_category:
+                    self.flips[served_category, candidate_category] += 1
+
+    def _maybe_log(self):
+        if not self.log_interval or time.monotonic() < self._next_log:
+            return
+        self._next_log = time.monotonic() + self.log_interval
+        stats = self.stats()
+        if stats['evaluated']:
+            logger.info(
+                f"Shadow model: {stats['evaluated']} rows evaluated, {stats['dropped']} dropped, "
+                f"mean delta {stats['score_delta']['mean']:+.1f} (|delta| p99 {stats['abs_score_delta']['p99']:.0f}), "
+                f"{stats['category_flips']} category flips, per-row latency "
+                f"{stats['served_ms_per_row']['p50']:.3f} ms served vs {stats['candidate_ms_per_row']['p50']:.3f} ms candidate"
+            )
+
+
+shadow_evaluator = ShadowEvaluator(
+    model_path=getattr(settings, 'CIBIL_SHADOW_MODEL_PATH', None),
+    sample_rate=getattr(settings, 'CIBIL_SHADOW_SAMPLE_RATE', 0.1),
+    max_queue=getattr(settings, 'CIBIL_SHADOW_MAX_QUEUE', 1000),
+    batch_size=getattr(settings, 'CIBIL_SHADOW_BATCH_SIZE', 64),
+    log_interval=getattr(settings, 'CIBIL_SHADOW_LOG_INTERVAL', 60.0),
+)
+atexit.register(shadow_evaluator.stop)
@@ -0,0 +1,41 @@
+import os
+import sys
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .banks import invalidate_bank_index
+from .models import Bank
+
+
+@receiver(post_save, sender=Bank)
+@receiver(post_delete, sender=Bank)
+def bank_changed(sender, **kwargs):
+    """Reload bank rules after any admin or ORM change"""
+    # Wait for the commit so a concurrent reload cannot cache the old rows
+    transaction.on_commit(invalidate_bank_index)
+
+
+def _one_off_command():
+    """True inside a manage.py/django-admin command other than runserver"""
+    return (len(sys.argv) > 1 and os.path.basename(sys.argv[0]) in ('manage.py', 'django-admin')
+            and sys.argv[1] != 'runserver')
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    """Apply CIBIL_SQLITE_PRAGMAS to each new SQLite connection"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = dict(getattr(settings, 'CIBIL_SQLITE_PRAGMAS', {}))
+    if _one_off_command():
+        # journal_mode is stored in the database file itself: leave it to the server, so that
+        # `makemigrations --check` and the like do not convert a checkout's db.sqlite3.
+        # A database already in WAL stays in WAL for these connections too.
+        pragmas.pop('journal_mode', None)
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,98 @@
+"""Static files storage used by ``collectstatic`` in production.
+
+``CibilStaticFilesStorage`` is Django's ``ManifestStaticFilesStorage``
+(content-hashed names such as ``css/result.3f2a9c1b7d4e.css``, with
+``url()`` references rewritten to match) plus two extra steps:
+
+* CSS is minified as it is copied, so the hash is computed over the minified
+  file and only changes when the stylesheet really does.
+* Text assets (CSS, JS, SVG, ...) get precompressed ``.gz`` siblings, and
+  ``.br`` ones when the ``brotli`` package is installed. WhiteNoise or
+  nginx (``gzip_static``/``brotli_static``) serve them as-is, so nothing is
+  compressed per request.
+
+A hashed name changes whenever the content does, so the server can send
+hashed files with a one-year ``Cache-Control: immutable`` header.
+WhiteNoise does this automatically, and the README has the nginx equivalent.
+
+Images are not touched here. ``manage.py build_assets`` produces the
+resized WebP/AVIF variants that the stylesheets reference.
+"""
+
+import gzip
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.mjs', '.map', '.svg', '.json', '.txt', '.html', '.xml', '.ico')
+MIN_COMPRESS_SIZE = 256       # bytes; smaller files are not worth a second request path
+MIN_COMPRESS_SAVING = 0.05    # keep a compressed copy only if it is at least 5% smaller
+
+
+# Comments, quoted strings, and everything else (a lone '/' or quote falls through to the last branch)
+_CSS_TOKENS = re.compile(r'''/\*.*?\*/|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|[^/"']+|.''', re.S)
+
+
+def _minify_code(css):
+    css = re.sub(r'\s+', ' ', css)
+    # Whitespace before ':' is kept: "a :hover" and "a:hover" are different selectors
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}')
+
+
+def minify_css(css):
+    """Strip comments and redundant whitespace from a stylesheet, leaving quoted strings alone"""
+    parts, code = [], []
+    for token in _CSS_TOKENS.findall(css):
+        if token.startswith('/*'):
+            continue
+        if token[0] in '"\'' and len(token) > 1:
+            parts.extend((_minify_code(''.join(code)), token))
+            code = []
+        else:
+            code.append(token)
+    parts.append(_minify_code(''.join(code)))
+    return ''.join(parts).strip() + '\n'
+
+
+class CibilStaticFilesStorage(ManifestStaticFilesStorage):
+    """Hashed, minified and precompressed static files"""
+
+    def _save(self, name, content):
+        if name.endswith('.css'):
+            content.seek(0)
+            minified = minify_css(content.read().decode())
+            content = ContentFile(minified.encode())
+        return super()._save(name, content)
+
+    def post_process(self, paths, dry_run=False, **options):
+        written = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            yield name, hashed_name, processed
+            if not isinstance(processed, Exception):
+                written.update((name, hashed_name))
+        if dry_run:
+            return
+        for name in sorted(n for n in written if n and n.endswith(COMPRESSIBLE_EXTENSIONS)):
+            self._precompress(name)
+
+    def _precompress(self, name):
+        with self.open(name) as f:
+            data = f.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(data, quality=11)))
+        for suffix, compressed in variants:
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            if len(compressed) <= len(data) * (1 - MIN_COMPRESS_SAVING):
+                self._save(name + suffix, ContentFile(compressed))
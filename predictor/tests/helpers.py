@@ -0,0 +1,62 @@
+import os
+import tempfile
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from ..artifact import Artifact
+from ..compiled_forest import CompiledForest
+from ..ml_model import FEATURES, CibilScorePredictor
+from ..registry import registry
+from ..training_data import extended_chunk, generate_training_data
+
+
+def fit_forest(n_estimators=10, max_depth=8, n_samples=2000, seed=0):
+    X, y = generate_training_data(extended_chunk, n_samples, seed=seed)
+    return RandomForestRegressor(n_estimators=n_estimators, max_depth=max_depth, random_state=seed).fit(X, y)
+
+
+def serving_predictor(model, table=None):
+    """A CibilScorePredictor serving model, without a model file"""
+    forest = CompiledForest.from_sklearn(model)
+    predictor = CibilScorePredictor.__new__(CibilScorePredictor)
+    predictor.artifact = Artifact(FEATURES, {}, forest, forest.fingerprint(), model=model)
+    predictor.forest = forest
+    predictor.table = table
+    return predictor
+
+
+def applicant_rows(n, seed=1):
+    rng = np.random.default_rng(seed)
+    age = rng.integers(18, 70, n)
+    return np.column_stack([
+        age,
+        np.maximum(1, 60 - age),
+        rng.uniform(1000, 250000, n),
+        rng.uniform(10000, 6000000, n),
+        rng.integers(0, 8, n),
+    ]).astype(float)
+
+
+def temp_model_path(test):
+    """Path of a not yet existing model file in a temporary directory removed after test"""
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    return os.path.join(directory.name, 'cibil_model.pkl')
+
+
+def isolate_registry(test, model_path=None):
+    """Serve model_path from the shared registry until test ends.
+
+    Without a model_path (or while the file does not exist) the rule-based
+    fallback is served, so view tests never depend on predictor/cibil_model.pkl.
+    """
+    saved = dict(vars(registry))
+    registry.__init__(model_path or temp_model_path(test))
+
+    def restore():
+        vars(registry).clear()
+        vars(registry).update(saved)
+
+    test.addCleanup(restore)
+    return registry
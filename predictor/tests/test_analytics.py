@@ -0,0 +1,86 @@
+import datetime
+import io
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import CibilPrediction, DailyPredictionRollup, DailyScoreBucket
+from ..rollups import record_predictions
+
+
+class DailyAnalyticsTests(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+
+    def predict(self, score, days_ago=0, monthly_income=50000):
+        prediction = CibilPrediction.objects.create(
+            age=30, service_years=30, monthly_income=monthly_income, desired_loan_amount=200000,
+            existing_loans=1, predicted_score=score,
+        )
+        if days_ago:
+            CibilPrediction.objects.filter(pk=prediction.pk).update(
+                created_at=prediction.created_at - datetime.timedelta(days=days_ago))
+            prediction.refresh_from_db()
+        return prediction
+
+    def rollup_rows(self):
+        fields = [f.name for f in DailyPredictionRollup._meta.fields if f.name != 'id']
+        return (list(DailyPredictionRollup.objects.order_by('date').values(*fields)),
+                list(DailyScoreBucket.objects.order_by('date', 'bucket').values('date', 'bucket', 'count')))
+
+    def rebuild(self, *args):
+        call_command('rebuild_rollups', *args, stdout=io.StringIO())
+
+    def test_rebuild_matches_incremental_rollups(self):
+        predictions = [self.predict(score, days_ago) for score, days_ago in
+                       ((780, 0), (705, 0), (300, 0), (900, 2), (640, 2))]
+        record_predictions(predictions)
+        incremental = self.rollup_rows()
+        self.rebuild()
+        self.assertEqual(self.rollup_rows(), incremental)
+        self.assertEqual(DailyPredictionRollup.objects.get(date=self.today).score_sum, 780 + 705 + 300)
+
+    def test_rebuild_only_touches_the_requested_days(self):
+        self.predict(700, days_ago=2)
+        self.rebuild()
+        self.predict(650)
+        DailyPredictionRollup.objects.filter(date=self.today - datetime.timedelta(days=2)).update(count=99)
+        self.rebuild('--since', self.today.isoformat())
+        counts = dict(DailyPredictionRollup.objects.values_list('date', 'count'))
+        self.assertEqual(counts, {self.today - datetime.timedelta(days=2): 99, self.today: 1})
+
+        with self.assertRaises(CommandError):
+            self.rebuild('--since', self.today.isoformat(), '--until', '2000-01-01')
+        with self.assertRaises(CommandError):
+            self.rebuild('--since', 'yesterday')
+
+    def test_daily_view_reads_the_rollups(self):
+        record_predictions([self.predict(780, monthly_income=40000), self.predict(620, monthly_income=60000),
+                            self.predict(610, days_ago=1)])
+        response = self.client.get('/analytics/daily/', {'days': 1})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['since'], data['until'], data['total']),
+                         (self.today.isoformat(), self.today.isoformat(), 2))
+        day, = data['days']
+        self.assertEqual(day['average_score'], 700)
+        self.assertEqual(day['average_monthly_income'], 50000)
+        self.assertEqual(day['categories'], {'Excellent': 1, 'Very good': 0, 'Good': 0, 'Fair': 1, 'Poor': 0})
+        self.assertEqual(day['score_distribution'], {'600-649': 1, '750-799': 1})
+
+        since = (self.today - datetime.timedelta(days=1)).isoformat()
+        response = self.client.get('/analytics/daily/', {'since': since})
+        self.assertEqual(response.json()['total'], 3)
+
+    def test_daily_view_rejects_bad_ranges(self):
+        for params in ({'days': 0}, {'days': 'abc'}, {'days': 10 ** 10}, {'until': '0001-01-01'},
+                       {'since': '2024-02-01', 'until': '2024-01-01'}, {'since': '2000-01-01'}):
+            self.assertEqual(self.client.get('/analytics/daily/', params).status_code, 400, params)
+
+    def test_daily_view_is_for_staff_only(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/analytics/daily/').status_code, 302)
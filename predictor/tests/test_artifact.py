@@ -0,0 +1,103 @@
+import hashlib
+import pickle
+
+import joblib
+import numpy as np
+from django.test import SimpleTestCase
+
+from ..artifact import ModelArtifactError, read_artifact, write_artifact
+from ..ml_model import FEATURES, CibilScorePredictor
+from .helpers import applicant_rows, fit_forest, temp_model_path
+
+
+class ArtifactFormatTests(SimpleTestCase):
+    """Older model files still load; unusable ones raise ModelArtifactError"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.model = fit_forest(n_estimators=3, max_depth=4)
+        cls.X = applicant_rows(100)
+
+    def setUp(self):
+        self.path = temp_model_path(self)
+
+    def write_pickle(self, obj):
+        with open(self.path, 'wb') as f:
+            pickle.dump(obj, f)
+
+    def format_1(self, **overrides):
+        model_bytes = pickle.dumps(self.model)
+        return {'format_version': 1, 'features': FEATURES, 'metadata': {'trained_at': 'then'},
+                'checksum': hashlib.sha256(model_bytes).hexdigest(), 'model_bytes': model_bytes, **overrides}
+
+    def assert_serves_model(self, artifact):
+        np.testing.assert_array_equal(artifact.forest.predict(self.X), self.model.predict(self.X))
+        np.testing.assert_array_equal(artifact.load_model().predict(self.X), self.model.predict(self.X))
+
+    def test_loads_a_bare_legacy_estimator(self):
+        self.write_pickle(self.model)
+        artifact = read_artifact(self.path, FEATURES)
+        self.assertEqual(artifact.metadata, {'legacy': True})
+        self.assert_serves_model(artifact)
+
+    def test_loads_format_1(self):
+        self.write_pickle(self.format_1())
+        artifact = read_artifact(self.path, FEATURES)
+        self.assertEqual(artifact.metadata, {'trained_at': 'then'})
+        self.assert_serves_model(artifact)
+
+    def test_rejects_unusable_files(self):
+        for obj in (self.format_1(checksum='0' * 64),
+                    self.format_1(features=FEATURES[:-1]),
+                    self.format_1(format_version=99),
+                    {'not': 'a model'}):
+            self.write_pickle(obj)
+            with self.assertRaises(ModelArtifactError):
+                read_artifact(self.path, FEATURES)
+        with open(self.path, 'wb') as f:
+            f.write(b'truncated')
+        with self.assertRaises(ModelArtifactError):
+            read_artifact(self.path, FEATURES)
+
+    def test_predictor_does_not_train_over_a_broken_file_unless_asked(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'truncated')
+        with self.assertRaises(ModelArtifactError):
+            CibilScorePredictor(self.path, train_if_missing=False)
+        with self.assertRaises(FileNotFoundError):
+            CibilScorePredictor(self.path + '.missing', train_if_missing=False)
+
+
+class MappedArtifactTests(SimpleTestCase):
+    """Format 2: the serving forest is memory-mapped, the sklearn model unpickled on demand"""
+
+    def setUp(self):
+        self.path = temp_model_path(self)
+        self.model = fit_forest(n_estimators=3, max_depth=4)
+        write_artifact(self.path, self.model, FEATURES, {'seed': 0})
+
+    def rewrite(self, **changes):
+        artifact = joblib.load(self.path)
+        artifact.update(changes)
+        joblib.dump(artifact, self.path, compress=0)
+
+    def test_forest_arrays_are_mapped_and_the_model_is_lazy(self):
+        artifact = read_artifact(self.path, FEATURES)
+        self.assertIsInstance(artifact.forest.threshold, np.memmap)
+        self.assertFalse(artifact.forest.threshold.flags.writeable)
+        self.assertIsNone(artifact._model)
+        X = applicant_rows(100)
+        np.testing.assert_array_equal(artifact.forest.predict(X), self.model.predict(X))
+        np.testing.assert_array_equal(artifact.load_model().predict(X), self.model.predict(X))
+
+    def test_checksum_is_verified_when_the_model_is_unpickled(self):
+        self.rewrite(checksum='0' * 64)
+        artifact = read_artifact(self.path, FEATURES)
+        with self.assertRaisesMessage(ModelArtifactError, 'checksum mismatch'):
+            artifact.load_model()
+
+    def test_rejects_a_forest_that_does_not_match_its_fingerprint(self):
+        self.rewrite(forest_fingerprint='0' * 64)
+        with self.assertRaisesMessage(ModelArtifactError, 'fingerprint mismatch'):
+            read_artifact(self.path, FEATURES)
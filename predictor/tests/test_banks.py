@@ -0,0 +1,51 @@
+import numpy as np
+from django.test import TestCase, override_settings
+
+from ..banks import get_bank_index, invalidate_bank_index, match_banks
+from ..models import Bank
+from ..views import get_suitable_banks
+
+
+class BankIndexTests(TestCase):
+    """The cached rules follow the Bank table (banks come from migration 0002)"""
+
+    def setUp(self):
+        # The index is process-wide and outlives each test's transaction
+        invalidate_bank_index()
+        self.addCleanup(invalidate_bank_index)
+
+    @override_settings(CIBIL_BANK_CHECK_INTERVAL=0)
+    def test_rereads_rows_changed_by_another_process(self):
+        index = get_bank_index()
+        self.assertEqual(len(index), Bank.objects.count())
+        self.assertIs(get_bank_index(), index)  # same rows, same object
+
+        # A queryset update sends no signal, like an edit made in another process
+        Bank.objects.filter(pk=Bank.objects.order_by('id')[0].pk).update(min_cibil_score=899)
+        fresh = get_bank_index()
+        self.assertNotEqual(fresh.version, index.version)
+        self.assertIn(899, fresh.min_scores)
+
+    @override_settings(CIBIL_BANK_CHECK_INTERVAL=3600)
+    def test_saving_a_bank_reloads_this_process_after_commit(self):
+        index = get_bank_index()
+        bank = Bank.objects.order_by('id')[0]
+        bank.min_cibil_score = 899
+        with self.captureOnCommitCallbacks(execute=True):
+            bank.save()
+        self.assertIn(899, get_bank_index().min_scores)
+        self.assertNotEqual(get_bank_index().version, index.version)
+
+
+class BankMatchingTests(TestCase):
+    """match_banks is the vectorized get_suitable_banks (banks come from migration 0002)"""
+
+    def test_match_banks_matches_get_suitable_banks(self):
+        rng = np.random.default_rng(2)
+        n = 500
+        scores = rng.integers(300, 901, n)
+        loans = rng.uniform(10000, 5000000, n).round(2)
+        incomes = rng.uniform(1000, 300000, n).round(2)
+        matches = match_banks(get_bank_index(), scores, loans, incomes)
+        for i in range(n):
+            self.assertEqual(matches.banks(i), get_suitable_banks(int(scores[i]), loans[i], incomes[i]), i)
@@ -0,0 +1,66 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from ..batcher import MicroBatcher
+
+
+def score_rows(rows):
+    # Row i scores 300 + i, so every caller can check it got its own answer
+    return [300 + row[0] for row in rows]
+
+
+class StalledBatcher(MicroBatcher):
+    """A batcher whose thread answers nothing until it is stopped"""
+
+    def _run(self):
+        self._stopping.wait()
+
+
+class MicroBatcherTests(SimpleTestCase):
+    def test_routes_each_score_to_its_caller(self):
+        batcher = MicroBatcher(score_rows, max_batch=16, max_wait_ms=20, log_interval=0)
+        self.addCleanup(batcher.stop)
+        results = {}
+        start = threading.Barrier(64)
+
+        def predict(i):
+            start.wait()
+            results[i] = batcher.predict([i, 0, 0, 0, 0], timeout=5)
+
+        threads = [threading.Thread(target=predict, args=(i,)) for i in range(64)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {i: 300 + i for i in range(64)})
+        stats = batcher.stats()
+        self.assertEqual(stats['items'], 64)
+        self.assertLess(stats['batches'], 64)
+        self.assertLessEqual(stats['batch_size']['max'], 16)
+
+    def test_errors_reach_every_caller_in_the_batch(self):
+        def fail(rows):
+            raise RuntimeError('model unavailable')
+
+        batcher = MicroBatcher(fail, log_interval=0)
+        self.addCleanup(batcher.stop)
+        with self.assertRaisesMessage(RuntimeError, 'model unavailable'):
+            batcher.predict([1, 0, 0, 0, 0], timeout=5)
+        self.assertEqual(batcher.stats()['errors'], 1)
+
+    def test_full_queue_predicts_inline(self):
+        batcher = StalledBatcher(score_rows, max_queue=1, log_interval=0)
+        self.addCleanup(batcher.stop)
+        queued = batcher.submit([1, 0, 0, 0, 0])
+        self.assertFalse(queued.done())
+        self.assertEqual(batcher.submit([2, 0, 0, 0, 0]).result(0), 302)
+        self.assertEqual(batcher.stats()['inline'], 1)
+        self.assertEqual(batcher.pending(), 1)
+
+    def test_stop_answers_rows_already_queued(self):
+        batcher = MicroBatcher(score_rows, max_wait_ms=50, log_interval=0)
+        futures = [batcher.submit([i, 0, 0, 0, 0]) for i in range(10)]
+        batcher.stop()
+        self.assertEqual([f.result(0) for f in futures], [300 + i for i in range(10)])
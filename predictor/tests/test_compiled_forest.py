@@ -0,0 +1,30 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from ..compiled_forest import CompiledForest
+from ..ml_model import COMPILED_MAX_ROWS
+from .helpers import applicant_rows, fit_forest, serving_predictor
+
+
+class CompiledForestTests(SimpleTestCase):
+    """The compiled forest must reproduce sklearn exactly"""
+
+    def test_predict_matches_sklearn(self):
+        model = fit_forest()
+        X = applicant_rows(2000)
+        np.testing.assert_array_equal(CompiledForest.from_sklearn(model).predict(X), model.predict(X))
+
+    def test_predict_batch_matches_predict_score_and_sklearn(self):
+        model = fit_forest()
+        predictor = serving_predictor(model)
+        # Small batches use the compiled forest, large ones sklearn
+        for n in (COMPILED_MAX_ROWS, COMPILED_MAX_ROWS + 1):
+            X = applicant_rows(n)
+            expected = np.clip(model.predict(X).astype(int), 300, 900)
+            np.testing.assert_array_equal(predictor.predict_batch(X), expected)
+        self.assertEqual([predictor.predict_score(*row) for row in X[:50]], expected[:50].tolist())
+
+    def test_arrays_round_trip(self):
+        forest = CompiledForest.from_sklearn(fit_forest(n_estimators=3))
+        restored = CompiledForest.from_arrays(forest.to_arrays())
+        self.assertEqual(restored.fingerprint(), forest.fingerprint())
@@ -0,0 +1,45 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from ..compression import CompressionError, compress_forest, greedy_subsets
+from ..training_data import extended_chunk, generate_training_data
+from .helpers import fit_forest
+
+
+class GreedySubsetsTests(SimpleTestCase):
+    def test_drops_the_tree_that_hurts_least_first(self):
+        y = np.zeros(2)
+        tree_predictions = np.array([[0.0, 0.0], [10.0, 10.0], [1.0, -1.0], [4.0, 4.0]])
+        self.assertEqual(greedy_subsets(tree_predictions, y, (1, 2, 4)), {2: [0, 2], 1: [0]})
+
+
+class CompressForestTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.model = fit_forest(n_estimators=5, max_depth=6, n_samples=1000)
+        cls.X, cls.y = generate_training_data(extended_chunk, 1000, seed=0)
+        cls.X_tune, cls.y_tune = generate_training_data(extended_chunk, 500, seed=2)
+        cls.X_select, cls.y_select = generate_training_data(extended_chunk, 500, seed=3)
+
+    def compress(self, **options):
+        return compress_forest(self.model, self.X, self.y, self.X_tune, self.y_tune, self.X_select, self.y_select,
+                               depths=(4, 6), leaf_sizes=(1,), tree_counts=(2, 5), **options)
+
+    def test_chooses_the_smallest_candidate_within_tolerance(self):
+        result = self.compress(mae_tolerance=0.5)
+        self.assertIs(result.reference.model, self.model)
+        # Scored on the selection set only
+        self.assertAlmostEqual(result.reference.selection_mae,
+                               float(np.abs(self.model.predict(self.X_select) - self.y_select).mean()))
+        eligible = [c for c in result.candidates if c.selection_mae <= result.max_mae]
+        self.assertIn(result.chosen, eligible)
+        self.assertEqual(result.chosen.size_bytes, min(c.size_bytes for c in eligible))
+        self.assertLess(result.chosen.size_bytes, result.reference.size_bytes)
+        self.assertEqual(result.summary()['chosen'], result.chosen.as_dict())
+
+    def test_raises_with_the_report_when_nothing_fits_the_budget(self):
+        with self.assertRaises(CompressionError) as raised:
+            self.compress(latency_budget_ms=0)
+        self.assertIsNone(raised.exception.result.chosen)
+        self.assertGreater(len(raised.exception.result.candidates), 1)
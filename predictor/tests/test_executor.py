@@ -0,0 +1,54 @@
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory, TestCase, override_settings
+
+from .. import views
+from ..executor import ExecutorOverloaded, InferenceExecutor
+from ..models import CibilPrediction
+from .helpers import isolate_registry
+
+
+# Saved inside the test's transaction, not by the shared writer thread
+@override_settings(CIBIL_WRITE_BEHIND=False)
+class InferenceExecutorTests(TestCase):
+    applicant = {'name': 'Asha', 'age': 32, 'monthly_income': 60000, 'desired_loan_amount': 500000,
+                 'existing_loans': 1}
+
+    def setUp(self):
+        isolate_registry(self)
+        self.executor = InferenceExecutor(max_workers=1, max_pending=1)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def saturate(self):
+        return self.executor.try_submit(self.release.wait, 5)
+
+    def predict_async(self):
+        request = RequestFactory().post('/predict/', self.applicant)
+        with mock.patch.object(views, 'inference_executor', self.executor):
+            return async_to_sync(views.predict_cibil_async)(request)
+
+    def test_rejects_beyond_max_pending_and_frees_slots(self):
+        running = self.saturate()
+        with self.assertRaises(ExecutorOverloaded):
+            self.executor.try_submit(int)
+        self.assertEqual(self.executor.rejected, 1)
+        self.release.set()
+        running.result(5)
+        self.assertEqual(self.executor.try_submit(int, '7').result(5), 7)
+
+    def test_async_view_sheds_load_with_503_and_retry_after(self):
+        self.saturate()
+        with self.settings(CIBIL_RETRY_AFTER=3):
+            response = self.predict_async()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '3')
+        self.assertEqual(CibilPrediction.objects.count(), 0)
+
+    def test_async_view_scores_on_the_executor(self):
+        response = self.predict_async()
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Asha')
+        self.assertEqual(CibilPrediction.objects.count(), 1)
@@ -0,0 +1,51 @@
+import csv
+import datetime
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from ..export import EXPORT_FIELDS, filtered_predictions, iter_predictions
+from ..models import CibilPrediction
+
+
+class ExportTests(TestCase):
+    def test_keyset_pages_return_every_row_once(self):
+        for score in range(600, 611):
+            CibilPrediction.objects.create(age=30, service_years=30, monthly_income=50000,
+                                           desired_loan_amount=200000, existing_loans=1, predicted_score=score)
+        # Several rows per timestamp, so pages split inside a run of equal created_at
+        start = timezone.now().replace(microsecond=0)
+        for i, pk in enumerate(CibilPrediction.objects.order_by('id').values_list('id', flat=True)):
+            CibilPrediction.objects.filter(pk=pk).update(created_at=start + datetime.timedelta(seconds=i // 4))
+
+        pages = list(iter_predictions(filtered_predictions(), page_size=3))
+        ids = [row[0] for page in pages for row in page]
+        self.assertEqual(sorted(ids), sorted(CibilPrediction.objects.values_list('id', flat=True)))
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertTrue(all(len(page) <= 3 for page in pages))
+
+        high = [row[-1] for page in iter_predictions(filtered_predictions(min_score=605), page_size=2) for row in page]
+        self.assertEqual(sorted(high), list(range(605, 611)))
+
+    def test_streams_csv_and_ndjson_to_staff(self):
+        for score in (580, 640, 720):
+            CibilPrediction.objects.create(age=30, service_years=30, monthly_income=50000,
+                                           desired_loan_amount=200000, existing_loans=1, predicted_score=score)
+        self.assertEqual(self.client.get('/export/predictions/').status_code, 302)
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+
+        response = self.client.get('/export/predictions/', {'min_score': 600})
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="cibil_predictions.csv"')
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], list(EXPORT_FIELDS))
+        self.assertEqual(sorted(int(row[-1]) for row in rows[1:]), [640, 720])
+
+        response = self.client.get('/export/predictions/', {'format': 'ndjson', 'max_score': 600})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['predicted_score'] for line in lines], [580])
+
+        for params in ({'format': 'xml'}, {'since': 'yesterday'}, {'min_score': 'high'}):
+            self.assertEqual(self.client.get('/export/predictions/', params).status_code, 400, params)
@@ -0,0 +1,52 @@
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..metrics import MetricsRegistry
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    def test_renders_cumulative_buckets_and_callbacks(self):
+        metrics = MetricsRegistry()
+        histogram = metrics.histogram('test_seconds', 'Test timings', ('span',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.labels('a "quoted"\nname').observe(value)
+        metrics.callback('test_pending', 'Pending items', lambda: 7)
+        metrics.callback('test_total', 'Total items', lambda: 12, kind='counter')
+        metrics.callback('test_broken', 'Raises when read', lambda: 1 / 0)
+
+        lines = metrics.render().splitlines()
+        labels = 'span="a \\"quoted\\"\\nname"'
+        self.assertEqual(lines[:7], [
+            '# HELP test_seconds Test timings',
+            '# TYPE test_seconds histogram',
+            f'test_seconds_bucket{{{labels},le="0.1"}} 1',
+            f'test_seconds_bucket{{{labels},le="1.0"}} 3',
+            f'test_seconds_bucket{{{labels},le="+Inf"}} 4',
+            f'test_seconds_sum{{{labels}}} 6.05',
+            f'test_seconds_count{{{labels}}} 4',
+        ])
+        self.assertEqual(lines[7:], [
+            '# HELP test_pending Pending items', '# TYPE test_pending gauge', 'test_pending 7',
+            '# HELP test_total Total items', '# TYPE test_total counter', 'test_total 12',
+        ])
+
+    def test_labels_must_match_the_label_names(self):
+        histogram = MetricsRegistry().histogram('test_seconds', 'Test timings', ('span',))
+        with self.assertRaises(ValueError):
+            histogram.labels('a', 'b')
+
+
+class MetricsEndpointTests(TestCase):
+    def test_exposes_request_timings_and_gauges(self):
+        self.client.get('/')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('cibil_request_seconds_count{view="home",method="GET",status="200"}', body)
+        for name in ('cibil_model_fallback', 'cibil_write_behind_pending', 'cibil_inference_rejected_total',
+                     'cibil_result_cache_hits_total', 'cibil_shadow_dropped_total'):
+            self.assertIn(f'\n{name} ', body)
+
+    @override_settings(CIBIL_METRICS_ENABLED=False)
+    def test_can_be_disabled(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
@@ -0,0 +1,55 @@
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from ..models import CibilPrediction, DailyPredictionRollup, DailyScoreBucket
+from ..persistence import PredictionWriter
+
+
+class StalledWriter(PredictionWriter):
+    """A writer whose thread writes nothing until it is stopped"""
+
+    def _run(self):
+        self._stopping.wait()
+
+
+class WriteBehindTests(TransactionTestCase):
+    """The writer thread uses its own connection, so no wrapping transaction"""
+
+    def make_row(self, score):
+        return {
+            'age': 30, 'service_years': 30, 'monthly_income': 50000, 'desired_loan_amount': 200000,
+            'existing_loans': 1, 'predicted_score': score,
+        }
+
+    def test_flush_writes_rows_and_rollups(self):
+        writer = PredictionWriter(batch_size=2, flush_interval=0.05)
+        scores = [780, 720, 660, 610, 450]
+        for score in scores:
+            writer.submit(**self.make_row(score))
+        writer.stop()
+
+        self.assertEqual(sorted(CibilPrediction.objects.values_list('predicted_score', flat=True)), sorted(scores))
+        rollup = DailyPredictionRollup.objects.get(date=timezone.localdate())
+        self.assertEqual(rollup.count, 5)
+        self.assertEqual(rollup.score_sum, sum(scores))
+        self.assertEqual((rollup.excellent, rollup.very_good, rollup.good, rollup.fair, rollup.poor), (1, 1, 1, 1, 1))
+        self.assertEqual(sum(DailyScoreBucket.objects.values_list('count', flat=True)), 5)
+
+    def test_bad_row_only_loses_itself(self):
+        writer = PredictionWriter(retries=0)
+        rows = [CibilPrediction(**self.make_row(score)) for score in (700, None, 650)]
+        writer._write(rows)
+        self.assertEqual(CibilPrediction.objects.count(), 2)
+        self.assertEqual(writer.dropped, 1)
+        self.assertEqual(DailyPredictionRollup.objects.get().count, 2)
+
+    def test_full_buffer_writes_inline_and_stop_flushes_the_rest(self):
+        writer = StalledWriter(max_buffer=1, put_timeout=0.01)
+        for score in (700, 650, 600):
+            writer.submit(**self.make_row(score))
+        # One row buffered, the two that did not fit written by their callers
+        self.assertEqual(writer.pending(), 1)
+        self.assertEqual(CibilPrediction.objects.count(), 2)
+        writer.stop()
+        self.assertEqual(CibilPrediction.objects.count(), 3)
+        self.assertEqual(writer.dropped, 0)
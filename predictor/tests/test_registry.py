@@ -0,0 +1,87 @@
+import os
+
+from django.test import SimpleTestCase, override_settings
+
+from ..artifact import write_artifact
+from ..ml_model import FEATURES
+from ..registry import FALLBACK_VERSION, ModelRegistry
+from .helpers import applicant_rows, fit_forest, temp_model_path
+
+
+@override_settings(CIBIL_MODEL_CHECK_INTERVAL=0)
+class ModelRegistryTests(SimpleTestCase):
+    """One predictor per process, swapped when a new model file is published"""
+
+    def setUp(self):
+        self.model_path = temp_model_path(self)
+        self.X = applicant_rows(20)
+
+    def publish(self, seed):
+        model = fit_forest(n_estimators=3, max_depth=4, seed=seed)
+        write_artifact(self.model_path, model, FEATURES, {'seed': seed})
+        return model
+
+    def test_shares_one_predictor_until_the_file_changes(self):
+        self.publish(seed=0)
+        registry = ModelRegistry(self.model_path)
+        predictor = registry.get_predictor()
+        self.assertFalse(predictor.is_fallback)
+        self.assertIs(registry.get_predictor(), predictor)
+
+        # Touched but not modified: same hash, same predictor
+        os.utime(self.model_path, ns=(1, 1))
+        self.assertIs(registry.get_predictor(), predictor)
+
+    def test_hot_swaps_a_newly_published_model(self):
+        self.publish(seed=0)
+        registry = ModelRegistry(self.model_path)
+        old_predictor, old_version = registry.get_predictor(), registry.version
+
+        model = self.publish(seed=1)
+        predictor = registry.get_predictor()
+        self.assertIsNot(predictor, old_predictor)
+        self.assertNotEqual(registry.version, old_version)
+        self.assertEqual(predictor.metadata, {'seed': 1})
+        self.assertEqual(predictor.predict_batch(self.X).tolist(),
+                         [max(300, min(900, int(s))) for s in model.predict(self.X)])
+
+    @override_settings(CIBIL_MODEL_CHECK_INTERVAL=3600)
+    def test_stats_the_file_at_most_once_per_interval(self):
+        self.publish(seed=0)
+        registry = ModelRegistry(self.model_path)
+        predictor = registry.get_predictor()
+        self.publish(seed=1)
+        self.assertIs(registry.get_predictor(), predictor)
+        self.assertIsNot(registry.reload(), predictor)
+
+    def test_serves_the_fallback_until_a_model_is_published(self):
+        registry = ModelRegistry(self.model_path)
+        self.assertTrue(registry.get_predictor().is_fallback)
+        self.assertEqual(registry.version, FALLBACK_VERSION)
+        self.assertFalse(os.path.exists(self.model_path))  # requests never train
+
+        self.publish(seed=0)
+        self.assertFalse(registry.get_predictor().is_fallback)
+        self.assertNotEqual(registry.version, FALLBACK_VERSION)
+
+    def test_keeps_the_current_model_when_a_broken_file_is_published(self):
+        self.publish(seed=0)
+        registry = ModelRegistry(self.model_path)
+        predictor, version = registry.get_predictor(), registry.version
+
+        with open(self.model_path, 'wb') as f:
+            f.write(b'truncated')
+        self.assertIs(registry.get_predictor(), predictor)
+        self.assertEqual(registry.version, version)
+        # A missing file keeps it too
+        os.remove(self.model_path)
+        self.assertIs(registry.get_predictor(), predictor)
+
+        self.publish(seed=1)
+        self.assertIsNot(registry.get_predictor(), predictor)
+
+    def test_broken_file_without_a_current_model_serves_the_fallback(self):
+        with open(self.model_path, 'wb') as f:
+            f.write(b'truncated')
+        registry = ModelRegistry(self.model_path)
+        self.assertTrue(registry.get_predictor().is_fallback)
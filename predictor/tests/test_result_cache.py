@@ -0,0 +1,43 @@
+from django.test import SimpleTestCase
+
+from ..result_cache import LocalResultCache, ResultCache
+
+
+class ResultCacheTests(SimpleTestCase):
+    applicant = {'age': 32, 'service_years': 28, 'monthly_income': 60000.001, 'desired_loan_amount': 500000,
+                 'existing_loans': 1}
+
+    def setUp(self):
+        self.cache = ResultCache(LocalResultCache(max_entries=2, ttl=300))
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return self.calls, []
+
+    def lookup(self, applicant=None, model_version='m1', bank_version='b1'):
+        return self.cache.get_or_compute(applicant or self.applicant, model_version, bank_version, self.compute)
+
+    def test_hits_on_normalized_features(self):
+        self.assertEqual(self.lookup(), (1, []))
+        # Rounded to paise, so the same key
+        self.assertEqual(self.lookup({**self.applicant, 'monthly_income': '60000.00'}), (1, []))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_model_or_bank_version_change_invalidates(self):
+        self.lookup()
+        self.assertEqual(self.lookup(model_version='m2'), (2, []))
+        self.assertEqual(self.lookup(model_version='m2', bank_version='b2'), (3, []))
+        # Entries of earlier versions are cleared, not just bypassed
+        self.assertEqual(self.cache.stats()['entries'], 1)
+        self.assertEqual(self.lookup(), (4, []))
+
+    def test_evicts_least_recently_used(self):
+        self.lookup()
+        self.lookup({**self.applicant, 'age': 40})
+        self.lookup()
+        self.lookup({**self.applicant, 'age': 50})
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+        self.assertEqual(self.lookup(), (1, []))
+        self.assertEqual(self.lookup({**self.applicant, 'age': 40}), (4, []))
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+import os
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ..artifact import write_artifact
+from ..ml_model import FEATURES
+from .helpers import fit_forest, isolate_registry, temp_model_path
+
+
+class ScoreFileTests(TestCase):
+    rows = [
+        {'age': 32, 'monthly_income': 60000, 'desired_loan_amount': 500000, 'existing_loans': 1},
+        {'age': 45, 'monthly_income': 120000, 'desired_loan_amount': 2500000, 'existing_loans': 0},
+        {'age': 12, 'monthly_income': 30000, 'desired_loan_amount': 100000, 'existing_loans': 2},
+        {'age': 28, 'monthly_income': 25000, 'desired_loan_amount': 300000, 'existing_loans': 5},
+        {'age': 60, 'monthly_income': 90000, 'desired_loan_amount': 800000, 'existing_loans': 3},
+    ]
+
+    def setUp(self):
+        model_path = temp_model_path(self)
+        write_artifact(model_path, fit_forest(n_estimators=3, max_depth=6), FEATURES, {})
+        isolate_registry(self, model_path)
+        directory = os.path.dirname(model_path)
+        self.input_path = os.path.join(directory, 'applicants.csv')
+        self.output_path = os.path.join(directory, 'scores.csv')
+        with open(self.input_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.rows[0]))
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+    def score(self, **options):
+        call_command('score_file', self.input_path, self.output_path, chunk_size=2, workers=1,
+                     stdout=io.StringIO(), **options)
+        with open(self.output_path, 'rb') as f:
+            return f.read()
+
+    def test_scores_every_row_in_order(self):
+        with open(self.output_path + '.checkpoint', 'w'):
+            pass  # left over from an earlier run; replaced, then removed
+        output = self.score()
+        results = list(csv.DictReader(io.StringIO(output.decode())))
+        self.assertEqual([int(r['age']) for r in results], [r['age'] for r in self.rows])
+        self.assertTrue(results[2]['error'])
+        self.assertEqual(results[2]['predicted_score'], '')
+        for result in results[:2] + results[3:]:
+            self.assertEqual(result['error'], '')
+            self.assertTrue(300 <= int(result['predicted_score']) <= 900)
+        self.assertFalse(os.path.exists(self.output_path + '.checkpoint'))
+
+    def test_resume_continues_after_the_last_completed_chunk(self):
+        expected = self.score()
+        # Interrupted after the first chunk, in the middle of writing the second
+        first_chunk = b''.join(expected.splitlines(keepends=True)[:3])
+        with open(self.output_path, 'wb') as f:
+            f.write(first_chunk + b'28,25000,3000')
+        with open(self.output_path + '.checkpoint', 'w') as f:
+            json.dump({'input': os.path.abspath(self.input_path), 'rows_done': 2,
+                       'output_bytes': len(first_chunk)}, f)
+
+        self.assertEqual(self.score(resume=True), expected)
+        self.assertFalse(os.path.exists(self.output_path + '.checkpoint'))
+
+    def test_resume_rejects_a_checkpoint_for_another_input(self):
+        with open(self.output_path + '.checkpoint', 'w') as f:
+            json.dump({'input': '/elsewhere.csv', 'rows_done': 2, 'output_bytes': 10}, f)
+        with self.assertRaisesMessage(CommandError, 'Checkpoint belongs to'):
+            self.score(resume=True)
+
+    def test_refuses_to_score_with_the_fallback(self):
+        isolate_registry(self)
+        with self.assertRaisesMessage(CommandError, 'No trained model'):
+            self.score()
@@ -0,0 +1,60 @@
+import io
+import os
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from ..artifact import write_artifact
+from ..compiled_forest import CompiledForest
+from ..ml_model import FEATURES
+from ..registry import ModelRegistry
+from ..score_table import ScoreTable, table_paths
+from .helpers import applicant_rows, fit_forest, serving_predictor, temp_model_path
+
+
+class ScoreTableTests(SimpleTestCase):
+    """The score table must reproduce sklearn exactly"""
+
+    def test_score_table_matches_sklearn(self):
+        model = fit_forest(n_estimators=5, max_depth=4)
+        forest = CompiledForest.from_sklearn(model)
+        table = ScoreTable.build(forest)
+        X = applicant_rows(2000)
+        # Rows exactly on split thresholds take the left branch
+        thresholds = forest.thresholds_by_feature()
+        on_split = np.column_stack([np.resize(t, 50) for t in thresholds]).astype(float)
+        for rows in (X, on_split):
+            np.testing.assert_array_equal(table.predict(rows), model.predict(rows))
+        np.testing.assert_array_equal(serving_predictor(model, table).predict_batch(X),
+                                      np.clip(model.predict(X).astype(int), 300, 900))
+
+    def test_score_table_refuses_large_grids(self):
+        forest = CompiledForest.from_sklearn(fit_forest(n_estimators=5, max_depth=4))
+        with self.assertRaises(ValueError):
+            ScoreTable.build(forest, max_cells=10)
+
+    def test_save_and_load_memory_map_the_grid(self):
+        model_path = temp_model_path(self)
+        forest = CompiledForest.from_sklearn(fit_forest(n_estimators=3, max_depth=4))
+        ScoreTable.build(forest).save(model_path)
+        table = ScoreTable.load(model_path, forest.fingerprint())
+        self.assertIsInstance(table.grid, np.memmap)
+        X = applicant_rows(500)
+        np.testing.assert_array_equal(table.predict(X), forest.predict(X))
+        # A table built for another forest is ignored
+        self.assertIsNone(ScoreTable.load(model_path, 'other'))
+
+    @override_settings(CIBIL_MODEL_CHECK_INTERVAL=0)
+    def test_registry_picks_up_a_table_built_for_the_served_model(self):
+        model_path = temp_model_path(self)
+        write_artifact(model_path, fit_forest(n_estimators=3, max_depth=4), FEATURES, {})
+        registry = ModelRegistry(model_path)
+        self.assertIsNone(registry.get_predictor().table)
+
+        call_command('build_score_table', model=model_path, stdout=io.StringIO())
+        self.assertIsNotNone(registry.get_predictor().table)
+
+        for path in table_paths(model_path):
+            os.remove(path)
+        self.assertIsNone(registry.get_predictor().table)
@@ -0,0 +1,59 @@
+import time
+
+from django.test import SimpleTestCase
+
+from ..artifact import write_artifact
+from ..fallback import RuleBasedPredictor
+from ..ml_model import FEATURES
+from ..shadow import ShadowEvaluator
+from .helpers import applicant_rows, fit_forest, isolate_registry, temp_model_path
+
+
+class StalledShadow(ShadowEvaluator):
+    """An evaluator whose thread scores nothing until it is stopped"""
+
+    def _run(self):
+        self._stopping.wait()
+
+
+class ShadowEvaluatorTests(SimpleTestCase):
+    def setUp(self):
+        # The served scores come from the fallback, the candidate from a small forest
+        isolate_registry(self)
+        self.candidate_path = temp_model_path(self)
+        write_artifact(self.candidate_path, fit_forest(n_estimators=3, max_depth=6), FEATURES, {})
+        self.rows = applicant_rows(40).tolist()
+
+    def test_drops_samples_when_the_queue_is_full(self):
+        shadow = StalledShadow(self.candidate_path, sample_rate=1.0, max_queue=2, log_interval=0)
+        self.addCleanup(shadow.stop)
+        started = time.perf_counter()
+        for row in self.rows[:5]:
+            shadow.offer(row, 700)
+        self.assertLess(time.perf_counter() - started, 1.0)  # never waits for the shadow
+        stats = shadow.stats()
+        self.assertEqual((stats['sampled'], stats['dropped'], stats['pending']), (2, 3, 2))
+
+    def test_disabled_without_a_model_or_sample_rate(self):
+        for shadow in (StalledShadow(None, sample_rate=1.0), StalledShadow(self.candidate_path, sample_rate=0)):
+            shadow.offer(self.rows[0], 700)
+            self.assertEqual(shadow.stats()['sampled'], 0)
+            self.assertIsNone(shadow._thread)
+
+    def test_compares_the_candidate_with_the_served_scores(self):
+        shadow = ShadowEvaluator(self.candidate_path, sample_rate=1.0, batch_size=8, log_interval=0)
+        self.addCleanup(shadow.stop)
+        served = RuleBasedPredictor().predict_batch(self.rows).tolist()
+        for row, score in zip(self.rows, served):
+            shadow.offer(row, score)
+        deadline = time.monotonic() + 10
+        while shadow.stats()['evaluated'] < len(self.rows) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        stats = shadow.stats()
+        self.assertEqual((stats['evaluated'], stats['errors'], stats['dropped']), (len(self.rows), 0, 0))
+        self.assertEqual(stats['score_delta']['count'], len(self.rows))
+        self.assertEqual(stats['served_ms_per_row']['count'], stats['candidate_ms_per_row']['count'])
+        self.assertEqual(stats['category_flips'], sum(stats['flips'].values()))
+        shadow.reset_stats()
+        self.assertEqual(shadow.stats()['evaluated'], 0)
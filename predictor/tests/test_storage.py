@@ -0,0 +1,49 @@
+import gzip
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from ..storage import MIN_COMPRESS_SIZE, CibilStaticFilesStorage, minify_css
+
+
+class MinifyCssTests(SimpleTestCase):
+    def test_strips_comments_and_whitespace_outside_strings(self):
+        css = '''/* header */
+a :hover , b > c {
+    color : red ;
+    content: "  /* kept */  ";
+    background: url('a b.png');
+}
+@media (max-width: 600px) { .x { margin: 0 auto; } }
+'''
+        self.assertEqual(minify_css(css), 'a :hover,b>c{color :red;content:"  /* kept */  ";'
+                                          "background:url('a b.png')}@media (max-width:600px){.x{margin:0 auto}}\n")
+
+    def test_a_lone_slash_is_not_a_comment(self):
+        self.assertEqual(minify_css('a { width: calc(100% / 3) } /* end */'), 'a{width:calc(100% / 3)}\n')
+
+
+class StaticStorageTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = CibilStaticFilesStorage(location=directory.name, base_url='/static/')
+
+    def read(self, name):
+        with self.storage.open(name) as f:
+            return f.read()
+
+    def test_css_is_minified_when_saved(self):
+        self.storage._save('css/site.css', ContentFile(b'/* c */ body { margin : 0 ; }'))
+        self.assertEqual(self.read('css/site.css'), b'body{margin :0}\n')
+
+    def test_precompresses_only_files_worth_it(self):
+        big = b'.row { display: flex; }\n' * 50
+        self.storage._save('css/big.css', ContentFile(big))
+        self.storage._save('css/small.css', ContentFile(b'a{color:red}'))
+        for name in ('css/big.css', 'css/small.css'):
+            self.storage._precompress(name)
+        self.assertGreaterEqual(len(self.read('css/big.css')), MIN_COMPRESS_SIZE)
+        self.assertEqual(gzip.decompress(self.read('css/big.css.gz')), self.read('css/big.css'))
+        self.assertFalse(self.storage.exists('css/small.css.gz'))
@@ -0,0 +1,92 @@
+import json
+
+from django.test import TestCase
+
+from ..fallback import RuleBasedPredictor
+from ..models import CibilPrediction
+from ..views import applicant_features, validate_applicant
+from .helpers import isolate_registry
+
+
+class ViewTestCase(TestCase):
+    applicant = {'age': 32, 'monthly_income': 60000, 'desired_loan_amount': 500000, 'existing_loans': 1}
+
+    def setUp(self):
+        # No model file: scores come from the rule-based fallback
+        isolate_registry(self)
+
+    def post_json(self, url, payload):
+        body = payload if isinstance(payload, str) else json.dumps(payload)
+        return self.client.post(url, body, content_type='application/json')
+
+
+class InputValidationTests(ViewTestCase):
+    def test_form_rejects_bad_input(self):
+        for field, value in [('age', 12), ('age', 'abc'), ('monthly_income', 'nan'),
+                             ('desired_loan_amount', 'inf'), ('existing_loans', -1)]:
+            response = self.client.post('/predict/', {**self.applicant, field: value})
+            self.assertEqual(response.status_code, 400, (field, value))
+        self.assertEqual(CibilPrediction.objects.count(), 0)
+
+    def test_batch_rejects_bad_input(self):
+        self.assertEqual(self.post_json('/predict/batch/', '{not json').status_code, 400)
+        self.assertEqual(self.post_json('/predict/batch/', []).status_code, 400)
+        for body in ('[{"age": 32, "monthly_income": NaN, "desired_loan_amount": 500000, "existing_loans": 1}]',
+                     '[{"age": 32, "monthly_income": 60000, "desired_loan_amount": Infinity, "existing_loans": 1}]',
+                     '[{"age": Infinity, "monthly_income": 60000, "desired_loan_amount": 500000, "existing_loans": 1}]',
+                     '[{"age": NaN, "monthly_income": 60000, "desired_loan_amount": 500000, "existing_loans": 1}]',
+                     '[{"age": 32, "monthly_income": 60000, "desired_loan_amount": 500000, "existing_loans": -Infinity}]'):
+            response = self.post_json('/predict/batch/', body)
+            self.assertEqual(response.status_code, 400, body)
+            self.assertEqual(response.json()['errors'][0]['index'], 0)
+
+    def test_batch_scores_valid_input(self):
+        applicants = [self.applicant, {**self.applicant, 'existing_loans': 4}]
+        response = self.post_json('/predict/batch/', applicants)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 2)
+        expected = RuleBasedPredictor().predict_batch([applicant_features(validate_applicant(a)) for a in applicants])
+        self.assertEqual([r['predicted_score'] for r in response.json()['results']], expected.tolist())
+
+
+class WhatIfTests(ViewTestCase):
+    def test_rejects_infinite_counts(self):
+        body = '{"applicant": {"age": 32, "monthly_income": 60000, "desired_loan_amount": 500000, "existing_loans": Infinity}}'
+        self.assertEqual(self.post_json('/predict/what-if/', body).status_code, 400)
+
+    def test_rejects_oversized_grids_before_building_them(self):
+        huge = {'applicant': {**self.applicant, 'existing_loans': 100}}
+        for grid in ({'min': 0, 'max': 10 ** 9}, list(range(6000))):
+            response = self.post_json('/predict/what-if/', {**huge, 'existing_loans': grid})
+            self.assertEqual(response.status_code, 400)
+        response = self.post_json('/predict/what-if/', {**huge, 'loan_amounts': [100000] * 6000})
+        self.assertEqual(response.status_code, 400)
+        # Each axis within limits, but not their product
+        response = self.post_json('/predict/what-if/', {
+            **huge, 'existing_loans': {'min': 0, 'max': 100}, 'loan_amounts': {'max': 10 ** 8, 'steps': 100},
+        })
+        self.assertEqual(response.status_code, 413)
+        response = self.post_json('/predict/what-if/', {'applicant': {**self.applicant, 'existing_loans': 10 ** 9}})
+        self.assertEqual(response.status_code, 400)
+
+    def test_accepts_many_existing_loans(self):
+        response = self.post_json('/predict/what-if/', {'applicant': {**self.applicant, 'existing_loans': 60}})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(60, response.json()['existing_loans'])
+        self.assertEqual(CibilPrediction.objects.count(), 0)
+
+    def test_sweeps_the_grid_with_the_served_model(self):
+        response = self.post_json('/predict/what-if/', {
+            'applicant': self.applicant, 'loan_amounts': [2000000, 100000, 500000], 'existing_loans': [3, 0, 1],
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['loan_amounts'], data['existing_loans']), ([100000, 500000, 2000000], [0, 1, 3]))
+        applicant = validate_applicant(self.applicant)
+        for curve in data['curves']:
+            expected = [RuleBasedPredictor().predict_score(*applicant_features(
+                {**applicant, 'desired_loan_amount': amount, 'existing_loans': curve['existing_loans']}))
+                for amount in data['loan_amounts']]
+            self.assertEqual(curve['scores'], expected)
+        current, = [c for c in data['curves'] if c['existing_loans'] == 1]
+        self.assertEqual(data['max_approvable_amount'], current['max_approvable_amount'])
@@ -0,0 +1,85 @@
+"""Vectorized synthetic training data for the CIBIL score models.
+
+Each ``*_chunk`` function draws one block of features from a NumPy
+``Generator`` and labels it with the same rules the original per-sample
+loops used. ``iter_training_chunks`` streams blocks of ``chunk_size`` rows so
+temporaries stay bounded however many samples are requested.
+"""
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+# Lookup tables for the 5-feature rules. np.digitize returns how many bin
+# edges a value has passed, which indexes straight into the points table.
+INCOME_EDGES = [20000, 30000, 50000, 75000, 100000]      # >= edge
+INCOME_POINTS = np.array([20, 40, 60, 80, 100, 120])
+SERVICE_EDGES = [5, 15, 30]                               # >= edge
+SERVICE_POINTS = np.array([25, 40, 50, 60])
+DEBT_RATIO_EDGES = [2, 3, 5, 8]                           # <= edge
+DEBT_RATIO_POINTS = np.array([100, 80, 60, 40, 20])
+
+
+def extended_scores(age, service_years, monthly_income, loan_amount, existing_loans, noise):
+    """Label rules for the 5-feature model (adds service_years, uses monthly income)"""
+    income_score = INCOME_POINTS[np.digitize(monthly_income, INCOME_EDGES)]
+    service_score = SERVICE_POINTS[np.digitize(service_years, SERVICE_EDGES)]
+
+    annual_income = monthly_income * 12
+    safe_income = np.where(annual_income > 0, annual_income, 1)
+    debt_ratio = np.where(annual_income > 0, loan_amount / safe_income, 10)
+    debt_score = DEBT_RATIO_POINTS[np.digitize(debt_ratio, DEBT_RATIO_EDGES, right=True)]
+
+    loan_penalty = existing_loans * 25
+
+    final_score = 600 + (income_score * 0.3) + (service_score * 0.15) + (debt_score * 0.35) - loan_penalty
+    final_score = final_score + noise
+
+    # int() truncates towards zero before the range clamp
+    return np.clip(np.trunc(final_score).astype(np.int64), 300, 900)
+
+
+def extended_chunk(rng, n):
+    """Draw n rows for the 5-feature model; returns (X, y)"""
+    age = rng.normal(35, 10, n).clip(18, 70).astype(int)
+    service_years = (60 - age).clip(1, 47)  # Assume retirement age is 60
+    monthly_income = rng.lognormal(10.5, 0.8, n).clip(15000, 500000)
+    loan_amount = rng.lognormal(13, 1, n).clip(50000, 10000000)
+    existing_loans = rng.poisson(1.5, n).clip(0, 8)
+    noise = rng.normal(0, 30, n)
+
+    X = np.column_stack([age, service_years, monthly_income, loan_amount, existing_loans])
+    y = extended_scores(age, service_years, monthly_income, loan_amount, existing_loans, noise)
+    return X, y
+
+
+def iter_training_chunks(make_chunk, n_samples, seed=42, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (X, y) blocks of at most chunk_size rows until n_samples are produced.
+
+    Output is deterministic for a given (seed, chunk_size).
+    """
+    rng = np.random.default_rng(seed)
+    produced = 0
+    while produced < n_samples:
+        n = min(chunk_size, n_samples - produced)
+        yield make_chunk(rng, n)
+        produced += n
+
+
+def generate_training_data(make_chunk, n_samples, seed=42, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Materialize n_samples rows into preallocated (X, y) arrays, one chunk at a time"""
+    if n_samples <= 0:
+        raise ValueError("n_samples must be positive")
+    X = None
+    y = None
+    offset = 0
+    for X_chunk, y_chunk in iter_training_chunks(make_chunk, n_samples, seed, chunk_size):
+        if X is None:
+            X = np.empty((n_samples, X_chunk.shape[1]), dtype=np.float64)
+            y = np.empty(n_samples, dtype=np.int64)
+        end = offset + len(X_chunk)
+        X[offset:end] = X_chunk
+        y[offset:end] = y_chunk
+        offset = end
+    return X, y
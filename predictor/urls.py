@@ -1,7 +1,17 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Serve the form through the async view under ASGI (see CIBIL_ASYNC_PREDICT)
+predict_view = views.predict_cibil_async if getattr(settings, 'CIBIL_ASYNC_PREDICT', False) else views.predict_cibil
+
 urlpatterns = [
     path('', views.home, name='home'),
-    path('predict/', views.predict_cibil, name='predict_cibil'),
+    path('predict/', predict_view, name='predict_cibil'),
+    path('predict/batch/', views.predict_batch, name='predict_batch'),
+    path('predict/what-if/', views.predict_what_if, name='predict_what_if'),
+    path('metrics', views.metrics_view, name='metrics'),
+    path('analytics/daily/', views.analytics_daily, name='analytics_daily'),
+    path('export/predictions/', views.export_predictions, name='export_predictions'),
+    path('shadow/stats/', views.shadow_stats, name='shadow_stats'),
 ]
\ No newline at end of file
@@ -1,81 +1,183 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from .models import CibilPrediction
-from .ml_model import CibilScorePredictor
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+from .banks import get_bank_index, match_banks
+from .batcher import prediction_batcher
+from .executor import ExecutorOverloaded, inference_executor
+from .export import FORMATS as EXPORT_FORMATS, export_chunks, filtered_predictions
+from .metrics import metrics, span
+from .persistence import asave_prediction, save_prediction, writer
+from .registry import get_predictor, registry
+from .result_cache import result_cache
+from .rollups import daily_summary
+from .shadow import shadow_evaluator
+import asyncio
+import datetime
+import heapq
+import json
 import logging
+import math
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Queue depths and rejection counts, read when /metrics is scraped
+metrics.callback('cibil_model_fallback', '1 while rule-based fallback scores are served',
+                 lambda: int(registry.is_fallback))
+metrics.callback('cibil_write_behind_pending', 'Predictions waiting in the write-behind buffer', writer.pending)
+metrics.callback('cibil_write_behind_dropped_total', 'Predictions that failed to save even row by row',
+                 lambda: writer.dropped, kind='counter')
+metrics.callback('cibil_micro_batch_pending', 'Rows waiting in the micro-batch queue',
+                 lambda: prediction_batcher.stats()['pending'])
+metrics.callback('cibil_inference_rejected_total', 'Async predictions shed with 503',
+                 lambda: inference_executor.rejected, kind='counter')
+metrics.callback('cibil_result_cache_hits_total', 'Result cache hits',
+                 lambda: result_cache.stats()['hits'], kind='counter')
+metrics.callback('cibil_result_cache_misses_total', 'Result cache misses',
+                 lambda: result_cache.stats()['misses'], kind='counter')
+metrics.callback('cibil_shadow_pending', 'Sampled rows waiting for the shadow model',
+                 lambda: shadow_evaluator.stats()['pending'])
+metrics.callback('cibil_shadow_dropped_total', 'Shadow samples dropped because the queue was full',
+                 lambda: shadow_evaluator.dropped, kind='counter')
+metrics.callback('cibil_shadow_evaluated_total', 'Rows scored by the shadow model',
+                 lambda: shadow_evaluator.evaluated, kind='counter')
+metrics.callback('cibil_shadow_category_flips_total', 'Shadow scores in a different category from the served score',
+                 lambda: sum(shadow_evaluator.flips.values()), kind='counter')
+
 def home(request):
     """Display the home page with input form"""
     return render(request, 'predictor/home.html')
 
+# Upper bound on existing_loans; also bounds the what-if grid (predictor/what_if.py)
+MAX_EXISTING_LOANS = 100
+
+def validate_applicant(data):
+    """Parse and validate applicant fields from a form or JSON mapping"""
+    try:
+        age = int(data.get('age', 0))
+        existing_loans = int(data.get('existing_loans', 0))
+    except OverflowError:
+        # int() of an infinite float (JSON Infinity, a float column holding inf)
+        raise ValueError("Age and number of existing loans must be finite numbers")
+    monthly_income = float(data.get('monthly_income', 0))
+    desired_loan_amount = float(data.get('desired_loan_amount', 0))
+    
+    # float() and the JSON parser both accept NaN and Infinity, which slip past the range checks
+    if not (math.isfinite(monthly_income) and math.isfinite(desired_loan_amount)):
+        raise ValueError("Monthly income and loan amount must be finite numbers")
+    
+    # Basic validation
+    if not (18 <= age <= 100):
+        raise ValueError("Age must be between 18 and 100")
+    if monthly_income < 1000:
+        raise ValueError("Monthly income must be at least ₹1,000")
+    if desired_loan_amount < 10000:
+        raise ValueError("Loan amount must be at least ₹10,000")
+    if existing_loans < 0:
+        raise ValueError("Number of existing loans cannot be negative")
+    if existing_loans > MAX_EXISTING_LOANS:
+        raise ValueError(f"Number of existing loans cannot exceed {MAX_EXISTING_LOANS}")
+    
+    # Calculate service years internally
+    retirement_age = 60
+    service_years = max(1, retirement_age - age)
+    
+    return {
+        'age': age,
+        'service_years': service_years,
+        'monthly_income': monthly_income,
+        'desired_loan_amount': desired_loan_amount,
+        'existing_loans': existing_loans,
+    }
+
+def applicant_features(applicant):
+    """Model feature row (ml_model.FEATURES order) for a validated applicant"""
+    return [
+        applicant['age'],
+        applicant['service_years'],
+        applicant['monthly_income'],
+        applicant['desired_loan_amount'],
+        applicant['existing_loans'],
+    ]
+
+def score_applicant(applicant):
+    """Return (predicted_score, suitable_banks) for a validated applicant"""
+    predictor = get_predictor()
+    
+    def compute():
+        if getattr(settings, 'CIBIL_MICRO_BATCH', False):
+            # Coalesced with concurrent requests into one batched predict
+            score = prediction_batcher.predict(applicant_features(applicant))
+        else:
+            score = predictor.predict_score(*applicant_features(applicant))
+        with span('bank_matching'):
+            banks = get_suitable_banks(score, applicant['desired_loan_amount'], applicant['monthly_income'])
+        return score, banks
+    
+    if not getattr(settings, 'CIBIL_RESULT_CACHE', False):
+        return compute()
+    return result_cache.get_or_compute(applicant, registry.version, get_bank_index().version, compute)
+
+def prediction_fields(applicant, predicted_score):
+    """CibilPrediction field values for a scored applicant"""
+    return {
+        'age': applicant['age'],
+        'service_years': applicant['service_years'],
+        'monthly_income': applicant['monthly_income'],
+        'desired_loan_amount': applicant['desired_loan_amount'],
+        'existing_loans': applicant['existing_loans'],
+        'predicted_score': predicted_score,
+    }
+
+def result_context(name, applicant, predicted_score, suitable_banks):
+    """Template context for the result page"""
+    return {
+        'name': name,
+        'age': applicant['age'],
+        'monthly_income': applicant['monthly_income'],
+        'desired_amount': applicant['desired_loan_amount'],
+        'existing_loans': applicant['existing_loans'],
+        'predicted_score': predicted_score,
+        'score_category': get_score_category(predicted_score),
+        'banks': suitable_banks,
+    }
+
 def predict_cibil(request):
     """Handle CIBIL score prediction"""
     if request.method == 'POST':
         try:
             name = request.POST.get('name', '')  # Extract name from form
-            age = int(request.POST.get('age', 0))
-            monthly_income = float(request.POST.get('monthly_income', 0))
-            desired_loan_amount = float(request.POST.get('desired_loan_amount', 0))
-            existing_loans = int(request.POST.get('existing_loans', 0))
+            applicant = validate_applicant(request.POST)
             
-            # Basic validation
-            if not (18 <= age <= 100):
-                raise ValueError("Age must be between 18 and 100")
-            if monthly_income < 1000:
-                raise ValueError("Monthly income must be at least ₹1,000")
-            if desired_loan_amount < 10000:
-                raise ValueError("Loan amount must be at least ₹10,000")
-            if existing_loans < 0:
-                raise ValueError("Number of existing loans cannot be negative")
+            # Predict CIBIL score and match banks (cached for repeat inputs)
+            predicted_score, suitable_banks = score_applicant(applicant)
+            # Sampled for the candidate model, if one is configured; never blocks
+            shadow_evaluator.offer(applicant_features(applicant), predicted_score)
             
-            # Calculate service years internally
-            retirement_age = 60
-            service_years = max(1, retirement_age - age)
-            
-            # Predict CIBIL score
-            predictor = CibilScorePredictor()
-            predicted_score = predictor.predict_score(
-                age, monthly_income, desired_loan_amount, existing_loans
-            )
-            
-            # Save prediction to database
+            # Save prediction to database (buffered when write-behind is enabled)
             try:
-                prediction = CibilPrediction.objects.create(  # type: ignore
-                    age=age,
-                    service_years=service_years,
-                    monthly_income=monthly_income,
-                    desired_loan_amount=desired_loan_amount,
-                    existing_loans=existing_loans,
-                    predicted_score=predicted_score
-                )
-                logger.info(f"Prediction saved: Score {predicted_score} for user data")
+                with span('db_insert'):
+                    save_prediction(**prediction_fields(applicant, predicted_score))
+                logger.info(f"Prediction recorded: Score {predicted_score} for user data")
             except Exception as db_error:
                 logger.error(f"Database save error: {db_error}")
                 # Continue even if DB save fails
             
-            # Get suitable banks
-            suitable_banks = get_suitable_banks(predicted_score, desired_loan_amount, monthly_income)
-            
             # Prepare context for result page
-            context = {
-                'name': name,
-                'age': age,
-                'monthly_income': monthly_income,
-                'desired_amount': desired_loan_amount,
-                'existing_loans': existing_loans,
-                'predicted_score': predicted_score,
-                'score_category': get_score_category(predicted_score),
-                'banks': suitable_banks,
-            }
+            context = result_context(name, applicant, predicted_score, suitable_banks)
             
-            return render(request, 'predictor/result.html', context)
+            with span('render'):
+                return render(request, 'predictor/result.html', context)
             
         except ValueError as ve:
             messages.error(request, f"Input Error: {str(ve)}")
-            return render(request, 'predictor/home.html')
+            return render(request, 'predictor/home.html', status=400)
         except Exception as e:
             logger.error(f"Prediction error: {e}")
             messages.error(request, "An error occurred while processing your request. Please try again.")
@@ -83,6 +185,198 @@ def predict_cibil(request):
     
     return redirect('home')
 
+async def predict_cibil_async(request):
+    """ASGI version of predict_cibil: inference runs on a bounded thread pool"""
+    if request.method != 'POST':
+        return redirect('home')
+    
+    try:
+        name = request.POST.get('name', '')
+        applicant = validate_applicant(request.POST)
+        
+        # Bank rules may need a DB read on first use; keep that off the pool
+        await sync_to_async(get_bank_index)()
+        
+        try:
+            future = inference_executor.try_submit(score_applicant, applicant)
+        except ExecutorOverloaded:
+            logger.warning("Inference pool saturated, shedding request")
+            response = HttpResponse("The service is busy. Please retry shortly.", status=503)
+            response['Retry-After'] = str(getattr(settings, 'CIBIL_RETRY_AFTER', 1))
+            return response
+        predicted_score, suitable_banks = await asyncio.wrap_future(future)
+        shadow_evaluator.offer(applicant_features(applicant), predicted_score)
+        
+        try:
+            with span('db_insert'):
+                await asave_prediction(**prediction_fields(applicant, predicted_score))
+            logger.info(f"Prediction recorded: Score {predicted_score} for user data")
+        except Exception as db_error:
+            logger.error(f"Database save error: {db_error}")
+        
+        context = result_context(name, applicant, predicted_score, suitable_banks)
+        with span('render'):
+            return render(request, 'predictor/result.html', context)
+    
+    except ValueError as ve:
+        messages.error(request, f"Input Error: {str(ve)}")
+        return render(request, 'predictor/home.html', status=400)
+    except Exception as e:
+        logger.error(f"Prediction error: {e}")
+        messages.error(request, "An error occurred while processing your request. Please try again.")
+        return render(request, 'predictor/home.html')
+
+@csrf_exempt
+@require_POST
+def predict_batch(request):
+    """Score a JSON list of applicants with a single model call"""
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({'error': 'Request body must be valid JSON'}, status=400)
+    
+    applicants = payload.get('applicants') if isinstance(payload, dict) else payload
+    if not isinstance(applicants, list) or not applicants:
+        return JsonResponse({'error': 'Expected a non-empty list of applicants'}, status=400)
+    
+    max_size = getattr(settings, 'CIBIL_BATCH_MAX_SIZE', 10000)
+    if len(applicants) > max_size:
+        return JsonResponse({'error': f'At most {max_size} applicants per request'}, status=413)
+    
+    # Validate everything up front so a bad row rejects the batch before scoring
+    cleaned = []
+    errors = []
+    for index, data in enumerate(applicants):
+        try:
+            if not isinstance(data, dict):
+                raise ValueError("Applicant must be a JSON object")
+            cleaned.append(validate_applicant(data))
+        except (TypeError, ValueError) as ve:
+            errors.append({'index': index, 'error': str(ve)})
+    if errors:
+        return JsonResponse({'errors': errors}, status=400)
+    
+    features = [applicant_features(a) for a in cleaned]
+    scores = get_predictor().predict_batch(features)
+    
+    # Bank eligibility for every applicant in one vectorized pass
+    with span('bank_matching_batch'):
+        matches = match_banks(
+            get_bank_index(),
+            scores,
+            [a['desired_loan_amount'] for a in cleaned],
+            [a['monthly_income'] for a in cleaned],
+        )
+    
+    results = []
+    for i, score in enumerate(scores.tolist()):
+        results.append({
+            'predicted_score': score,
+            'score_category': get_score_category(score),
+            'banks': matches.banks(i),
+        })
+    
+    return JsonResponse({'count': len(results), 'results': results})
+
+@csrf_exempt
+@require_POST
+def predict_what_if(request):
+    """Score one applicant over a grid of loan amounts and existing-loan counts; nothing is saved"""
+    # NumPy-backed, so imported on first use like the model itself
+    from .what_if import existing_loans_grid, loan_amount_grid, sweep
+    
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({'error': 'Request body must be valid JSON'}, status=400)
+    # The applicant is nested: a top-level existing_loans is the grid, not the applicant's count
+    if not isinstance(payload, dict) or not isinstance(payload.get('applicant'), dict):
+        return JsonResponse({'error': 'Expected a JSON object with an "applicant" object'}, status=400)
+    
+    max_points = getattr(settings, 'CIBIL_WHAT_IF_MAX_POINTS', 5000)
+    try:
+        applicant = validate_applicant(payload['applicant'])
+        loan_amounts = loan_amount_grid(payload.get('loan_amounts'), applicant['desired_loan_amount'], max_points)
+        existing_loans = existing_loans_grid(payload.get('existing_loans'), applicant['existing_loans'], max_points)
+    except (TypeError, ValueError) as ve:
+        return JsonResponse({'error': str(ve)}, status=400)
+    if len(loan_amounts) * len(existing_loans) > max_points:
+        return JsonResponse({'error': f'At most {max_points} loan amount x existing-loan combinations per request'},
+                            status=413)
+    
+    # One batched model call and one bank-matching pass for the whole grid
+    curves = sweep(applicant, loan_amounts, existing_loans)
+    current = next((c for c in curves if c['existing_loans'] == applicant['existing_loans']), None)
+    return JsonResponse({
+        'applicant': applicant,
+        'loan_amounts': loan_amounts,
+        'existing_loans': existing_loans,
+        # For the applicant's current number of loans, if it is on the grid
+        'max_approvable_amount': current['max_approvable_amount'] if current else None,
+        'curves': curves,
+    })
+
+@staff_member_required
+def analytics_daily(request):
+    """Daily prediction volume, averages, categories and score distribution from the rollup tables"""
+    try:
+        until = datetime.date.fromisoformat(request.GET['until']) if 'until' in request.GET else timezone.localdate()
+        since = datetime.date.fromisoformat(request.GET['since']) if 'since' in request.GET else None
+        days = int(request.GET.get('days', 30))
+    except ValueError:
+        return JsonResponse({'error': 'Use since/until as YYYY-MM-DD and days as an integer'}, status=400)
+    if since is None:
+        # Bounded before the timedelta, which overflows for huge values
+        if not 1 <= days <= 3660:
+            return JsonResponse({'error': 'Date range must be between 1 day and 10 years'}, status=400)
+        try:
+            since = until - datetime.timedelta(days=days - 1)
+        except OverflowError:
+            return JsonResponse({'error': 'Date range starts before year 1'}, status=400)
+    if since > until or (until - since).days >= 3660:
+        return JsonResponse({'error': 'Date range must be between 1 day and 10 years'}, status=400)
+    
+    days = daily_summary(since, until)
+    total = sum(day['count'] for day in days)
+    return JsonResponse({
+        'since': since.isoformat(),
+        'until': until.isoformat(),
+        'total': total,
+        'days': days,
+    })
+
+@staff_member_required
+def shadow_stats(request):
+    """Score deltas, category flips and latency of the shadow model against the served one"""
+    return JsonResponse(shadow_evaluator.stats())
+
+@staff_member_required
+def export_predictions(request):
+    """Stream prediction history as CSV or NDJSON, filtered by date range and score band"""
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': f"format must be one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+    try:
+        queryset = filtered_predictions(
+            since=datetime.date.fromisoformat(request.GET['since']) if 'since' in request.GET else None,
+            until=datetime.date.fromisoformat(request.GET['until']) if 'until' in request.GET else None,
+            min_score=int(request.GET['min_score']) if 'min_score' in request.GET else None,
+            max_score=int(request.GET['max_score']) if 'max_score' in request.GET else None,
+        )
+    except ValueError:
+        return JsonResponse({'error': 'Use since/until as YYYY-MM-DD and min_score/max_score as integers'}, status=400)
+    
+    content_type = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    response = StreamingHttpResponse(export_chunks(export_format, queryset), content_type=f'{content_type}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="cibil_predictions.{export_format}"'
+    return response
+
+def metrics_view(request):
+    """Prometheus text exposition of this process's timings and queue gauges"""
+    if not getattr(settings, 'CIBIL_METRICS_ENABLED', True):
+        raise Http404()
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 def get_score_category(score):
     """Return score category based on CIBIL score"""
     if score >= 750:
@@ -99,102 +393,50 @@ def get_score_category(score):
 def get_suitable_banks(cibil_score, loan_amount, monthly_income):
     """Get list of suitable banks based on CIBIL score and other factors"""
     
-    # Comprehensive bank data with realistic criteria
-    banks_data = [
-        {
-            'name': 'State Bank of India',
-            'short_name': 'SBI',
-            'min_score': 650,
-            'max_amount': 15000000,
-            'interest_rate': 8.50,
-            'priority': 1,
-            'income_multiplier': 60  # Max loan = 60x monthly income
-        },
-        {
-            'name': 'HDFC Bank',
-            'short_name': 'HDFC',
-            'min_score': 720,
-            'max_amount': 20000000,
-            'interest_rate': 8.65,
-            'priority': 2,
-            'income_multiplier': 80
-        },
-        {
-            'name': 'ICICI Bank',
-            'short_name': 'ICICI',
-            'min_score': 700,
-            'max_amount': 18000000,
-            'interest_rate': 8.75,
-            'priority': 3,
-            'income_multiplier': 75
-        },
-        {
-            'name': 'Axis Bank',
-            'short_name': 'AXIS',
-            'min_score': 680,
-            'max_amount': 12000000,
-            'interest_rate': 9.00,
-            'priority': 4,
-            'income_multiplier': 65
-        },
-        {
-            'name': 'Cooperative Bank',
-            'short_name': 'COOP',
-            'min_score': 600,
-            'max_amount': 5000000,
-            'interest_rate': 9.50,
-            'priority': 5,
-            'income_multiplier': 40
-        }
-    ]
+    # Factor 2: CIBIL score based multiplier (the same for every bank)
+    score_multiplier = 1.0
+    if cibil_score >= 800:
+        score_multiplier = 1.3
+    elif cibil_score >= 750:
+        score_multiplier = 1.2
+    elif cibil_score >= 700:
+        score_multiplier = 1.1
+    elif cibil_score >= 650:
+        score_multiplier = 1.0
+    else:
+        score_multiplier = 0.8
     
     suitable_banks = []
-    annual_income = monthly_income * 12
     
-    for bank in banks_data:
-        if cibil_score >= bank['min_score']:
-            # Calculate maximum eligible amount based on multiple factors
-            
-            # Factor 1: Income-based calculation
-            income_based_limit = monthly_income * bank['income_multiplier']
-            
-            # Factor 2: CIBIL score based multiplier
-            score_multiplier = 1.0
-            if cibil_score >= 800:
-                score_multiplier = 1.3
-            elif cibil_score >= 750:
-                score_multiplier = 1.2
-            elif cibil_score >= 700:
-                score_multiplier = 1.1
-            elif cibil_score >= 650:
-                score_multiplier = 1.0
-            else:
-                score_multiplier = 0.8
-            
-            # Factor 3: Bank's policy limit
-            policy_limit = bank['max_amount']
-            
-            # Calculate final eligible amount
-            base_eligible = min(income_based_limit * score_multiplier, policy_limit)
-            
-            # Ensure it's reasonable compared to desired amount
-            if loan_amount <= base_eligible:
-                eligible_amount = int(min(loan_amount * 1.1, base_eligible))  # 10% buffer
-            else:
-                eligible_amount = int(base_eligible)
-            
-            # Only include banks that can offer reasonable amounts
-            if eligible_amount >= 50000:  # Minimum viable loan
-                suitable_banks.append({
-                    'name': bank['name'],
-                    'short_name': bank['short_name'],
-                    'eligible_amount': eligible_amount,
-                    'interest_rate': bank['interest_rate'],
-                    'priority': bank['priority'],
-                    'approval_chance': min(95, 60 + (cibil_score - bank['min_score']) // 10)
-                })
-    
-    # Sort by priority (best banks first) and then by eligible amount
-    suitable_banks.sort(key=lambda x: (x['priority'], -x['eligible_amount']))
-    
-    return suitable_banks[:5]  # Return top 5 banks
+    # Only banks whose minimum score is met, found by bisecting the cached index
+    for bank in get_bank_index().eligible(cibil_score):
+        # Calculate maximum eligible amount based on multiple factors
+        
+        # Factor 1: Income-based calculation
+        income_based_limit = monthly_income * bank.income_multiplier
+        
+        # Factor 3: Bank's policy limit
+        policy_limit = bank.max_amount
+        
+        # Calculate final eligible amount
+        base_eligible = min(income_based_limit * score_multiplier, policy_limit)
+        
+        # Ensure it's reasonable compared to desired amount
+        if loan_amount <= base_eligible:
+            eligible_amount = int(min(loan_amount * 1.1, base_eligible))  # 10% buffer
+        else:
+            eligible_amount = int(base_eligible)
+        
+        # Only include banks that can offer reasonable amounts
+        if eligible_amount >= 50000:  # Minimum viable loan
+            suitable_banks.append({
+                'name': bank.name,
+                'short_name': bank.short_name,
+                'eligible_amount': eligible_amount,
+                'interest_rate': bank.interest_rate,
+                'priority': bank.priority,
+                'approval_chance': min(95, 60 + (cibil_score - bank.min_score) // 10)
+            })
+    
+    # Top 5 by priority (best banks first) and then by eligible amount
+    return heapq.nsmallest(5, suitable_banks, key=lambda x: (x['priority'], -x['eligible_amount']))
@@ -0,0 +1,140 @@
+"""What-if sweeps: one applicant over a grid of loan amounts and existing-loan counts.
+
+``sweep`` builds every (existing_loans, loan_amount) variant of the
+applicant as one feature matrix and scores it with a single
+``predict_batch`` call. It then matches all of them against every bank in one
+``match_banks`` pass. From that it reads off:
+
+* the score curve over loan amounts for each existing-loan count,
+* per bank, the largest amount it would approve in full (its offer is at
+  least the amount asked for), and
+* the largest approvable amount overall.
+
+This replaces resubmitting the form once per variant. Nothing is persisted or
+cached: these are exploratory queries, not predictions.
+"""
+
+import math
+
+import numpy as np
+
+from .banks import get_bank_index, match_banks
+from .metrics import span
+from .registry import get_predictor
+
+MIN_LOAN_AMOUNT = 10000      # same floor as views.validate_applicant
+MAX_EXISTING_LOANS = 50      # grid limit, raised to the applicant's own count
+DEFAULT_LOAN_STEPS = 30
+DEFAULT_LOAN_MULTIPLE = 3    # default sweep: up to 3x the desired amount
+LOAN_ROUNDING = 1000
+
+
+def loan_amount_grid(spec, desired_loan_amount, max_steps):
+    """Sorted distinct loan amounts from a list or {'min', 'max', 'steps'}; None means the default sweep"""
+    if spec is None:
+        spec = {'max': desired_loan_amount * DEFAULT_LOAN_MULTIPLE}
+    if isinstance(spec, dict):
+        low = float(spec.get('min', MIN_LOAN_AMOUNT))
+        high = float(spec.get('max', desired_loan_amount * DEFAULT_LOAN_MULTIPLE))
+        steps = int(spec.get('steps', DEFAULT_LOAN_STEPS))
+        if not 1 <= steps <= max_steps or not low <= high:
+            raise ValueError(f"loan_amounts needs min <= max and 1 to {max_steps} steps")
+        amounts = np.linspace(low, high, steps) if steps > 1 else [low]
+        # Round to whole thousands, without dropping below the minimum
+        amounts = [max(low, float(round(a / LOAN_ROUNDING) * LOAN_ROUNDING)) for a in amounts]
+    elif isinstance(spec, list) and spec:
+        # Checked before converting, so an oversized list is not copied
+        if len(spec) > max_steps:
+            raise ValueError(f"loan_amounts may have at most {max_steps} values")
+        amounts = [float(a) for a in spec]
+    else:
+        raise ValueError("loan_amounts must be a non-empty list or an object with min, max and steps")
+    if not all(math.isfinite(a) for a in amounts) or min(amounts) < MIN_LOAN_AMOUNT:
+        raise ValueError(f"Loan amounts must be at least ₹{MIN_LOAN_AMOUNT:,}")
+    return sorted(set(amounts))
+
+
+def existing_loans_grid(spec, current, max_points):
+    """Sorted distinct existing-loan counts from a list or {'min', 'max'}; None means current ±2"""
+    # The applicant's own count (at most views.MAX_EXISTING_LOANS) is always allowed
+    limit = max(MAX_EXISTING_LOANS, current)
+    if spec is None:
+        spec = {'min': max(0, current - 2), 'max': min(current + 2, limit)}
+    if isinstance(spec, dict):
+        low, high = int(spec.get('min', 0)), int(spec.get('max', current))
+        if not 0 <= low <= high <= limit:
+            raise ValueError(f"existing_loans needs 0 <= min <= max <= {limit}")
+        if high - low + 1 > max_points:
+            raise ValueError(f"existing_loans may have at most {max_points} values")
+        counts = list(range(low, high + 1))
+    elif isinstance(spec, list):
+        # Checked before converting, so an oversized list is not copied
+        if len(spec) > max_points:
+            raise ValueError(f"existing_loans may have at most {max_points} values")
+        counts = [int(c) for c in spec]
+    else:
+        raise ValueError("existing_loans must be a list or an object with min and max")
+    if not counts or min(counts) < 0 or max(counts) > limit:
+        raise ValueError(f"existing_loans must be between 0 and {limit}")
+    return sorted(set(counts))
+
+
+def sweep(applicant, loan_amounts, existing_loans):
+    """Score applicant at every (existing_loans, loan_amount) pair; loan_amounts must be sorted"""
+    n_loans, n_counts = len(loan_amounts), len(existing_loans)
+    n = n_loans * n_counts
+    # Row r is existing_loans[r // n_loans] with loan_amounts[r % n_loans]
+    loans = np.tile(np.asarray(loan_amounts, dtype=float), n_counts)
+    counts = np.repeat(np.asarray(existing_loans, dtype=float), n_loans)
+    features = np.column_stack([
+        np.full(n, applicant['age'], dtype=float),
+        np.full(n, applicant['service_years'], dtype=float),
+        np.full(n, applicant['monthly_income'], dtype=float),
+        loans,
+        counts,
+    ])
+    scores = get_predictor().predict_batch(features)
+
+    index = get_bank_index()
+    rules = index.rules
+    with span('bank_matching_what_if'):
+        # Every bank, not just the top five, so each one gets its own threshold
+        matches = match_banks(index, scores, loans, features[:, 2], limit=len(rules))
+        # Scatter the ranked matches back into (point, bank) order; -1 where a bank does not qualify
+        matched = np.arange(len(rules)) < matches.counts[:, None]
+        rows = np.arange(n)[:, None]
+        offered = np.full((n, len(rules)), -1, dtype=np.int64)
+        chance = np.zeros((n, len(rules)), dtype=np.int64)
+        offered[rows, matches.ranked] = np.where(matched, matches.eligible_amount, -1)
+        chance[rows, matches.ranked] = np.where(matched, matches.approval_chance, 0)
+        # A bank approves the amount asked for when its offer covers it
+        approves = (offered >= loans[:, None]).reshape(n_counts, n_loans, len(rules))
+
+    scores = scores.reshape(n_counts, n_loans)
+    offered = offered.reshape(n_counts, n_loans, len(rules))
+    chance = chance.reshape(n_counts, n_loans, len(rules))
+    curves = []
+    for c, count in enumerate(existing_loans):
+        banks = []
+        for b, rule in enumerate(rules):
+            approved = np.flatnonzero(approves[c, :, b])
+            # Loan amounts are sorted, so the last approved point is the largest amount
+            last = int(approved[-1]) if len(approved) else None
+            banks.append({
+                'name': rule.name,
+                'short_name': rule.short_name,
+                'min_cibil_score': rule.min_score,
+                'interest_rate': rule.interest_rate,
+                'max_approvable_amount': loan_amounts[last] if last is not None else None,
+                'approval_chance': int(chance[c, last, b]) if last is not None else None,
+            })
+        approvable = [bank['max_approvable_amount'] for bank in banks if bank['max_approvable_amount'] is not None]
+        curves.append({
+            'existing_loans': count,
+            'scores': scores[c].tolist(),
+            'eligible_banks': (offered[c] >= 0).sum(axis=1).tolist(),
+            'approving_banks': approves[c].sum(axis=1).tolist(),
+            'max_approvable_amount': max(approvable) if approvable else None,
+            'banks': banks,
+        })
+    return curves
@@ -0,0 +1,100 @@
+"""Queue-fed background threads and the rolling statistics they report.
+
+``PredictionWriter``, ``MicroBatcher`` and ``ShadowEvaluator`` each drain a
+bounded ``queue.Queue`` from one daemon thread. ``BackgroundWorker`` owns that
+lifecycle. The queue and thread are created on first use, so importing a
+module that defines a worker starts nothing. They are re-created in a forked
+child, which inherits the object but not the thread. ``stop`` lets the thread
+finish. Subclasses implement ``_run`` (looping until ``_stopping`` is set)
+and decide what to do when the queue is full.
+
+``StatsWindow`` keeps count, mean and max of every sample and percentiles
+over the most recent ones, for the workers' ``stats()``.
+"""
+
+import collections
+import os
+import queue
+import threading
+
+
+class StatsWindow:
+    """Count, mean and max of every sample, percentiles over the most recent ones"""
+
+    def __init__(self, size=2048):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = collections.deque(maxlen=size)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def summary(self):
+        if not self.count:
+            return {'count': 0}
+        # Not at module level: workers are imported by views at startup
+        import numpy as np
+
+        recent = np.fromiter(self.recent, dtype=float)
+        return {
+            'count': self.count,
+            'mean': self.total / self.count,
+            'p50': float(np.percentile(recent, 50)),
+            'p99': float(np.percentile(recent, 99)),
+            'max': self.max,
+        }
+
+
+class BackgroundWorker:
+    """A bounded queue drained by one lazily started daemon thread"""
+
+    thread_name = 'background-worker'
+    stop_timeout = 5.0
+
+    def __init__(self, max_queue):
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._stopping = None
+        self._pid = None
+
+    def pending(self):
+        """Number of items waiting in the queue"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stop(self, timeout=None):
+        """Ask the thread to finish and wait up to timeout seconds for it"""
+        with self._lock:
+            thread = self._thread
+            if thread is None or self._pid != os.getpid():
+                return
+            self._stopping.set()
+        thread.join(self.stop_timeout if timeout is None else timeout)
+        self._after_stop()
+        with self._lock:
+            self._thread = None
+
+    def _after_stop(self):
+        """Called once the thread has exited (or the join timed out)"""
+
+    def _ensure_started(self):
+        """Return the queue, starting the thread in this process if needed"""
+        if self._thread is not None and self._pid == os.getpid():
+            return self._queue
+        with self._lock:
+            # A forked worker inherits the object but not the thread
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.max_queue)
+                self._stopping = threading.Event()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+                self._thread.start()
+            return self._queue
+
+    def _run(self):
+        raise NotImplementedError